@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from urllib3.exceptions import InsecureRequestWarning
-import requests
 import time
-import _thread
 from datetime import datetime, timedelta
 from tzlocal import get_localzone
 import threading
+import heapq
+import bisect
+import resource
+import concurrent.futures
+import asyncio
 import socket
 import os
 import subprocess
@@ -17,7 +19,13 @@ import re
 import json
 import os.path
 import argparse
-from time import time, sleep, localtime, strftime
+import fcntl
+import fnmatch
+import select
+import struct
+import random
+from array import array
+from time import time, sleep, localtime, strftime, monotonic, monotonic_ns, clock_gettime, CLOCK_BOOTTIME
 from collections import OrderedDict
 from colorama import init as colorama_init
 from colorama import Fore, Back, Style
@@ -26,13 +34,12 @@ from unidecode import unidecode
 import paho.mqtt.client as mqtt
 import sdnotify
 from signal import signal, SIGPIPE, SIG_DFL
-signal(SIGPIPE, SIG_DFL)
 
-apt_available = True
-try:
-    import apt
-except ImportError:
-    apt_available = False
+# requests (with urllib3) is slow to import and big, we import it when our
+#  release check first runs (see importRequests()), apt is only ever imported
+#  by our update counting helper process (see getNumberOfAvailableUpdates())
+requests_module = None
+apt_available = True    # until our helper finds it can't import apt
 
 script_version = "1.9.x"
 script_name = 'ISP-RPi-mqtt-daemon.py'
@@ -43,10 +50,6 @@ project_url = 'https://github.com/ironsheep/RPi-Reporter-MQTT2HA-Daemon'
 # we'll use this throughout
 local_tz = get_localzone()
 
-# turn off insecure connection warnings (our KZ0Q site has bad certs)
-# REF: https://www.geeksforgeeks.org/how-to-disable-security-certificate-checks-for-requests-in-python/
-requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
-
 # TODO:
 #  - add announcement of free-space and temperatore endpoints
 
@@ -56,17 +59,64 @@ if False:
         'Sorry, this script requires a python3 runtime environment.', file=sys.stderr)
     os._exit(1)
 
+# for our time-to-first-report measurement
+daemon_start_time = monotonic()
+
 # Argparse
 opt_debug = False
 opt_verbose = False
+opt_stall = False
+config_dir = sys.path[0]
 
 # Systemd Service Notifications - https://github.com/bb4242/sdnotify
 sd_notifier = sdnotify.SystemdNotifier()
 
 # Logging function
+#  text may hold {} placeholders filled from args, we only format lines we'll actually log
+#  so pass values as args (not pre-formatted) for lines which are usually not shown
+
+# our lines go to the systemd journal (see enableJournalLogging()) instead of our console
+K_JOURNAL_SOCKET = '/run/systemd/journal/socket'
+K_JOURNAL_IDENTIFIER = 'rpi-reporter'
+journal_socket = None
 
 
-def print_line(text, error=False, warning=False, info=False, verbose=False, debug=False, console=True, sd_notify=False):
+def isNullDevice(fileObj):
+    # our service sends our stdout to /dev/null, no need to write there
+    try:
+        fileStat = os.fstat(fileObj.fileno())
+        nullStat = os.stat(os.devnull)
+    except (OSError, ValueError, AttributeError):
+        return False
+    return fileStat.st_rdev == nullStat.st_rdev and fileStat.st_ino == nullStat.st_ino
+
+
+stdout_is_null = isNullDevice(sys.stdout)
+
+
+def print_line(text, *args, error=False, warning=False, info=False, verbose=False, debug=False, console=True, sd_notify=False, fields=None):
+    # cheap checks first: nothing is formatted for lines we won't log
+    if not (error or warning or sd_notify):
+        if info or verbose:
+            if not opt_verbose:
+                return
+        elif debug and not opt_debug:
+            return
+        if not console or (stdout_is_null and journal_socket is None):
+            return
+    if args:
+        text = text.format(*args)
+    if journal_socket is not None and console:
+        if error:
+            priority = 3
+        elif warning:
+            priority = 4
+        elif debug and not (info or verbose):
+            priority = 7
+        else:
+            priority = 6
+        if journalSend(text, priority, fields):
+            console = False
     timestamp = strftime('%Y-%m-%d %H:%M:%S', localtime())
     if (sd_notify):
         text = '* NOTIFY: {}'.format(text)
@@ -94,6 +144,41 @@ def print_line(text, error=False, warning=False, info=False, verbose=False, debu
         sd_notifier.notify(
             'STATUS={} - {}.'.format(timestamp_sd, unidecode(text)))
 
+
+def journalField(name, value):
+    # native journal protocol: NAME=value, or NAME, length, value when value holds newlines
+    valueBytes = str(value).encode('utf-8')
+    if b'\n' in valueBytes:
+        return name.encode('ascii') + b'\n' + struct.pack('<Q', len(valueBytes)) + valueBytes + b'\n'
+    return name.encode('ascii') + b'=' + valueBytes + b'\n'
+
+
+def journalSend(text, priority, fields=None):
+    # send one line with structured fields, returns False when journald didn't take it
+    entry = [journalField('MESSAGE', text), journalField('PRIORITY', priority),
+             journalField('SYSLOG_IDENTIFIER', K_JOURNAL_IDENTIFIER),
+             journalField('CODE_FUNC', sys._getframe(2).f_code.co_name)]
+    if fields:
+        for fieldName, fieldValue in fields.items():
+            entry.append(journalField(fieldName.upper(), fieldValue))
+    try:
+        journal_socket.send(b''.join(entry))
+    except OSError:
+        return False
+    return True
+
+
+def enableJournalLogging():
+    global journal_socket
+    try:
+        journalSocket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        journalSocket.connect(K_JOURNAL_SOCKET)
+    except OSError as exc:
+        print_line('Journal logging not available, logging to console, exception=({})', exc, warning=True)
+        return
+    journal_socket = journalSocket
+    print_line('Logging to systemd journal as [{}]', K_JOURNAL_IDENTIFIER, verbose=True)
+
 # Identifier cleanup
 
 
@@ -114,31 +199,37 @@ def clean_identifier(name):
 
 
 # Argparse
-parser = argparse.ArgumentParser(
-    description=project_name, epilog='For further details see: ' + project_url)
-parser.add_argument("-v", "--verbose",
-                    help="increase output verbosity", action="store_true")
-parser.add_argument(
-    "-d", "--debug", help="show debug output", action="store_true")
-parser.add_argument(
-    "-s", "--stall", help="TEST: report only the first time", action="store_true")
-parser.add_argument("-c", '--config_dir',
-                    help='set directory where config.ini is located', default=sys.path[0])
-parse_args = parser.parse_args()
-
-config_dir = parse_args.config_dir
-opt_debug = parse_args.debug
-opt_verbose = parse_args.verbose
-opt_stall = parse_args.stall
-
-print_line('--------------------------------------------------------------------', debug=True)
-print_line(script_info, info=True)
-if opt_verbose:
-    print_line('Verbose enabled', info=True)
-if opt_debug:
-    print_line('Debug enabled', debug=True)
-if opt_stall:
-    print_line('TEST: Stall (no-re-reporting) enabled', debug=True)
+def parseCommandLine():
+    global config_dir
+    global opt_debug
+    global opt_verbose
+    global opt_stall
+    parser = argparse.ArgumentParser(
+        description=project_name, epilog='For further details see: ' + project_url)
+    parser.add_argument("-v", "--verbose",
+                        help="increase output verbosity", action="store_true")
+    parser.add_argument(
+        "-d", "--debug", help="show debug output", action="store_true")
+    parser.add_argument(
+        "-s", "--stall", help="TEST: report only the first time", action="store_true")
+    parser.add_argument("-c", '--config_dir',
+                        help='set directory where config.ini is located', default=sys.path[0])
+    parse_args = parser.parse_args()
+
+    config_dir = parse_args.config_dir
+    opt_debug = parse_args.debug
+    opt_verbose = parse_args.verbose
+    opt_stall = parse_args.stall
+
+    print_line('--------------------------------------------------------------------', debug=True)
+    print_line(script_info, info=True)
+    if opt_verbose:
+        print_line('Verbose enabled', info=True)
+    if opt_debug:
+        print_line('Debug enabled', debug=True)
+    if opt_stall:
+        print_line('TEST: Stall (no-re-reporting) enabled', debug=True)
+
 
 # -----------------------------------------------------------------------------
 #  MQTT handlers
@@ -146,56 +237,137 @@ if opt_stall:
 
 # Eclipse Paho callbacks - http://www.eclipse.org/paho/clients/python/docs/#callbacks
 
+mqtt_client = None
 mqtt_client_connected = False
-print_line(
-    '* init mqtt_client_connected=[{}]'.format(mqtt_client_connected), debug=True)
 mqtt_client_should_attempt_reconnect = True
+# CONNACK result codes we don't retry: bad user name or password, not authorised
+K_MQTT_FATAL_CONNACK_CODES = [4, 5]
 
 
 def on_connect(client, userdata, flags, rc):
     global mqtt_client_connected
+    global last_published_static
     if rc == 0:
         print_line('* MQTT connection established', console=True, sd_notify=True)
         print_line('')  # blank line?!
-        # _thread.start_new_thread(afterMQTTConnect, ())
         mqtt_client_connected = True
-        print_line('on_connect() mqtt_client_connected=[{}]'.format(
-            mqtt_client_connected), debug=True)
+        print_line('on_connect() mqtt_client_connected=[{}]', mqtt_client_connected, debug=True)
+        # broker may have lost our retained static facts, send them again with our next report
+        last_published_static = None
+        resetMqttReconnectDelay()
+        mqtt_client.publish(lwt_sensor_topic, payload=lwt_online_val, retain=False)
+        mqtt_client.publish(lwt_command_topic, payload=lwt_online_val, retain=False)
+        # send what was waiting for our connection
+        wakePublisher()
 
         # -------------------------------------------------------------------------
         # Commands Subscription
         if (len(commands) > 0):
-            print_line('MQTT subscription to {}/+ enabled'.format(command_base_topic), console=True, sd_notify=True)
+            print_line('MQTT subscription to {}/+ enabled', command_base_topic, console=True, sd_notify=True)
             mqtt_client.subscribe('{}/+'.format(command_base_topic))
         else:
-            print_line('MQTT subscripton to {}/+ disabled'.format(command_base_topic), console=True, sd_notify=True)
+            print_line('MQTT subscripton to {}/+ disabled', command_base_topic, console=True, sd_notify=True)
         # -------------------------------------------------------------------------
 
     else:
-        print_line('! Connection error with result code {} - {}'.format(str(rc),
-                   mqtt.connack_string(rc)), error=True)
-        print_line('MQTT Connection error with result code {} - {}'.format(str(rc),
-                   mqtt.connack_string(rc)), error=True, sd_notify=True)
-        # technically NOT useful but readying possible new shape...
+        print_line('MQTT Connection error with result code {} - {}', str(rc), mqtt.connack_string(rc), error=True, sd_notify=True)
         mqtt_client_connected = False
-        print_line('on_connect() mqtt_client_connected=[{}]'.format(
-            mqtt_client_connected), debug=True, error=True)
-        # kill main thread
-        os._exit(1)
+        print_line('on_connect() mqtt_client_connected=[{}]', mqtt_client_connected, debug=True, error=True)
+        if rc in K_MQTT_FATAL_CONNACK_CODES:
+            # retrying won't help until our configuration is fixed, kill main thread
+            print_line('MQTT broker refused our credentials. Please check your settings in the configuration file "config.ini"',
+                       error=True, sd_notify=True)
+            os._exit(1)
+        # else (e.g. broker restarting) paho drops the connection, we retry with our backoff (see on_disconnect)
 
 
 def on_disconnect(client, userdata, mid):
     global mqtt_client_connected
     mqtt_client_connected = False
     print_line('* MQTT connection lost', console=True, sd_notify=True)
-    print_line('on_disconnect() mqtt_client_connected=[{}]'.format(
-        mqtt_client_connected), debug=True)
-    pass
+    print_line('on_disconnect() mqtt_client_connected=[{}]', mqtt_client_connected, debug=True)
+    setMqttReconnectDelay()
+
+
+def on_connect_fail(client, userdata):
+    print_line('* MQTT connection failed', console=True, sd_notify=True)
+    setMqttReconnectDelay()
+
+
+# -----------------------------------------------------------------------------
+#  MQTT reconnect backoff - after a site-wide power cut all of our RPi's come
+#   up together, so our reconnect delay doubles each failed attempt (up to a
+#   limit) and is jittered so we don't all hit the broker at the same time
+# -----------------------------------------------------------------------------
+
+mqtt_reconnect_attempts = 0
+mqtt_reconnect_delay = 0.0
+mqtt_next_reconnect_time = 0.0
+
+
+def nextMqttReconnectDelay():
+    global mqtt_reconnect_attempts
+    global mqtt_reconnect_delay
+    maxDelay = min(mqtt_reconnect_max_delay, mqtt_reconnect_min_delay * (2 ** mqtt_reconnect_attempts))
+    mqtt_reconnect_attempts += 1
+    mqtt_reconnect_delay = random.uniform(maxDelay / 2, maxDelay)
+    return mqtt_reconnect_delay
+
+
+def setMqttReconnectDelay():
+    # threads runtime: paho's loop thread waits min_delay before its next attempt,
+    #  asyncio runtime: our housekeeping waits until mqtt_next_reconnect_time
+    global mqtt_next_reconnect_time
+    reconnectDelay = nextMqttReconnectDelay()
+    mqtt_next_reconnect_time = monotonic() + reconnectDelay
+    mqtt_client.reconnect_delay_set(min_delay=reconnectDelay, max_delay=reconnectDelay)
+    print_line('- MQTT reconnect in ({:.1f} sec), attempt ({})', reconnectDelay, mqtt_reconnect_attempts, debug=True)
+
+
+def resetMqttReconnectDelay():
+    global mqtt_reconnect_attempts
+    mqtt_reconnect_attempts = 0
 
 
 def on_publish(client, userdata, mid):
     # print_line('* Data successfully published.')
-    pass
+    recordPublishAck(mid)
+
+# -----------------------------------------------------------------------------
+#  MQTT socket callbacks - only used by our asyncio runtime, these let our
+#   event loop watch the broker socket instead of paho's loop_start() thread
+#   (our reconnects run in a worker thread so they call these from there)
+# -----------------------------------------------------------------------------
+
+
+def callOnEventLoop(callback, *args):
+    # run callback on our event loop: now when called from it, else as soon as it can
+    try:
+        runningLoop = asyncio.get_running_loop()
+    except RuntimeError:
+        runningLoop = None
+    if runningLoop is asyncio_loop:
+        callback(*args)
+    else:
+        asyncio_loop.call_soon_threadsafe(callback, *args)
+
+
+def on_socket_open(client, userdata, sock):
+    print_line('on_socket_open()', debug=True)
+    callOnEventLoop(asyncio_loop.add_reader, sock, client.loop_read)
+
+
+def on_socket_close(client, userdata, sock):
+    print_line('on_socket_close()', debug=True)
+    callOnEventLoop(asyncio_loop.remove_reader, sock)
+
+
+def on_socket_register_write(client, userdata, sock):
+    callOnEventLoop(asyncio_loop.add_writer, sock, client.loop_write)
+
+
+def on_socket_unregister_write(client, userdata, sock):
+    callOnEventLoop(asyncio_loop.remove_writer, sock)
 
 # -----------------------------------------------------------------------------
 # Commands - MQTT Subscription Callback
@@ -204,7 +376,7 @@ def on_publish(client, userdata, mid):
 
 
 def on_subscribe(client, userdata, mid, granted_qos):
-    print_line('on_subscribe() - {} - {}'.format(str(mid), str(granted_qos)), debug=True, sd_notify=True)
+    print_line('on_subscribe() - {} - {}', str(mid), str(granted_qos), debug=True, sd_notify=True)
 
 
 shell_cmd_fspec = ''
@@ -221,80 +393,278 @@ def on_message(client, userdata, message):
 
     decoded_payload = message.payload.decode('utf-8')
     command = message.topic.split('/')[-1]
-    print_line('on_message() Topic=[{}] payload=[{}] command=[{}]'.format(
-        message.topic, message.payload, command), console=True, sd_notify=True, debug=True)
+    print_line('on_message() Topic=[{}] payload=[{}] command=[{}]',
+        message.topic, message.payload, command, console=True, sd_notify=True, debug=True)
 
     if command != 'status':
         if command in commands:
-            print_line('- Command "{}" Received - Run {} {} -'.format(command,
-                       commands[command], decoded_payload), console=True, debug=True)
-            pHandle = subprocess.Popen([shell_cmd_fspec, "-c", commands[command].format(decoded_payload)])
-            output, errors = pHandle.communicate()
-            if errors or pHandle.returncode:
-                print_line('- Command exec says: errors=[{}]'.format(errors or output), console=True, debug=True)
+            print_line('- Command "{}" Received - Run {} {} -', command, commands[command], decoded_payload, console=True, debug=True)
+            if asyncio_loop is not None:
+                # we're on our event loop, the command can run for as long as it likes in a worker
+                asyncio_loop.run_in_executor(None, runCommand, command, decoded_payload)
+            else:
+                runCommand(command, decoded_payload)
         else:
             print_line('* Invalid Command received.', error=True)
 
 
+def runCommand(command, decoded_payload):
+    # run one of our commands, waiting until it's done
+    countChildForked()
+    pHandle = subprocess.Popen([shell_cmd_fspec, "-c", commands[command].format(decoded_payload)])
+    output, errors = pHandle.communicate()
+    if errors or pHandle.returncode:
+        print_line('- Command exec says: errors=[{}]', errors or output, console=True, debug=True)
+
+
 # -----------------------------------------------------------------------------
 # Load configuration file
 config = ConfigParser(delimiters=(
     '=', ), inline_comment_prefixes=('#'), interpolation=None)
 config.optionxform = str
-try:
-    with open(os.path.join(config_dir, 'config.ini')) as config_file:
-        config.read_file(config_file)
-except IOError:
-    print_line('No configuration file "config.ini"',
-               error=True, sd_notify=True)
-    sys.exit(1)
-
-daemon_enabled = config['Daemon'].getboolean('enabled', True)
+# our settings are our defaults until config.ini is loaded (see loadConfiguration())
+config.read_dict({'Daemon': {}, 'MQTT': {}})
 
 # This script uses a flag file containing a date/timestamp of when the system was last updated
 default_update_flag_filespec = '/home/pi/bin/lastupd.date'
-update_flag_filespec = config['Daemon'].get(
-    'update_flag_filespec', default_update_flag_filespec)
 
 default_base_topic = 'home/nodes'
-base_topic = config['MQTT'].get('base_topic', default_base_topic).lower()
 
 default_sensor_name = 'rpi-reporter'
-# Sensor name could be set either via configuration file or `MQTT_SENSOR_NAME`
-# environment variable, the latter takes precedence
-sensor_name = os.environ.get(
-    "MQTT_SENSOR_NAME", config['MQTT'].get('sensor_name', default_sensor_name)
-).lower()
 
 # by default Home Assistant listens to the /homeassistant but it can be changed for a given installation
 default_discovery_prefix = 'homeassistant'
-discovery_prefix = config['MQTT'].get(
-    'discovery_prefix', default_discovery_prefix).lower()
 
 # report our RPi values every 5min
 min_interval_in_minutes = 1
 max_interval_in_minutes = 30
 default_interval_in_minutes = 5
-interval_in_minutes = config['Daemon'].getint(
-    'interval_in_minutes', default_interval_in_minutes)
 
 # check our RPi pending-updates every 4 hours
 min_check_interval_in_hours = 2
 max_check_interval_in_hours = 24
 default_check_interval_in_hours = 4
-check_interval_in_hours = config['Daemon'].getint(
-    'check_updates_in_hours', default_check_interval_in_hours)
 
 # default domain when hostname -f doesn't return it
 default_domain = ''
-fallback_domain = config['Daemon'].get(
-    'fallback_domain', default_domain).lower()
+
+# how the daemon runs its work
+#  threads: paho network thread plus worker threads (classic)
+#  asyncio: paho, our timers and reporting all driven from one event loop
+daemon_runtime_names = ['threads', 'asyncio']
+default_daemon_runtime = 'threads'
+# our event loop when running the asyncio runtime
+asyncio_loop = None
+
+# which network interfaces we report (comma separated shell-style patterns)
+default_network_interfaces_include = 'eth*, wlan*'
+default_network_interfaces_exclude = 'lo, docker*, veth*, hassio*'
+
+# how we query the VideoCore GPU firmware for temperature and throttle state
+#  auto: mailbox (/dev/vcio) when accessible, else vcgencmd(1)
+videocore_backend_names = ['auto', 'mailbox', 'vcgencmd']
+default_videocore_backend = 'auto'
+
+# what our Home Assistant "CPU Use" entity shows
+#  load: load average per core (1, 5 or 15 min. to suit interval_in_minutes)
+#  busy: percent of CPU time busy since our prior report, from /proc/stat
+cpu_use_source_names = ['load', 'busy']
+default_cpu_use_source = 'load'
 
 commands = OrderedDict([])
-if config.has_section('Commands'):
-    commandSet = dict(config['Commands'].items())
-    if len(commandSet) > 0:
-        commands.update(commandSet)
+
+# our reports wait in a bounded queue for our publisher, when it's full:
+#  drop-oldest: drop the oldest waiting message
+#  coalesce: replace the waiting message for the same topic, else drop the oldest
+publish_overflow_names = ['drop-oldest', 'coalesce']
+default_publish_overflow = 'coalesce'
+default_publish_queue_size = 20
+
+default_offline_spool_size_in_kb = 256
+default_offline_replay_per_second = 2
+
+default_max_silence_in_minutes = 30
+
+# sample cheap values every few seconds (0 = don't sample)
+min_sample_interval_in_seconds = 2
+max_sample_interval_in_seconds = 60
+default_sample_interval_in_seconds = 0
+
+# report the processes using the most CPU and memory (0 = don't)
+max_top_processes = 10
+default_top_processes = 0
+
+# how much a value must change to be worth publishing, keyed by field within
+#  our 'info' payload (nested fields joined by '.', may contain '*' wildcards)
+deadbands = OrderedDict([
+    ('temperature_c', 0.5),
+    ('temp_gpu_c', 0.5),
+    ('temp_cpu_c', 0.5),
+    ('mem_used_prcnt', 2),
+    ('fs_used_prcnt', 1),
+    ('fs_free_prcnt', 1),
+    ('memory.free_mb', 50),
+    ('memory.free_swap', 50),
+    ('cpu.load_*', 10),
+    ('cpu.busy_prcnt', 10),
+    ('cpu.iowait_prcnt', 5),
+    ('cpu.steal_prcnt', 5),
+    ('cpu.cores.*', 10),
+    ('drives.*.used_prcnt', 1),
+    ('drives.*_bytes_s', 102400),
+    ('drives.*.iops', 10),
+    ('drives.*.busy_prcnt', 10),
+    ('drives.*.written_mb', 100),
+    ('networking.*.rx_data', 100),
+    ('networking.*.tx_data', 100),
+    ('reporter_usage.rss_kb', 1024),
+    ('reporter_usage.rss_peak_kb', 1024),
+    ('reporter_usage.cpu_*_ms', 1000),
+    ('reporter_usage.cpu_prcnt', 1),
+    ('reporter_usage.children_*', 1000),
+    ('samples.temperature_c.*', 0.5),
+    ('samples.cpu_busy_prcnt.*', 10),
+    ('samples.mem_used_prcnt.*', 2),
+    ('samples.net_*.*', 100),
+    ('top_processes.*.cpu_prcnt', 10),
+    ('top_processes.*.rss_kb', 10240),
+])
+deadbandErrors = []
+
+
+def loadConfiguration(configDir=None):
+    # set our settings from config.ini found in configDir (None: just our defaults)
+    global daemon_enabled
+    global update_flag_filespec
+    global base_topic
+    global sensor_name
+    global discovery_prefix
+    global interval_in_minutes
+    global check_interval_in_hours
+    global fallback_domain
+    global daemon_runtime
+    global network_interfaces_include
+    global network_interfaces_exclude
+    global videocore_backend
+    global cpu_use_source
+    global publish_static_separately
+    global publish_sensor_states
+    global publish_reporter_usage_sensors
+    global publish_diagnostics
+    global log_to_journal
+    global publish_overflow
+    global publish_queue_size
+    global offline_spool_fspec
+    global offline_spool_size_in_kb
+    global offline_replay_per_second
+    global publish_on_change
+    global max_silence_in_minutes
+    global sample_interval_in_seconds
+    global top_processes
+    global publish_sample_sensors
+    if configDir is not None:
+        try:
+            with open(os.path.join(configDir, 'config.ini')) as config_file:
+                config.read_file(config_file)
+        except IOError:
+            print_line('No configuration file "config.ini"', error=True, sd_notify=True)
+            sys.exit(1)
+
+    daemon_enabled = config['Daemon'].getboolean('enabled', True)
+
+    update_flag_filespec = config['Daemon'].get(
+        'update_flag_filespec', default_update_flag_filespec)
+
+    base_topic = config['MQTT'].get('base_topic', default_base_topic).lower()
+
+    # Sensor name could be set either via configuration file or `MQTT_SENSOR_NAME`
+    # environment variable, the latter takes precedence
+    sensor_name = os.environ.get(
+        "MQTT_SENSOR_NAME", config['MQTT'].get('sensor_name', default_sensor_name)
+    ).lower()
+
+    discovery_prefix = config['MQTT'].get(
+        'discovery_prefix', default_discovery_prefix).lower()
+
+    interval_in_minutes = config['Daemon'].getint(
+        'interval_in_minutes', default_interval_in_minutes)
+
+    check_interval_in_hours = config['Daemon'].getint(
+        'check_updates_in_hours', default_check_interval_in_hours)
+
+    fallback_domain = config['Daemon'].get(
+        'fallback_domain', default_domain).lower()
+
+    daemon_runtime = config['Daemon'].get('runtime', default_daemon_runtime).lower()
+
+    network_interfaces_include = [pattern.strip() for pattern in config['Daemon'].get(
+        'network_interfaces_include', default_network_interfaces_include).split(',') if len(pattern.strip()) > 0]
+    network_interfaces_exclude = [pattern.strip() for pattern in config['Daemon'].get(
+        'network_interfaces_exclude', default_network_interfaces_exclude).split(',') if len(pattern.strip()) > 0]
+
+    videocore_backend = config['Daemon'].get(
+        'videocore_backend', default_videocore_backend).lower()
+
+    cpu_use_source = config['Daemon'].get('cpu_use_source', default_cpu_use_source).lower()
+
+    if config.has_section('Commands'):
+        commandSet = dict(config['Commands'].items())
+        if len(commandSet) > 0:
+            commands.update(commandSet)
+
+    # publish device facts which don't change between reboots once (retained) on
+    #  their own topic instead of within every report
+    publish_static_separately = config['Daemon'].getboolean('publish_static_separately', False)
+
+    # also publish each sensor's value as a plain payload on its own topic so Home
+    #  Assistant doesn't have to parse the whole report once per sensor
+    publish_sensor_states = config['Daemon'].getboolean('publish_sensor_states', False)
+
+    # advertise our own resource usage (reporter_usage) as Home Assistant entities
+    publish_reporter_usage_sensors = config['Daemon'].getboolean('publish_reporter_usage_sensors', False)
+
+    # publish how long each of our collectors and publish steps take on a diagnostics topic
+    publish_diagnostics = config['Daemon'].getboolean('publish_diagnostics', False)
+
+    # send our log lines to the systemd journal (with structured fields) instead of stdout/stderr
+    log_to_journal = config['Daemon'].getboolean('log_to_journal', False)
+    if log_to_journal:
+        enableJournalLogging()
+
+    publish_overflow = config['Daemon'].get('publish_overflow', default_publish_overflow).lower()
+    publish_queue_size = config['Daemon'].getint('publish_queue_size', default_publish_queue_size)
+
+    # keep reports made while the broker is unreachable in a file, replay them once reconnected
+    offline_spool_fspec = config['Daemon'].get('offline_spool_file', '')
+    offline_spool_size_in_kb = config['Daemon'].getint('offline_spool_size_in_kb', default_offline_spool_size_in_kb)
+    offline_replay_per_second = config['Daemon'].getint('offline_replay_per_second', default_offline_replay_per_second)
+
+    # publish only when values change significantly (or when we've been quiet too long)
+    publish_on_change = config['Daemon'].getboolean('publish_on_change', False)
+    max_silence_in_minutes = config['Daemon'].getint(
+        'max_silence_in_minutes', default_max_silence_in_minutes)
+
+    # sample temperature, CPU, memory and network rates every few seconds and report
+    #  min/max/mean/p95 of each report period, so we see the spikes between reports
+    sample_interval_in_seconds = config['Daemon'].getint(
+        'sample_interval_in_seconds', default_sample_interval_in_seconds)
+    publish_sample_sensors = config['Daemon'].getboolean('publish_sample_sensors', False)
+
+    # report which processes use the most CPU and memory, so a hot or short-of-memory
+    #  RPi's culprit is seen without logging in to it
+    top_processes = config['Daemon'].getint('top_processes', default_top_processes)
+
+    if config.has_section('Deadbands'):
+        for [field, deadband_raw] in config['Deadbands'].items():
+            try:
+                deadbands[field] = float(deadband_raw)
+            except ValueError:
+                deadbandErrors.append(field)
+            else:
+                deadbands.move_to_end(field, last=False)    # user settings take precedence
+
+
+loadConfiguration()  # our defaults, main() loads config.ini
 
 # -----------------------------------------------------------------------------
 #  Commands Subscription
@@ -302,23 +672,85 @@ if config.has_section('Commands'):
 
 # Check configuration
 #
-if (interval_in_minutes < min_interval_in_minutes) or (interval_in_minutes > max_interval_in_minutes):
-    print_line('ERROR: Invalid "interval_in_minutes" found in configuration file: "config.ini"! Must be [{}-{}] Fix and try again... Aborting'.format(
-        min_interval_in_minutes, max_interval_in_minutes), error=True, sd_notify=True)
-    sys.exit(1)
+def checkConfiguration():
+    if (interval_in_minutes < min_interval_in_minutes) or (interval_in_minutes > max_interval_in_minutes):
+        print_line('ERROR: Invalid "interval_in_minutes" found in configuration file: "config.ini"! Must be [{}-{}] Fix and try again... Aborting',
+            min_interval_in_minutes, max_interval_in_minutes, error=True, sd_notify=True)
+        sys.exit(1)
+
+    if len(deadbandErrors) > 0:
+        print_line('ERROR: Invalid [Deadbands] value(s) for [{}] found in configuration file: "config.ini"! Must be numbers. Fix and try again... Aborting',
+            ', '.join(deadbandErrors), error=True, sd_notify=True)
+        sys.exit(1)
+
+    if publish_on_change and max_silence_in_minutes < interval_in_minutes:
+        print_line('ERROR: Invalid "max_silence_in_minutes" found in configuration file: "config.ini"! Must not be less than "interval_in_minutes" ({}) Fix and try again... Aborting',
+            interval_in_minutes, error=True, sd_notify=True)
+        sys.exit(1)
+
+    if publish_overflow not in publish_overflow_names:
+        print_line('ERROR: Invalid "publish_overflow" found in configuration file: "config.ini"! Must be one of [{}] Fix and try again... Aborting',
+            ', '.join(publish_overflow_names), error=True, sd_notify=True)
+        sys.exit(1)
 
-if (check_interval_in_hours < min_check_interval_in_hours) or (check_interval_in_hours > max_check_interval_in_hours):
-    print_line('ERROR: Invalid "check_updates_in_hours" found in configuration file: "config.ini"! Must be [{}-{}] Fix and try again... Aborting'.format(
-        min_check_interval_in_hours, max_check_interval_in_hours), error=True, sd_notify=True)
-    sys.exit(1)
+    if publish_queue_size < 1:
+        print_line('ERROR: Invalid "publish_queue_size" found in configuration file: "config.ini"! Must be 1 or more. Fix and try again... Aborting',
+                   error=True, sd_notify=True)
+        sys.exit(1)
 
-# Ensure required values within sections of our config are present
-if not config['MQTT']:
-    print_line('ERROR: No MQTT settings found in configuration file "config.ini"! Fix and try again... Aborting',
-               error=True, sd_notify=True)
-    sys.exit(1)
+    if offline_spool_fspec != '' and offline_spool_size_in_kb < 4:
+        print_line('ERROR: Invalid "offline_spool_size_in_kb" found in configuration file: "config.ini"! Must be 4 or more. Fix and try again... Aborting',
+                   error=True, sd_notify=True)
+        sys.exit(1)
+
+    if offline_spool_fspec != '' and offline_replay_per_second < 1:
+        print_line('ERROR: Invalid "offline_replay_per_second" found in configuration file: "config.ini"! Must be 1 or more. Fix and try again... Aborting',
+                   error=True, sd_notify=True)
+        sys.exit(1)
+
+    if sample_interval_in_seconds != 0 and ((sample_interval_in_seconds < min_sample_interval_in_seconds) or (sample_interval_in_seconds > max_sample_interval_in_seconds)):
+        print_line('ERROR: Invalid "sample_interval_in_seconds" found in configuration file: "config.ini"! Must be 0 or [{}-{}] Fix and try again... Aborting',
+            min_sample_interval_in_seconds, max_sample_interval_in_seconds, error=True, sd_notify=True)
+        sys.exit(1)
+
+    if daemon_runtime not in daemon_runtime_names:
+        print_line('ERROR: Invalid "runtime" found in configuration file: "config.ini"! Must be one of [{}] Fix and try again... Aborting',
+            ', '.join(daemon_runtime_names), error=True, sd_notify=True)
+        sys.exit(1)
+
+    if daemon_runtime == 'asyncio' and not hasattr(mqtt.Client, 'on_socket_open'):
+        print_line('ERROR: "runtime = asyncio" requires paho-mqtt v1.5.1 or later! Upgrade or use "runtime = threads"... Aborting',
+                   error=True, sd_notify=True)
+        sys.exit(1)
+
+    if videocore_backend not in videocore_backend_names:
+        print_line('ERROR: Invalid "videocore_backend" found in configuration file: "config.ini"! Must be one of [{}] Fix and try again... Aborting',
+            ', '.join(videocore_backend_names), error=True, sd_notify=True)
+        sys.exit(1)
+
+    if (top_processes < 0) or (top_processes > max_top_processes):
+        print_line('ERROR: Invalid "top_processes" found in configuration file: "config.ini"! Must be [0-{}] Fix and try again... Aborting',
+            max_top_processes, error=True, sd_notify=True)
+        sys.exit(1)
+
+    if cpu_use_source not in cpu_use_source_names:
+        print_line('ERROR: Invalid "cpu_use_source" found in configuration file: "config.ini"! Must be one of [{}] Fix and try again... Aborting',
+            ', '.join(cpu_use_source_names), error=True, sd_notify=True)
+        sys.exit(1)
+
+    if (check_interval_in_hours < min_check_interval_in_hours) or (check_interval_in_hours > max_check_interval_in_hours):
+        print_line('ERROR: Invalid "check_updates_in_hours" found in configuration file: "config.ini"! Must be [{}-{}] Fix and try again... Aborting',
+            min_check_interval_in_hours, max_check_interval_in_hours, error=True, sd_notify=True)
+        sys.exit(1)
+
+    # Ensure required values within sections of our config are present
+    if not config['MQTT']:
+        print_line('ERROR: No MQTT settings found in configuration file "config.ini"! Fix and try again... Aborting',
+                   error=True, sd_notify=True)
+        sys.exit(1)
+
+    print_line('Configuration accepted', console=False, sd_notify=True)
 
-print_line('Configuration accepted', console=False, sd_notify=True)
 
 # -----------------------------------------------------------------------------
 #  Daemon variables monitored
@@ -328,10 +760,23 @@ daemon_version_list = ['NOT-LOADED']
 daemon_last_fetch_time = 0.0
 
 
+def importRequests():
+    global requests_module
+    if requests_module is None:
+        import requests
+        from urllib3.exceptions import InsecureRequestWarning
+        # turn off insecure connection warnings (our KZ0Q site has bad certs)
+        # REF: https://www.geeksforgeeks.org/how-to-disable-security-certificate-checks-for-requests-in-python/
+        requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+        requests_module = requests
+    return requests_module
+
+
 def getDaemonReleases():
     # retrieve latest formal release versions list from repo
     global daemon_version_list
     global daemon_last_fetch_time
+    requests = importRequests()
 
     newVersionList = []
     latestVersion = ''
@@ -342,7 +787,7 @@ def getDaemonReleases():
         response = requests.request('GET', 'http://kz0q.com/daemon-releases', verify=False, timeout=10)
         response.raise_for_status()
     except requests.exceptions.RequestException as exc:
-        print_line('- getDaemonReleases() RQST exception=({})'.format(exc), error=True)
+        print_line('- getDaemonReleases() RQST exception=({})', exc, error=True)
         error = True
 
     if not error:
@@ -369,14 +814,10 @@ def getDaemonReleases():
                 newVersionList.insert(0, latestVersion)  # append to list
 
         daemon_version_list = newVersionList
-        print_line('- RQST daemon_version_list=({})'.format(daemon_version_list), debug=True)
+        print_line('- RQST daemon_version_list=({})', daemon_version_list, debug=True)
         daemon_last_fetch_time = time()    # record when we last fetched the versions
 
 
-getDaemonReleases()  # and load them!
-print_line('* daemon_last_fetch_time=({})'.format(daemon_last_fetch_time), debug=True)
-
-
 # -----------------------------------------------------------------------------
 #  Command invocation thru shell
 def invoke_shell_cmd(cmd):
@@ -386,6 +827,9 @@ def invoke_shell_cmd(cmd):
     # doesn't work for some shells, presumably due to argument processing
     # order, so invoking shell needs to be specified explicitly with the option
     # follows.
+    countChildForked()
+    if publish_diagnostics:
+        countCollectorIO(forks=1)
     out = subprocess.Popen(['bash', '-o', 'pipefail', '-c', cmd],
                            shell=False,
                            stdout=subprocess.PIPE,
@@ -395,6 +839,232 @@ def invoke_shell_cmd(cmd):
     return stdout, stderr, out.returncode
 
 
+# -----------------------------------------------------------------------------
+#  Collector timing diagnostics (see publish_diagnostics)
+# -----------------------------------------------------------------------------
+#
+# Each collector run (and publish step) is timed and its forks and bytes read
+#  are counted. We keep running statistics and a histogram per step.
+
+# histogram bucket upper bounds (ms), the last bucket counts anything slower
+K_DIAG_HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+# forks and bytes read by the step running on this thread
+collector_io = threading.local()
+
+# step name -> dict of timing statistics
+step_timings = OrderedDict()
+step_timings_lock = threading.Lock()
+# tuple { name, ms } of the slowest collector of this cycle, and the duration of our last cycle
+cycle_slowest_collector = ('', 0.0)
+last_cycle_ms = 0.0
+
+
+def countCollectorIO(forks=0, bytesRead=0):
+    collector_io.forks = getattr(collector_io, 'forks', 0) + forks
+    collector_io.bytes_read = getattr(collector_io, 'bytes_read', 0) + bytesRead
+
+
+def startStepTiming():
+    collector_io.forks = 0
+    collector_io.bytes_read = 0
+    return monotonic_ns()
+
+
+def recordStepTiming(stepName, startNs, isCollector=False):
+    global cycle_slowest_collector
+    elapsedMs = (monotonic_ns() - startNs) / 1000000.0
+    bucketIdx = bisect.bisect_left(K_DIAG_HISTOGRAM_BOUNDS_MS, elapsedMs)
+    with step_timings_lock:
+        timing = step_timings.get(stepName)
+        if timing is None:
+            timing = dict(runs=0, last_ms=0.0, max_ms=0.0, total_ms=0.0, forks=0, bytes_read=0,
+                          histogram=[0] * (len(K_DIAG_HISTOGRAM_BOUNDS_MS) + 1))
+            step_timings[stepName] = timing
+        timing['runs'] += 1
+        timing['last_ms'] = elapsedMs
+        timing['max_ms'] = max(timing['max_ms'], elapsedMs)
+        timing['total_ms'] += elapsedMs
+        timing['forks'] = collector_io.forks
+        timing['bytes_read'] = collector_io.bytes_read
+        timing['histogram'][bucketIdx] += 1
+        if isCollector and elapsedMs > cycle_slowest_collector[1]:
+            cycle_slowest_collector = (stepName, elapsedMs)
+
+
+def startCycleTiming():
+    global cycle_slowest_collector
+    cycle_slowest_collector = ('', 0.0)
+    return monotonic_ns()
+
+
+def recordCycleTiming(startNs):
+    global last_cycle_ms
+    last_cycle_ms = (monotonic_ns() - startNs) / 1000000.0
+    print_line('- report cycle took ({:.1f} ms), slowest collector [{}] ({:.1f} ms)',
+               last_cycle_ms, cycle_slowest_collector[0], cycle_slowest_collector[1], debug=True)
+
+
+def getDiagnosticsDictionary():
+    diagnostics = OrderedDict()
+    diagnostics['cycle_ms'] = round(last_cycle_ms, 1)
+    diagnostics['slowest_collector'] = cycle_slowest_collector[0]
+    diagnostics['slowest_collector_ms'] = round(cycle_slowest_collector[1], 1)
+    # source reads our collection tiers saved: in the last refresh and since startup
+    diagnostics['reads_avoided'] = fact_reads_avoided
+    diagnostics['reads_avoided_total'] = fact_reads_avoided_total
+    steps = OrderedDict()
+    with step_timings_lock:
+        for stepName, timing in step_timings.items():
+            stepData = OrderedDict()
+            stepData['runs'] = timing['runs']
+            stepData['last_ms'] = round(timing['last_ms'], 2)
+            stepData['max_ms'] = round(timing['max_ms'], 2)
+            stepData['avg_ms'] = round(timing['total_ms'] / timing['runs'], 2)
+            stepData['forks'] = timing['forks']
+            stepData['bytes_read'] = timing['bytes_read']
+            stepData['histogram'] = list(timing['histogram'])
+            steps[stepName] = stepData
+    diagnostics['steps'] = steps
+    diagnostics['histogram_bounds_ms'] = K_DIAG_HISTOGRAM_BOUNDS_MS
+    publishData = OrderedDict()
+    publishData['queue_drops'] = publish_queue_drops
+    publishData['queue_coalesced'] = publish_queue_coalesced
+    publishData['inflight'] = len(publish_inflight)
+    publishData['ack_last_ms'] = round(publish_ack_latency_last * 1000.0, 1)
+    publishData['ack_max_ms'] = round(publish_ack_latency_max * 1000.0, 1)
+    if publish_ack_count > 0:
+        publishData['ack_avg_ms'] = round(publish_ack_latency_total * 1000.0 / publish_ack_count, 1)
+    diagnostics['publish'] = publishData
+    jobs = OrderedDict()
+    for jobName, job in scheduler_jobs.items():
+        jobData = OrderedDict()
+        jobData['runs'] = job['runs']
+        jobData['overruns'] = job['overruns']
+        jobData['max_lateness_ms'] = round(job['max_lateness'] * 1000.0, 1)
+        jobData['max_duration_ms'] = round(job['max_duration'] * 1000.0, 1)
+        jobs[jobName] = jobData
+    diagnostics['jobs'] = jobs
+    return diagnostics
+
+
+def publishDiagnostics(timestamp):
+    diagnostics = OrderedDict()
+    diagnostics[SCRIPT_TIMESTAMP] = timestamp.astimezone().replace(microsecond=0).isoformat()
+    diagnostics.update(getDiagnosticsDictionary())
+    diagnosticsTopDict = OrderedDict()
+    diagnosticsTopDict[K_LD_PAYLOAD_NAME] = diagnostics
+    publishMonitorData(diagnosticsTopDict, diagnostics_topic)
+
+
+# -----------------------------------------------------------------------------
+#  Native /proc and /sys file reading (no fork)
+# -----------------------------------------------------------------------------
+
+# open file descriptors kept across report cycles, keyed by filespec
+native_file_fds = {}
+K_NATIVE_READ_CHUNK = 4096
+
+
+def read_native_file(fspec):
+    # Read a /proc or /sys file directly. The file descriptor is opened once
+    # and then re-read from offset zero with pread() each time we are called,
+    # the kernel regenerates the content for us on every read from the start.
+    # Returns the decoded content or None if the file can't be read.
+    fd = native_file_fds.get(fspec)
+    try:
+        if fd is None:
+            fd = os.open(fspec, os.O_RDONLY)
+            native_file_fds[fspec] = fd
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(fd, K_NATIVE_READ_CHUNK, offset)
+            if len(chunk) == 0:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+    except OSError as exc:
+        print_line('read_native_file({}) exception=({})', fspec, exc, debug=True)
+        close_native_file(fspec)
+        return None
+    if publish_diagnostics:
+        countCollectorIO(bytesRead=offset)
+    return b''.join(chunks).decode('utf-8', errors='replace')
+
+
+def close_native_file(fspec):
+    fd = native_file_fds.pop(fspec, None)
+    if fd is not None:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+# -----------------------------------------------------------------------------
+#  Counter rates
+# -----------------------------------------------------------------------------
+#
+# The kernel's traffic, disk and CPU counters only ever count up, we turn them
+#  into rates from the change between two of our readings. A counter which went
+#  backwards has either wrapped (32-bit counters on 32-bit kernels) or been reset
+#  (e.g. its interface was restarted).
+
+K_COUNTER_WRAP_32 = 2 ** 32
+
+
+def getKernelCounterWrap(machine):
+    # where the kernel's 'unsigned long' counters (diskstats, most network drivers) wrap,
+    #  None on 64-bit kernels: a 64-bit counter doesn't wrap in a device's lifetime so
+    #  any decrease is a reset. (uname's machine is the kernel's: a 32-bit userland on
+    #  a 64-bit kernel reports aarch64, or armv8l in 32-bit mode)
+    if '64' in machine or machine in ['armv8l', 's390x']:
+        return None
+    return K_COUNTER_WRAP_32
+
+
+K_COUNTER_WRAP_NATIVE = getKernelCounterWrap(os.uname().machine)
+
+# tuple { counter value, monotonic time } of our last reading, keyed by tuple { kind, name, counter }
+counter_readings = {}
+counter_readings_lock = threading.Lock()
+
+
+def getCounterRate(counterKey, value, timeNow=None, wrapAt=None):
+    # change per second since our last reading of this counter, None when we
+    #  can't tell (our first reading, or the counter was reset). wrapAt is where
+    #  the counter wraps, None for counters which never do
+    if timeNow is None:
+        timeNow = monotonic()
+    with counter_readings_lock:
+        priorReading = counter_readings.get(counterKey)
+        counter_readings[counterKey] = (value, timeNow)
+    if priorReading is None:
+        return None
+    priorValue, priorTime = priorReading
+    elapsed = timeNow - priorTime
+    if elapsed <= 0:
+        return None
+    delta = value - priorValue
+    if delta < 0:
+        # wrapped: we'd been in the top half of the counter's range and are now a short way past its end
+        if wrapAt is not None and wrapAt // 2 <= priorValue < wrapAt and value + wrapAt - priorValue < wrapAt // 2:
+            delta += wrapAt
+        else:
+            print_line('counter {} reset ({} -> {})', counterKey, priorValue, value, debug=True)
+            return None
+    return delta / elapsed
+
+
+def forgetCounters(kind, keepNames):
+    # drop our readings of counters (of this kind) whose source has gone away
+    with counter_readings_lock:
+        for counterKey in list(counter_readings.keys()):
+            if counterKey[0] == kind and counterKey[1] not in keepNames:
+                del counter_readings[counterKey]
+
+
 # -----------------------------------------------------------------------------
 #  RPi variables monitored
 # -----------------------------------------------------------------------------
@@ -421,31 +1091,45 @@ rpi_cpu_temp = ''
 rpi_mqtt_script = script_info
 rpi_interfaces = []
 rpi_filesystem = []
+# deviceID (major:minor) -> tuple { read bytes/s, write bytes/s, IOPS, busy %, MB written since boot }
+rpi_disk_io = {}
 # Tuple (Total, Free, Avail., Swap Total, Swap Free)
 rpi_memory_tuple = ''
-# Tuple (Hardware, Model Name, NbrCores, BogoMIPS, Serial)
+# Tuple (Hardware, Model Name, NbrCores, BogoMIPS, Serial) - never changes
+rpi_cpu_identity_tuple = ''
+# Tuple (Hardware, Model Name, NbrCores, BogoMIPS, Serial, Load1, Load5, Load15)
 rpi_cpu_tuple = ''
+# 'cpu' (all cores) and each core -> Tuple (Busy %, IOWait %, Steal %)
+rpi_cpu_usage = OrderedDict()
 # for thermal status reporting
 rpi_throttle_status = []
 # new cpu loads
 rpi_cpuload1 = ''
 rpi_cpuload5 = ''
 rpi_cpuload15 = ''
-rpi_update_count = 0
+rpi_update_count = None     # unknown until our first count finishes
+# Tuple (RSS kB, peak RSS kB, Threads, CPU user ms, CPU sys ms, CPU %, Children CPU ms, Children forked)
+rpi_reporter_usage_tuple = ''
+# processes we've started since startup (from several threads)
+children_forked = 0
+children_forked_lock = threading.Lock()
+# Tuple (list by CPU, list by RSS) of Tuple (PID, Name, Command line, CPU %, RSS kB)
+rpi_top_processes = ''
+
 
-if apt_available == False:
-    rpi_update_count = -1   # if packaging system not avail. report -1
+def countChildForked():
+    global children_forked
+    with children_forked_lock:
+        children_forked += 1
 
-# Time for network transfer calculation
-previous_time = time()
 
 # -----------------------------------------------------------------------------
 #  monitor variable fetch routines
 #
 
 
-def getDeviceCpuInfo():
-    global rpi_cpu_tuple
+def getDeviceCpuIdentity():
+    global rpi_cpu_identity_tuple
     #  cat /proc/cpuinfo | /bin/egrep -i "processor|model|bogo|hardware|serial"
     # MULTI-CORE
     #  processor	: 0
@@ -470,50 +1154,108 @@ def getDeviceCpuInfo():
     #  Hardware	: BCM2835
     #  Serial		: 00000000131030c0
     #  Model		: Raspberry Pi Zero W Rev 1.1
-    stdout, _, returncode = invoke_shell_cmd("cat /proc/cpuinfo | /bin/egrep -i 'processor|model|bogo|hardware|serial'")
-    print_line('getDvcCPUinfo() stdout=[{}], retCode=({})'.format(stdout, returncode), debug=True)
+    cpuinfo_raw = read_native_file('/proc/cpuinfo')
+    print_line('getDvcCPUidentity() cpuinfo_raw=[{}]', cpuinfo_raw, debug=True)
+    rpi_cpu_identity_tuple = parseCpuInfo(cpuinfo_raw)
+    print_line('rpi_cpu_identity_tuple=[{}]', rpi_cpu_identity_tuple, debug=True)
+
+
+def parseCpuInfo(cpuinfo_raw):
+    # Tuple (Hardware, Model Name, NbrCores, BogoMIPS, Serial) from /proc/cpuinfo content
     lines = []
-    if not returncode:
-        lines = stdout.decode('utf-8').split("\n")
-    trimmedLines = []
-    for currLine in lines:
-        trimmedLine = currLine.lstrip().rstrip()
-        trimmedLines.append(trimmedLine)
+    if cpuinfo_raw is not None:
+        lines = cpuinfo_raw.split("\n")
     cpu_hardware = ''   # 'hardware'
     cpu_cores = 0       # count of 'processor' lines
     cpu_model = ''      # 'model name'
     cpu_bogoMIPS = 0.0  # sum of 'BogoMIPS' lines
     cpu_serial = ''     # 'serial'
-    for currLine in trimmedLines:
-        lineParts = currLine.split(':')
-        currValue = '{?unk?}'
-        if len(lineParts) >= 2:
-            currValue = lineParts[1].lstrip().rstrip()
-        if 'Hardware' in currLine:
+    for currLine in lines:
+        lineParts = currLine.split(':', 1)
+        if len(lineParts) < 2:
+            continue
+        currKey = lineParts[0].strip()
+        currValue = lineParts[1].strip()
+        if currKey == 'Hardware':
             cpu_hardware = currValue
-        if 'model name' in currLine:
+        elif currKey == 'model name':
             cpu_model = currValue
-        if 'BogoMIPS' in currLine:
+        elif currKey == 'BogoMIPS':
             cpu_bogoMIPS += float(currValue)
-        if 'processor' in currLine:
+        elif currKey == 'processor':
             cpu_cores += 1
-        if 'Serial' in currLine:
+        elif currKey == 'Serial':
             cpu_serial = currValue
 
-    stdout, _, returncode = invoke_shell_cmd('/bin/cat /proc/loadavg')
-    print_line('getDvcCPUinfo() stdout=[{}], retCode=({})'.format(stdout, returncode), debug=True)
+    return (cpu_hardware, cpu_model, cpu_cores, cpu_bogoMIPS, cpu_serial)
+
+
+def getDeviceCpuLoads():
+    global rpi_cpu_tuple
+    cpu_cores = rpi_cpu_identity_tuple[2]
+    loadavg_raw = read_native_file('/proc/loadavg')
+    print_line('getDvcCPUloads() loadavg_raw=[{}]', loadavg_raw, debug=True)
+    rpi_cpu_tuple = rpi_cpu_identity_tuple + parseLoadAvg(loadavg_raw, cpu_cores)
+    print_line('rpi_cpu_tuple=[{}]', rpi_cpu_tuple, debug=True)
+
+
+def parseLoadAvg(loadavg_raw, cpu_cores):
+    # Tuple (Load1, Load5, Load15) as percent of all cores from /proc/loadavg content
+    #  $ cat /proc/loadavg
+    #  0.52 0.58 0.59 1/339 12345
     cpu_loads_raw = [-1.0] * 3
-    if not returncode:
-        cpu_loads_raw = stdout.decode('utf-8').split()
-    print_line('cpu_loads_raw=[{}]'.format(cpu_loads_raw), debug=True)
+    if loadavg_raw is not None:
+        cpu_loads_raw = loadavg_raw.split()
     cpu_load1 = round(float(float(cpu_loads_raw[0]) / int(cpu_cores) * 100), 1)
     cpu_load5 = round(float(float(cpu_loads_raw[1]) / int(cpu_cores) * 100), 1)
     cpu_load15 = round(float(float(cpu_loads_raw[2]) / int(cpu_cores) * 100), 1)
-
-    # Tuple (Hardware, Model Name, NbrCores, BogoMIPS, Serial)
-    rpi_cpu_tuple = (cpu_hardware, cpu_model, cpu_cores,
-                     cpu_bogoMIPS, cpu_serial, cpu_load1, cpu_load5, cpu_load15)
-    print_line('rpi_cpu_tuple=[{}]'.format(rpi_cpu_tuple), debug=True)
+    return (cpu_load1, cpu_load5, cpu_load15)
+
+
+def getDeviceCpuUsage():
+    global rpi_cpu_usage
+    stat_raw = read_native_file('/proc/stat')
+    if stat_raw is None:
+        return
+    timeNow = monotonic()
+    cpuUsage = OrderedDict()
+    cpuNames = []
+    for cpuName, cpuTimes in parseProcStat(stat_raw).items():
+        cpuNames.append(cpuName)
+        totalJiffies, busyJiffies, iowaitJiffies, stealJiffies = cpuTimes
+        totalRate = getCounterRate(('cpu', cpuName, 'total'), totalJiffies, timeNow, wrapAt=None)
+        rates = [getCounterRate(('cpu', cpuName, counterName), jiffies, timeNow, wrapAt=None)
+                 for counterName, jiffies in [('busy', busyJiffies), ('iowait', iowaitJiffies), ('steal', stealJiffies)]]
+        if not totalRate:
+            # our first reading (or the core was just brought online): since boot
+            totalRate = totalJiffies
+            rates = [busyJiffies, iowaitJiffies, stealJiffies]
+        else:
+            # the kernel can step a core's iowait back a little, count that as none
+            rates = [rate if rate is not None else 0.0 for rate in rates]
+        if totalRate > 0:
+            cpuUsage[cpuName] = tuple(round(min(rate / totalRate * 100.0, 100.0), 1) for rate in rates)
+    forgetCounters('cpu', cpuNames)
+    rpi_cpu_usage = cpuUsage
+    print_line('rpi_cpu_usage=[{}]', rpi_cpu_usage, debug=True)
+
+
+def parseProcStat(stat_raw):
+    # 'cpu' (all cores) and each core -> Tuple (Total, Busy, IOWait, Steal) jiffies from /proc/stat content
+    #  $ cat /proc/stat
+    #  cpu  10132153 290696 3084719 46828483 16683 0 25195 0 0 0
+    #  cpu0 1393280 32966 572056 13343292 6130 0 17875 0 0 0
+    #       user    nice   system  idle     iowait irq softirq steal guest guest_nice
+    cpuTimes = OrderedDict()
+    for currLine in stat_raw.split('\n'):
+        if not currLine.startswith('cpu'):
+            break   # the cpu lines come first
+        lineParts = currLine.split()
+        jiffies = [int(value) for value in lineParts[1:9]] + [0] * (9 - len(lineParts))
+        totalJiffies = sum(jiffies)     # guest time is already within user time
+        idleJiffies = jiffies[3] + jiffies[4]
+        cpuTimes[lineParts[0]] = (totalJiffies, totalJiffies - idleJiffies, jiffies[4], jiffies[7])
+    return cpuTimes
 
 
 def getDeviceMemory():
@@ -522,14 +1264,16 @@ def getDeviceMemory():
     #  MemTotal:         948304 kB
     #  MemFree:           40632 kB
     #  MemAvailable:     513332 kB
-    stdout, _, returncode = invoke_shell_cmd('cat /proc/meminfo')
-    lines = []
-    if not returncode:
-        lines = stdout.decode('utf-8').split("\n")
+    meminfo_raw = read_native_file('/proc/meminfo')
+    rpi_memory_tuple = parseMemInfo(meminfo_raw)
+    print_line('rpi_memory_tuple=[{}]', rpi_memory_tuple, debug=True)
+
+
+def parseMemInfo(meminfo_raw):
+    # Tuple (Total, Free, Avail., Swap Total, Swap Free) in MB from /proc/meminfo content
     trimmedLines = []
-    for currLine in lines:
-        trimmedLine = currLine.lstrip().rstrip()
-        trimmedLines.append(trimmedLine)
+    if meminfo_raw is not None:
+        trimmedLines = meminfo_raw.split("\n")
     mem_total = ''
     mem_free = ''
     mem_avail = ''
@@ -548,10 +1292,178 @@ def getDeviceMemory():
         if 'SwapFree' in currLine:
             swap_free = float(lineParts[1]) / 1024
 
-    # Tuple (Total, Free, Avail., Swap Total, Swap Free)
     # [0]=total, [1]=free, [2]=avail., [3]=swap total, [4]=swap free
-    rpi_memory_tuple = (mem_total, mem_free, mem_avail, swap_total, swap_free)
-    print_line('rpi_memory_tuple=[{}]'.format(rpi_memory_tuple), debug=True)
+    return (mem_total, mem_free, mem_avail, swap_total, swap_free)
+
+
+# our own prior CPU times (seconds) and when we read them, for our per cycle figures
+K_CLOCK_TICKS_PER_SECOND = os.sysconf('SC_CLK_TCK')
+reporter_prior_cpu = None
+
+
+def getReporterUsage():
+    # what we (this daemon) cost: memory, CPU and the processes we start
+    global rpi_reporter_usage_tuple
+    global reporter_prior_cpu
+    #  $ cat /proc/self/stat
+    #  1234 (python3) S 1 1234 ... utime(14) stime(15) ... num_threads(20) ...
+    stat_raw = read_native_file('/proc/self/stat')
+    status_raw = read_native_file('/proc/self/status')
+    if stat_raw is None or status_raw is None:
+        return
+    userSecs, sysSecs, threadCount, startedSecs = parseProcessStat(stat_raw)
+    rssKb, rssPeakKb = parseProcessMemory(status_raw)
+    # our children are counted once they've finished (and we waited for them)
+    childUsage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    childSecs = childUsage.ru_utime + childUsage.ru_stime
+
+    timeNow = monotonic()
+    if reporter_prior_cpu is None:
+        # first time: our figures are since our process started
+        startedSecsAgo = clock_gettime(CLOCK_BOOTTIME) - startedSecs
+        reporter_prior_cpu = (timeNow - startedSecsAgo, 0.0, 0.0, 0.0)
+    priorTime, priorUserSecs, priorSysSecs, priorChildSecs = reporter_prior_cpu
+    reporter_prior_cpu = (timeNow, userSecs, sysSecs, childSecs)
+    cpuPercent = 0.0
+    if timeNow > priorTime:
+        cpuPercent = (userSecs - priorUserSecs + sysSecs - priorSysSecs) / (timeNow - priorTime) * 100.0
+
+    rpi_reporter_usage_tuple = (rssKb, rssPeakKb, threadCount,
+                                round((userSecs - priorUserSecs) * 1000.0), round((sysSecs - priorSysSecs) * 1000.0),
+                                round(cpuPercent, 2), round((childSecs - priorChildSecs) * 1000.0), children_forked)
+    print_line('rpi_reporter_usage_tuple=[{}]', rpi_reporter_usage_tuple, debug=True)
+
+
+def parseProcessStat(stat_raw):
+    # Tuple (CPU user secs, CPU sys secs, Threads, Started secs after boot) from /proc/{pid}/stat content
+    # our command name may hold spaces, fields count from after its closing paren
+    statFields = stat_raw[stat_raw.rfind(')') + 2:].split()
+    return (int(statFields[11]) / K_CLOCK_TICKS_PER_SECOND, int(statFields[12]) / K_CLOCK_TICKS_PER_SECOND,
+            int(statFields[17]), int(statFields[19]) / K_CLOCK_TICKS_PER_SECOND)
+
+
+def parseProcessMemory(status_raw):
+    # Tuple (RSS kB, peak RSS kB) from /proc/{pid}/status content
+    #  VmHWM:     22716 kB
+    #  VmRSS:     22548 kB
+    rssKb = 0
+    rssPeakKb = 0
+    for currLine in status_raw.split('\n'):
+        if currLine.startswith('VmRSS:'):
+            rssKb = int(currLine.split()[1])
+        elif currLine.startswith('VmHWM:'):
+            rssPeakKb = int(currLine.split()[1])
+    return (rssKb, rssPeakKb)
+
+
+# Our top processes scan reads only each process's stat file (one line of a few hundred
+#  bytes) and only when its content changed since our prior scan do we parse it. A
+#  process's command line is read once, when it first makes one of our top lists.
+K_PROCESS_STAT_READ_SIZE = 1024
+K_PROCESS_CMDLINE_READ_SIZE = 512
+K_PROCESS_CMDLINE_MAX_LENGTH = 80
+K_PAGE_SIZE_KB = os.sysconf('SC_PAGE_SIZE') // 1024
+
+# pid -> list [ stat content, started ticks, name, CPU ticks, RSS kB, CPU %, command line (None until read) ]
+process_cache = {}
+# monotonic time of our prior scan
+process_scan_time = None
+
+
+def readProcessFile(fspec, maxBytes):
+    # one bounded read of a /proc/{pid} file, None when the process has gone
+    try:
+        fd = os.open(fspec, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, maxBytes)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def getTopProcesses():
+    # the processes using the most CPU (since our prior scan) and the most memory
+    global rpi_top_processes
+    global process_cache
+    global process_scan_time
+    if top_processes == 0:
+        return
+    timeNow = monotonic()
+    bootSecsNow = clock_gettime(CLOCK_BOOTTIME)
+    elapsedSecs = 0.0 if process_scan_time is None else timeNow - process_scan_time
+    priorCache = process_cache
+    currCache = {}
+    bytesRead = 0
+    unchangedCount = 0
+    with os.scandir('/proc') as procEntries:
+        for procEntry in procEntries:
+            if not procEntry.name.isdigit():
+                continue
+            stat_raw = readProcessFile('/proc/{}/stat'.format(procEntry.name), K_PROCESS_STAT_READ_SIZE)
+            if stat_raw is None:
+                continue    # gone since we listed it
+            bytesRead += len(stat_raw)
+            pid = int(procEntry.name)
+            entry = priorCache.get(pid)
+            if entry is not None and entry[0] == stat_raw:
+                # unchanged: it used no CPU since our prior scan
+                entry[5] = 0.0
+                currCache[pid] = entry
+                unchangedCount += 1
+                continue
+            name, cpuTicks, startedTicks, rssPages = parseProcessTopStat(stat_raw.decode('utf-8', errors='replace'))
+            if entry is not None and entry[1] == startedTicks and elapsedSecs > 0:
+                cpuPercent = (cpuTicks - entry[3]) / K_CLOCK_TICKS_PER_SECOND / elapsedSecs * 100.0
+                cmdline = entry[6]
+            else:
+                # new to us (or its pid was reused): since it started
+                runSecs = bootSecsNow - startedTicks / K_CLOCK_TICKS_PER_SECOND
+                cpuPercent = cpuTicks / K_CLOCK_TICKS_PER_SECOND / runSecs * 100.0 if runSecs > 0 else 0.0
+                cmdline = None
+            currCache[pid] = [stat_raw, startedTicks, name, cpuTicks, rssPages * K_PAGE_SIZE_KB, cpuPercent, cmdline]
+    process_cache = currCache
+    process_scan_time = timeNow
+
+    # (only processes which used some CPU, our list would otherwise be padded with idle ones)
+    topByCpu = heapq.nlargest(top_processes, [item for item in currCache.items() if item[1][5] >= 0.05],
+                              key=lambda item: item[1][5])
+    topByRss = heapq.nlargest(top_processes, currCache.items(), key=lambda item: item[1][4])
+    for pid, entry in topByCpu + topByRss:
+        if entry[6] is None:
+            cmdline_raw = readProcessFile('/proc/{}/cmdline'.format(pid), K_PROCESS_CMDLINE_READ_SIZE)
+            if cmdline_raw is None:
+                cmdline_raw = b''
+            bytesRead += len(cmdline_raw)
+            entry[6] = parseProcessCmdline(cmdline_raw)
+    if publish_diagnostics:
+        countCollectorIO(bytesRead=bytesRead)
+    # Tuple (PID, Name, Command line, CPU %, RSS kB)
+    rpi_top_processes = ([(pid, entry[2], entry[6], round(entry[5], 1), entry[4]) for pid, entry in topByCpu],
+                         [(pid, entry[2], entry[6], round(entry[5], 1), entry[4]) for pid, entry in topByRss])
+    print_line('getTopProcesses() ({}) processes, ({}) unchanged', len(currCache), unchangedCount, debug=True)
+    print_line('rpi_top_processes=[{}]', rpi_top_processes, debug=True)
+
+
+def parseProcessTopStat(stat_raw):
+    # Tuple (Name, CPU ticks, Started ticks after boot, RSS pages) from /proc/{pid}/stat content
+    #  $ cat /proc/1/stat
+    #  1 (systemd) S 0 1 1 0 -1 4194560 ... utime(14) stime(15) ... starttime(22) vsize(23) rss(24) ...
+    nameEnd = stat_raw.rfind(')')
+    statFields = stat_raw[nameEnd + 2:].split()
+    return (stat_raw[stat_raw.find('(') + 1:nameEnd], int(statFields[11]) + int(statFields[12]),
+            int(statFields[19]), int(statFields[21]))
+
+
+def parseProcessCmdline(cmdline_raw):
+    # command line (arguments separated by spaces, shortened) from /proc/{pid}/cmdline content
+    #  kernel threads have none
+    cmdline = cmdline_raw.rstrip(b'\0').replace(b'\0', b' ').decode('utf-8', errors='replace')
+    if len(cmdline) > K_PROCESS_CMDLINE_MAX_LENGTH:
+        cmdline = cmdline[:K_PROCESS_CMDLINE_MAX_LENGTH - 3] + '...'
+    return cmdline
 
 
 def getDeviceModel():
@@ -581,9 +1493,9 @@ def getDeviceModel():
         else:
             rpi_connections = 'e'
 
-    print_line('rpi_model_raw=[{}]'.format(rpi_model_raw), debug=True)
-    print_line('rpi_model=[{}]'.format(rpi_model), debug=True)
-    print_line('rpi_connections=[{}]'.format(rpi_connections), debug=True)
+    print_line('rpi_model_raw=[{}]', rpi_model_raw, debug=True)
+    print_line('rpi_model=[{}]', rpi_model, debug=True)
+    print_line('rpi_connections=[{}]', rpi_connections, debug=True)
 
 
 def getLinuxRelease():
@@ -593,7 +1505,7 @@ def getLinuxRelease():
     rpi_linux_release = 'N/A'
     if not returncode:
         rpi_linux_release = stdout.decode('utf-8').rstrip()
-    print_line('rpi_linux_release=[{}]'.format(rpi_linux_release), debug=True)
+    print_line('rpi_linux_release=[{}]', rpi_linux_release, debug=True)
 
 
 def getLinuxVersion():
@@ -602,7 +1514,7 @@ def getLinuxVersion():
     rpi_linux_version = 'N/A'
     if not returncode:
         rpi_linux_version = stdout.decode('utf-8').rstrip()
-    print_line('rpi_linux_version=[{}]'.format(rpi_linux_version), debug=True)
+    print_line('rpi_linux_version=[{}]', rpi_linux_version, debug=True)
 
 
 def getHostnames():
@@ -613,7 +1525,7 @@ def getHostnames():
     # Allow overriding the sensor host name via `MQTT_SENSOR_HOSTNAME`
     # environment variable
     fqdn_raw = os.environ.get('MQTT_SENSOR_HOSTNAME', fqdn_from_hostname)
-    print_line('fqdn_raw=[{}]'.format(fqdn_raw), debug=True)
+    print_line('fqdn_raw=[{}]', fqdn_raw, debug=True)
     rpi_hostname = fqdn_raw
     if '.' in fqdn_raw:
         # have good fqdn
@@ -627,230 +1539,259 @@ def getHostnames():
         else:
             rpi_fqdn = rpi_hostname
 
-    print_line('rpi_fqdn=[{}]'.format(rpi_fqdn), debug=True)
-    print_line('rpi_hostname=[{}]'.format(rpi_hostname), debug=True)
+    print_line('rpi_fqdn=[{}]', rpi_fqdn, debug=True)
+    print_line('rpi_hostname=[{}]', rpi_hostname, debug=True)
 
 
 def getUptime():
     global rpi_uptime_raw
     global rpi_uptime
     global rpi_uptime_sec
-    stdout, _, returncode = invoke_shell_cmd('/usr/bin/uptime')
+    #  $ cat /proc/uptime
+    #  946483.72 3704462.86
+    #  [0]=seconds since boot, [1]=idle seconds summed over all cores
+    uptime_raw = read_native_file('/proc/uptime')
     rpi_uptime_raw = 'N/A'
-    if not returncode:
-        rpi_uptime_raw = stdout.decode('utf-8').rstrip().lstrip()
-    print_line('rpi_uptime_raw=[{}]'.format(rpi_uptime_raw), debug=True)
-    basicParts = rpi_uptime_raw.split()
-    timeStamp = basicParts[0]
-    lineParts = rpi_uptime_raw.split(',')
-    if ('user' in lineParts[1]):
-        rpi_uptime_raw = lineParts[0]
-    else:
-        rpi_uptime_raw = '{}, {}'.format(lineParts[0], lineParts[1])
-    rpi_uptime = rpi_uptime_raw.replace(
-        timeStamp, '').lstrip().replace('up ', '')
-    print_line('rpi_uptime=[{}]'.format(rpi_uptime), debug=True)
+    if uptime_raw is not None:
+        rpi_uptime_raw = uptime_raw.strip()
+    print_line('rpi_uptime_raw=[{}]', rpi_uptime_raw, debug=True)
+    rpi_uptime_sec = parseUptime(rpi_uptime_raw)
+    print_line('rpi_uptime_sec=({})', rpi_uptime_sec, debug=True)
+    rpi_uptime = formatUptime(rpi_uptime_sec)
+    print_line('rpi_uptime=[{}]', rpi_uptime, debug=True)
+
+
+def parseUptime(uptime_raw):
+    # whole seconds since boot from /proc/uptime content (0 if unknown)
+    uptimeParts = uptime_raw.split()
+    if len(uptimeParts) > 0 and uptimeParts[0] != 'N/A':
+        return int(float(uptimeParts[0]))
+    return 0
+
+
+def formatUptime(uptimeSeconds):
+    # build same form as uptime(1) reports (what we used to publish)
     # Ex: 10 days, 23:57
     # Ex: 27 days, 27 min
     # Ex: 0 min
-    bHasColon = (':' in rpi_uptime)
-    uptimeParts = rpi_uptime.split(',')
-    print_line('- uptimeParts=[{}]'.format(uptimeParts), debug=True)
-    if len(uptimeParts) > 1:
-        # have days and time
-        dayParts = uptimeParts[0].strip().split(' ')
-        daysVal = int(dayParts[0])
-        timeStr = uptimeParts[1].strip()
+    daysVal = uptimeSeconds // (24 * 60 * 60)
+    hoursVal = (uptimeSeconds // (60 * 60)) % 24
+    minsVal = (uptimeSeconds // 60) % 60
+    if hoursVal > 0:
+        timeStr = '{}:{:02d}'.format(hoursVal, minsVal)
     else:
-        # have time only
-        daysVal = 0
-        timeStr = uptimeParts[0].strip()
-    print_line('- days=({}), timeStr=[{}]'.format(daysVal, timeStr), debug=True)
-    if ':' in timeStr:
-        # timeStr = '23:57'
-        timeParts = timeStr.split(':')
-        hoursVal = int(timeParts[0])
-        minsVal = int(timeParts[1])
-    else:
-        # timeStr = 27 of: '27 min'
-        hoursVal = 0
-        timeParts = timeStr.split(' ')
-        minsVal = int(timeParts[0])
-    print_line('- hoursVal=({}), minsVal=({})'.format(hoursVal, minsVal), debug=True)
-    rpi_uptime_sec = (minsVal * 60) + (hoursVal * 60 * 60) + (daysVal * 24 * 60 * 60)
-    print_line('rpi_uptime_sec=({})'.format(rpi_uptime_sec), debug=True)
-
-
-def getNetworkIFsUsingIP(ip_cmd):
-    cmd_str = '{} link show | /bin/egrep -v "link" | /bin/egrep " eth| wlan"'.format(
-        ip_cmd)
-    stdout, _, returncode = invoke_shell_cmd(cmd_str)
-    lines = []
-    if not returncode:
-        lines = stdout.decode('utf-8').split("\n")
-    interfaceNames = []
-    line_count = len(lines)
-    if line_count > 2:
-        line_count = 2
-    if line_count == 0:
-        print_line('ERROR no lines left by ip(8) filter!', error=True)
-        sys.exit(1)
+        timeStr = '{} min'.format(minsVal)
+    if daysVal > 0:
+        dayStr = 'days' if daysVal > 1 else 'day'
+        return '{} {}, {}'.format(daysVal, dayStr, timeStr)
+    return timeStr
 
-    for lineIdx in range(line_count):
-        trimmedLine = lines[lineIdx].lstrip().rstrip()
-        if len(trimmedLine) > 0:
-            lineParts = trimmedLine.split()
-            # if interface is within a  container then we have eth0@if77, so
-            # take the leftmost part up to '@' in that case
-            interfaceName = lineParts[1].replace(':', '').split('@')[0]
-            interfaceNames.append(interfaceName)
 
-    print_line('interfaceNames=[{}]'.format(interfaceNames), debug=True)
+K_SYSFS_NET_DIR = '/sys/class/net'
+# interfaces preferred when choosing the MAC address our unique ID is built from
+K_PRIMARY_IF_PATTERNS = ['eth*', 'wlan*']
+# ioctl(2) to read the primary IPv4 address of an interface
+K_SIOCGIFADDR = 0x8915
 
-    trimmedLines = []
-    for interface in interfaceNames:
-        lines = getSingleInterfaceDetails(interface)
-        for currLine in lines:
-            trimmedLines.append(currLine)
+net_query_socket = None
 
-    loadNetworkIFDetailsFromLines(trimmedLines)
 
+def getNetworkIFNames():
+    # return names of the interfaces we report, ordered by interface index
+    try:
+        allNames = os.listdir(K_SYSFS_NET_DIR)
+    except OSError as exc:
+        print_line('getNetworkIFNames() exception=({})', exc, error=True)
+        return []
+    interfaceNames = []
+    for interfaceName in allNames:
+        if not any(fnmatch.fnmatchcase(interfaceName, pattern) for pattern in network_interfaces_include):
+            continue
+        if any(fnmatch.fnmatchcase(interfaceName, pattern) for pattern in network_interfaces_exclude):
+            continue
+        interfaceNames.append(interfaceName)
 
-def getSingleInterfaceDetails(interfaceName):
-    cmdString = '/sbin/ifconfig {} | /bin/egrep "Link|flags|inet |ether |TX packets |RX packets "'.format(
-        interfaceName)
-    stdout, _, returncode = invoke_shell_cmd(cmdString)
-    lines = []
-    if not returncode:
-        lines = stdout.decode('utf-8').split("\n")
-    trimmedLines = []
-    for currLine in lines:
-        trimmedLine = currLine.lstrip().rstrip()
-        if len(trimmedLine) > 0:
-            trimmedLines.append(trimmedLine)
+    def interfaceIndex(interfaceName):
+        index_raw = read_native_file('{}/{}/ifindex'.format(K_SYSFS_NET_DIR, interfaceName))
+        return int(index_raw) if index_raw is not None and index_raw.strip().isdigit() else 0
+    interfaceNames.sort(key=interfaceIndex)
+    return interfaceNames
 
-    # print_line('interface:[{}] trimmedLines=[{}]'.format(interfaceName, trimmedLines), debug=True)
-    return trimmedLines
 
+def getInterfaceIPv4Address(interfaceName):
+    global net_query_socket
+    if net_query_socket is None:
+        net_query_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    ifreq = struct.pack('256s', interfaceName.encode('utf-8')[:15])
+    try:
+        result = fcntl.ioctl(net_query_socket.fileno(), K_SIOCGIFADDR, ifreq)
+    except OSError:
+        return ''   # interface has no IPv4 address (not connected)
+    return socket.inet_ntoa(result[20:24])
 
-def loadNetworkIFDetailsFromLines(ifConfigLines):
+
+def getNetworkIFs():
     global rpi_interfaces
     global rpi_mac
-    global previous_time
+    #  for each interface we report, read from sysfs:
+    #    /sys/class/net/{if}/address               ether b8:27:eb:4f:a6:e9
+    #    /sys/class/net/{if}/statistics/rx_bytes   1197368205
+    #    /sys/class/net/{if}/statistics/tx_bytes   150440804
+    #  and the IPv4 address using ioctl(SIOCGIFADDR)
+    #  rx_data and tx_data are kbit/s since our last reading of the byte counters
     #
-    # OLDER SYSTEMS
-    #  eth0      Link encap:Ethernet  HWaddr b8:27:eb:c8:81:f2
-    #    inet addr:192.168.100.41  Bcast:192.168.100.255  Mask:255.255.255.0
-    #  wlan0     Link encap:Ethernet  HWaddr 00:0f:60:03:e6:dd
-    # NEWER SYSTEMS
     #  The following means eth0 (wired is NOT connected, and WiFi is connected)
-    #  eth0: flags=4099<UP,BROADCAST,MULTICAST>  mtu 1500
-    #    ether b8:27:eb:1a:f3:bc  txqueuelen 1000  (Ethernet)
-    #    RX packets 0  bytes 0 (0.0 B)
-    #    TX packets 0  bytes 0 (0.0 B)
-    #  wlan0: flags=4163<UP,BROADCAST,RUNNING,MULTICAST>  mtu 1500
-    #    inet 192.168.100.189  netmask 255.255.255.0  broadcast 192.168.100.255
-    #    ether b8:27:eb:4f:a6:e9  txqueuelen 1000  (Ethernet)
-    #    RX packets 1358790  bytes 1197368205 (1.1 GiB)
-    #    TX packets 916361  bytes 150440804 (143.4 MiB)
+    #   ('eth0', 'mac', 'b8:27:eb:1a:f3:bc'), ('eth0', 'rx_data', 0), ('eth0', 'tx_data', 0),
+    #   ('wlan0', 'IP', '192.168.100.189'), ('wlan0', 'mac', 'b8:27:eb:4f:a6:e9'), ...
     #
     tmpInterfaces = []
-    haveIF = False
-    imterfc = ''
-    rpi_mac = ''
-    current_time = time()
-    if current_time == previous_time:
-        current_time += 1
-
-    for currLine in ifConfigLines:
-        lineParts = currLine.split()
-        # print_line('- currLine=[{}]'.format(currLine), debug=True)
-        # print_line('- lineParts=[{}]'.format(lineParts), debug=True)
-        if len(lineParts) > 0:
-            # skip interfaces generated by Home Assistant on RPi
-            if 'docker' in currLine or 'veth' in currLine or 'hassio' in currLine:
-                haveIF = False
+    primaryMac = ''
+    firstMac = ''
+
+    interfaceNames = getNetworkIFNames()
+    print_line('interfaceNames=[{}]', interfaceNames, debug=True)
+    for interfaceName in interfaceNames:
+        interfaceDir = '{}/{}'.format(K_SYSFS_NET_DIR, interfaceName)
+        ipAddress = getInterfaceIPv4Address(interfaceName)
+        if ipAddress != '':
+            tmpInterfaces.append((interfaceName, 'IP', ipAddress))
+
+        mac_raw = read_native_file('{}/address'.format(interfaceDir))
+        macAddress = mac_raw.strip() if mac_raw is not None else ''
+        # tunnels (e.g. WireGuard) have no hardware address
+        if macAddress != '' and macAddress != '00:00:00:00:00:00':
+            tmpInterfaces.append((interfaceName, 'mac', macAddress))
+            if firstMac == '':
+                firstMac = macAddress
+            if primaryMac == '' and any(fnmatch.fnmatchcase(interfaceName, pattern) for pattern in K_PRIMARY_IF_PATTERNS):
+                primaryMac = macAddress
+
+        for field, counterName in [('rx_data', 'rx_bytes'), ('tx_data', 'tx_bytes')]:
+            counter_raw = read_native_file('{}/statistics/{}'.format(interfaceDir, counterName))
+            if counter_raw is None or not counter_raw.strip().isdigit():
                 continue
-            # let's evaluate remaining interfaces
-            if 'flags' in currLine:  # NEWER ONLY
-                haveIF = True
-                imterfc = lineParts[0].replace(':', '')
-                # print_line('newIF=[{}]'.format(imterfc), debug=True)
-            # OLDER ONLY, using 'Link ' (notice space) prevent from tripping on
-            # IPv6 ('Scope:Link')
-            elif 'Link ' in currLine:
-                haveIF = True
-                imterfc = lineParts[0].replace(':', '')
-                newTuple = (imterfc, 'mac', lineParts[4])
-                if rpi_mac == '':
-                    rpi_mac = lineParts[4]
-                    print_line('rpi_mac=[{}]'.format(rpi_mac), debug=True)
-                tmpInterfaces.append(newTuple)
-                print_line('newTuple=[{}]'.format(newTuple), debug=True)
-            elif haveIF == True:
-                print_line('IF=[{}], lineParts=[{}]'.format(
-                    imterfc, lineParts), debug=True)
-                if 'inet' in currLine:  # OLDER & NEWER
-                    newTuple = (imterfc, 'IP',
-                                lineParts[1].replace('addr:', ''))
-                    tmpInterfaces.append(newTuple)
-                    print_line('newTuple=[{}]'.format(newTuple), debug=True)
-                elif 'ether' in currLine:  # NEWER ONLY
-                    newTuple = (imterfc, 'mac', lineParts[1])
-                    tmpInterfaces.append(newTuple)
-                    if rpi_mac == '':
-                        rpi_mac = lineParts[1]
-                        print_line('rpi_mac=[{}]'.format(rpi_mac), debug=True)
-                    print_line('newTuple=[{}]'.format(newTuple), debug=True)
-                elif 'RX' in currLine:  # NEWER ONLY
-                    previous_value = getPreviousNetworkData(imterfc, 'rx_data')
-                    current_value = int(lineParts[4])
-                    rx_data = round((current_value - previous_value) / (current_time - previous_time) * 8 / 1024)
-                    newTuple = (imterfc, 'rx_data', rx_data)
-                    tmpInterfaces.append(newTuple)
-                    print_line('newTuple=[{}]'.format(newTuple), debug=True)
-                elif 'TX' in currLine:  # NEWER ONLY
-                    previous_value = getPreviousNetworkData(imterfc, 'tx_data')
-                    current_value = int(lineParts[4])
-                    tx_data = round((current_value - previous_value) / (current_time - previous_time) * 8 / 1024)
-                    newTuple = (imterfc, 'tx_data', tx_data)
-                    tmpInterfaces.append(newTuple)
-                    print_line('newTuple=[{}]'.format(newTuple), debug=True)
-                    haveIF = False
-
+            bytesPerSecond = getCounterRate(('net', interfaceName, counterName), int(counter_raw),
+                                            wrapAt=K_COUNTER_WRAP_NATIVE)
+            rate = round(bytesPerSecond * 8 / 1024) if bytesPerSecond is not None else 0
+            tmpInterfaces.append((interfaceName, field, rate))
+
+    # forget open files of interfaces which have gone away
+    for fspec in list(native_file_fds.keys()):
+        if fspec.startswith(K_SYSFS_NET_DIR) and fspec.split('/')[4] not in interfaceNames:
+            close_native_file(fspec)
+    forgetCounters('net', interfaceNames)
+
+    rpi_mac = primaryMac if primaryMac != '' else firstMac
     rpi_interfaces = tmpInterfaces
-    print_line('rpi_interfaces=[{}]'.format(rpi_interfaces), debug=True)
-    print_line('rpi_mac=[{}]'.format(rpi_mac), debug=True)
-
-
-def getPreviousNetworkData(interface, field):
-    global rpi_interfaces
-    value = [item for item in rpi_interfaces if item[0] == interface and item[1] == field]
-    if len(value) > 0:
-        return value[0][2]
-    else:
-        return 0
-
-
-def getNetworkIFs():
-    ip_cmd = getIPCmd()
-    if ip_cmd != '':
-        getNetworkIFsUsingIP(ip_cmd)
+    print_line('rpi_interfaces=[{}]', rpi_interfaces, debug=True)
+    print_line('rpi_mac=[{}]', rpi_mac, debug=True)
+
+
+K_MOUNTINFO_FSPEC = '/proc/self/mountinfo'
+# memory and pseudo filesystems we never report (autofs: statvfs() would trigger the automount)
+K_SKIPPED_FS_TYPES = ['tmpfs', 'devtmpfs', 'ramfs', 'proc', 'sysfs', 'devpts', 'cgroup', 'cgroup2',
+                      'securityfs', 'pstore', 'debugfs', 'tracefs', 'configfs', 'fusectl', 'mqueue',
+                      'hugetlbfs', 'bpf', 'autofs', 'binfmt_misc', 'rpc_pipefs', 'efivarfs', 'nsfs']
+# filesystems whose statvfs() can block when the server goes away
+K_NETWORK_FS_TYPES = ['nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'ceph', 'glusterfs', 'fuse.glusterfs']
+K_NETWORK_STATVFS_TIMEOUT_IN_SECONDS = 5.0
+
+# cached mount table: list of tuple { device, mountPoint, fsType, deviceID }
+mount_table = []
+mount_table_fd = None
+# the kernel flags POLLPRI on an open mountinfo file whenever the mount table changes
+mount_table_poll = select.poll()
+# network mount statvfs() workers and their last good results, keyed by mount point
+statvfs_workers = {}
+statvfs_last_good = {}
+
+
+def unescapeMountField(field):
+    # mountinfo escapes space, tab, newline and backslash as octal, e.g. '\040'
+    return re.sub(r'\\([0-7]{3})', lambda match: chr(int(match.group(1), 8)), field)
+
+
+def getMountTable():
+    global mount_table
+    global mount_table_fd
+    #  EXAMPLES (/proc/self/mountinfo)
+    #
+    #  23 1 179:2 / / rw,noatime shared:1 - ext4 /dev/root rw
+    #  28 23 179:1 / /boot rw,relatime shared:14 - vfat /dev/mmcblk0p1 rw,fmask=0022
+    #  31 23 8:1 / /media/pi/SANDISK rw,nosuid shared:20 - exfat /dev/sda1 rw
+    #  33 23 0:48 / /mnt/nas rw,relatime shared:22 - nfs4 192.168.100.5:/srv/c2db7b94 rw
+    #  [0] [1] [2] [3] [4]                        [-] [n+1]   [n+2]
+    #
+    fd = native_file_fds.get(K_MOUNTINFO_FSPEC)
+    if fd is not None and fd == mount_table_fd and len(mount_table_poll.poll(0)) == 0:
+        return mount_table  # mount table not changed since we last read it
+
+    mountinfo_raw = read_native_file(K_MOUNTINFO_FSPEC)
+    newFd = native_file_fds.get(K_MOUNTINFO_FSPEC)
+    if newFd != mount_table_fd:
+        if mount_table_fd is not None:
+            try:
+                mount_table_poll.unregister(mount_table_fd)
+            except KeyError:
+                pass
+        if newFd is not None:
+            mount_table_poll.register(newFd, select.POLLPRI | select.POLLERR)
+        mount_table_fd = newFd
+    if mountinfo_raw is None:
+        return mount_table
+
+    mount_table = parseMountInfo(mountinfo_raw)
+    print_line('mount_table=[{}]', mount_table, debug=True)
+    return mount_table
+
+
+def parseMountInfo(mountinfo_raw):
+    # list of tuple { device, mountPoint, fsType, deviceID } from /proc/self/mountinfo content
+    tmpMounts = []
+    for currLine in mountinfo_raw.split('\n'):
+        lineParts = currLine.split()
+        if not '-' in lineParts:
+            continue
+        separator_idx = lineParts.index('-')
+        if separator_idx < 5 or len(lineParts) < separator_idx + 3:
+            print_line('BAD LINE FORMAT, Skipped=[{}]', currLine, debug=True, warning=True)
+            continue
+        fs_type = lineParts[separator_idx + 1]
+        device = unescapeMountField(lineParts[separator_idx + 2])
+        mount_point = unescapeMountField(lineParts[4])
+        tmpMounts.append((device, mount_point, fs_type, lineParts[2]))
+    return tmpMounts
+
+
+def startNetworkMountStats(mount_point):
+    # statvfs() of a network mount can hang when its server is gone, so do it in
+    #  a worker (unless the one from a prior cycle is still stuck)
+    worker = statvfs_workers.get(mount_point)
+    if worker is None or not worker[0].is_alive():
+        results = {}
+
+        def statvfsWorker():
+            try:
+                results['stats'] = os.statvfs(mount_point)
+            except OSError as exc:
+                results['error'] = exc
+        worker = (threading.Thread(target=statvfsWorker, daemon=True), results)
+        statvfs_workers[mount_point] = worker
+        worker[0].start()
+
+
+def getNetworkMountStats(mount_point, deadline):
+    # wait (until our monotonic deadline) for the worker started by startNetworkMountStats(),
+    #  fall back to the last good value if it doesn't finish in time
+    worker = statvfs_workers[mount_point]
+    worker[0].join(max(0.0, deadline - monotonic()))
+    if 'stats' in worker[1]:
+        statvfs_last_good[mount_point] = worker[1]['stats']
+    elif worker[0].is_alive():
+        print_line('statvfs({}) timed out, using last good value', mount_point, warning=True)
     else:
-        stdout, _, returncode = invoke_shell_cmd(
-            '/sbin/ifconfig | /bin/egrep "Link|flags|inet |ether " | /bin/egrep -v -i "lo:|loopback|inet6|\:\:1|127\.0\.0\.1"')
-        lines = []
-        if not returncode:
-            lines = stdout.decode('utf-8').split("\n")
-        trimmedLines = []
-        for currLine in lines:
-            trimmedLine = currLine.lstrip().rstrip()
-            if len(trimmedLine) > 0:
-                trimmedLines.append(trimmedLine)
-
-        print_line('trimmedLines=[{}]'.format(trimmedLines), debug=True)
-
-        loadNetworkIFDetailsFromLines(trimmedLines)
+        print_line('statvfs({}) exception=({})', mount_point, worker[1].get('error'), debug=True)
+    return statvfs_last_good.get(mount_point)
 
 
 def getFileSystemDrives():
@@ -858,110 +1799,112 @@ def getFileSystemDrives():
     global rpi_filesystem_space
     global rpi_filesystem_percent
     global rpi_filesystem
-    stdout, _, returncode = invoke_shell_cmd("/bin/df -m | /usr/bin/tail -n +2 | /bin/egrep -v 'tmpfs|boot'")
-    lines = []
-    if not returncode:
-        lines = stdout.decode('utf-8').split("\n")
-    trimmedLines = []
-    for currLine in lines:
-        trimmedLine = currLine.lstrip().rstrip()
-        if len(trimmedLine) > 0:
-            trimmedLines.append(trimmedLine)
-
-    print_line('getFileSystemDrives() trimmedLines=[{}]'.format(
-        trimmedLines), debug=True)
-
-    #  EXAMPLES
-    #
-    #  Filesystem     1M-blocks  Used Available Use% Mounted on
-    #  /dev/root          59998   9290     48208  17% /
-    #  /dev/sda1         937872 177420    712743  20% /media/data
-    # or
-    #  /dev/root          59647  3328     53847   6% /
-    #  /dev/sda1           3703    25      3472   1% /media/pi/SANDISK
-    # or
-    #  xxx.xxx.xxx.xxx:/srv/c2db7b94 200561 148655 41651 79% /
-
-    # FAILING Case v1.4.0:
-    # Here is the output of 'df -m'
-
-    # Sys. de fichiers blocs de 1M Utilisé Disponible Uti% Monté sur
-    # /dev/root 119774 41519 73358 37% /
-    # devtmpfs 1570 0 1570 0% /dev
-    # tmpfs 1699 0 1699 0% /dev/shm
-    # tmpfs 1699 33 1667 2% /run
-    # tmpfs 5 1 5 1% /run/lock
-    # tmpfs 1699 0 1699 0% /sys/fs/cgroup
-    # /dev/mmcblk0p1 253 55 198 22% /boot
-    # tmpfs 340 0 340 0% /run/user/1000
-
-    # FAILING Case v1.6.x (issue #61)
-    # [[/bin/df: /mnt/sabrent: No such device or address',
-    #   '/dev/root         119756  19503     95346  17% /',
-    #   '/dev/sda1         953868 882178     71690  93% /media/usb0',
-    #   '/dev/sdb1         976761  93684    883078  10% /media/pi/SSD']]
 
     tmpDrives = []
-    for currLine in trimmedLines:
-        if 'no such device' in currLine.lower():
-            print_line('BAD LINE FORMAT, Skipped=[{}]'.format(currLine), debug=True, warning=True)
+    seenDeviceIDs = []
+    reportedMounts = []
+    for device, mount_point, fs_type, device_id in getMountTable():
+        if fs_type in K_SKIPPED_FS_TYPES or mount_point.startswith('/boot'):
             continue
-        lineParts = currLine.split()
-        print_line('lineParts({})=[{}]'.format(
-            len(lineParts), lineParts), debug=True)
-        if len(lineParts) < 6:
-            print_line('BAD LINE FORMAT, Skipped=[{}]'.format(
-                lineParts), debug=True, warning=True)
+        # bind mounts show the same filesystem again, report it only once
+        if device_id in seenDeviceIDs:
             continue
-        # tuple { total blocks, used%, mountPoint, device }
-        #
-        # new mech:
-        #  Filesystem     1M-blocks  Used Available Use% Mounted on
-        #     [0]           [1]       [2]     [3]    [4]   [5]
-        #     [--]         [n-3]     [n-2]   [n-1]   [n]   [--]
-        #  where  percent_field_index  is 'n'
-        #
-
-        # locate our % used field...
-        for percent_field_index in range(len(lineParts) - 2, 1, -1):
-            if '%' in lineParts[percent_field_index]:
-                break
-        print_line('percent_field_index=[{}]'.format(
-            percent_field_index), debug=True)
-
-        total_size_idx = percent_field_index - 3
-        mount_idx = percent_field_index + 1
-
-        # do we have a two part device name?
-        device = lineParts[0]
-        if total_size_idx != 1:
-            device = '{} {}'.format(lineParts[0], lineParts[1])
-        print_line('device=[{}]'.format(device), debug=True)
-
-        # do we have a two part mount point?
-        mount_point = lineParts[mount_idx]
-        if len(lineParts) - 1 > mount_idx:
-            mount_point = '{} {}'.format(
-                lineParts[mount_idx], lineParts[mount_idx + 1])
-        print_line('mount_point=[{}]'.format(mount_point), debug=True)
-
-        total_size_in_gb = '{:.0f}'.format(
-            next_power_of_2(lineParts[total_size_idx]))
-        newTuple = (total_size_in_gb, lineParts[percent_field_index].replace(
-            '%', ''),  mount_point, device)
+        seenDeviceIDs.append(device_id)
+        reportedMounts.append((device, mount_point, fs_type, device_id))
+        if fs_type in K_NETWORK_FS_TYPES:
+            startNetworkMountStats(mount_point)
+    # our network mounts are probed together, all within the one timeout
+    networkDeadline = monotonic() + K_NETWORK_STATVFS_TIMEOUT_IN_SECONDS
+
+    for device, mount_point, fs_type, device_id in reportedMounts:
+        if fs_type in K_NETWORK_FS_TYPES:
+            stats = getNetworkMountStats(mount_point, networkDeadline)
+        else:
+            try:
+                stats = os.statvfs(mount_point)
+            except OSError as exc:
+                # FAILING Case v1.6.x (issue #61): /mnt/sabrent: No such device or address
+                print_line('statvfs({}) exception=({}), Skipped', mount_point, exc, debug=True, warning=True)
+                stats = None
+        if stats is None or stats.f_blocks == 0:
+            continue
+
+        # same figures df(1) reports: sizes rounded up to MB, Use% rounded up
+        blockSizeMB = stats.f_frsize / (1024 * 1024)
+        total_size_mb = int(-(-stats.f_blocks * stats.f_frsize // (1024 * 1024)))
+        used_blocks = stats.f_blocks - stats.f_bfree
+        usable_blocks = used_blocks + stats.f_bavail
+        used_percent = 0
+        if usable_blocks > 0:
+            used_percent = -(-used_blocks * 100 // usable_blocks)
+        print_line('mount_point=[{}] device=[{}] size=({}MB) used=({:.0f}MB, {}%)',
+            mount_point, device, total_size_mb, used_blocks * blockSizeMB, used_percent, debug=True)
+
+        # tuple { total blocks, used%, mountPoint, device, deviceID }
+        total_size_in_gb = '{:.0f}'.format(next_power_of_2(total_size_mb))
+        newTuple = (total_size_in_gb, '{}'.format(used_percent), mount_point, device, device_id)
         tmpDrives.append(newTuple)
-        print_line('newTuple=[{}]'.format(newTuple), debug=True)
+        print_line('newTuple=[{}]', newTuple, debug=True)
         if newTuple[2] == '/':
-            rpi_filesystem_space_raw = currLine
+            rpi_filesystem_space_raw = '{} {} {}'.format(device, total_size_mb, mount_point)
             rpi_filesystem_space = newTuple[0]
             rpi_filesystem_percent = newTuple[1]
-            print_line('rpi_filesystem_space=[{}GB]'.format(
-                newTuple[0]), debug=True)
-            print_line('rpi_filesystem_percent=[{}]'.format(
-                newTuple[1]), debug=True)
+            print_line('rpi_filesystem_space=[{}GB]', newTuple[0], debug=True)
+            print_line('rpi_filesystem_percent=[{}]', newTuple[1], debug=True)
 
     rpi_filesystem = tmpDrives
-    print_line('rpi_filesystem=[{}]'.format(rpi_filesystem), debug=True)
+    print_line('rpi_filesystem=[{}]', rpi_filesystem, debug=True)
+
+
+K_DISKSTATS_FSPEC = '/proc/diskstats'
+K_DISKSTATS_SECTOR_BYTES = 512     # diskstats counts 512 byte sectors whatever the device's sector size
+
+
+def getDiskIO():
+    # I/O rates of each block device (and partition) since our prior reading
+    global rpi_disk_io
+    diskstats_raw = read_native_file(K_DISKSTATS_FSPEC)
+    if diskstats_raw is None:
+        return
+    timeNow = monotonic()
+    diskIO = {}
+    deviceNames = []
+    for deviceID, deviceName, counters in parseDiskStats(diskstats_raw):
+        deviceNames.append(deviceName)
+        readSectors, writeSectors, ioCount, ioMs = counters
+        rates = [getCounterRate(('disk', deviceName, counterName), value, timeNow, wrapAt=K_COUNTER_WRAP_NATIVE)
+                 for counterName, value in [('read', readSectors), ('write', writeSectors), ('ios', ioCount), ('io_ms', ioMs)]]
+        if None in rates:
+            rates = [0.0, 0.0, 0.0, 0.0]    # our first reading (or the device was just added)
+        readSectorsRate, writeSectorsRate, ioRate, ioMsRate = rates
+        # tuple { read bytes/s, write bytes/s, IOPS, busy %, MB written since boot }
+        diskIO[deviceID] = (round(readSectorsRate * K_DISKSTATS_SECTOR_BYTES), round(writeSectorsRate * K_DISKSTATS_SECTOR_BYTES),
+                            round(ioRate, 1), round(min(ioMsRate / 10.0, 100.0), 1),
+                            round(writeSectors * K_DISKSTATS_SECTOR_BYTES / (1024 * 1024), 1))
+    forgetCounters('disk', deviceNames)
+    rpi_disk_io = diskIO
+    print_line('rpi_disk_io=[{}]', rpi_disk_io, debug=True)
+
+
+def parseDiskStats(diskstats_raw):
+    # list of tuple { deviceID, device name, tuple { sectors read, sectors written, I/Os, ms doing I/O } }
+    #  from /proc/diskstats content
+    #  $ cat /proc/diskstats
+    #   179       0 mmcblk0 8251 3429 580170 12097 2210 1964 91378 18802 0 16180 30900 0 0 0 0
+    #   179       2 mmcblk0p2 7923 3429 568362 11851 2210 1964 91378 18802 0 16050 30653 0 0 0 0
+    #   [0]     [1] [2]     [3]reads     [5]sectors  [7]writes [9]sectors [12]ms doing I/O
+    diskStats = []
+    for currLine in diskstats_raw.split('\n'):
+        lineParts = currLine.split()
+        if len(lineParts) < 14:
+            continue
+        readsCompleted = int(lineParts[3])
+        writesCompleted = int(lineParts[7])
+        if readsCompleted == 0 and writesCompleted == 0:
+            continue    # never used (e.g. unused loop and ram devices)
+        diskStats.append(('{}:{}'.format(lineParts[0], lineParts[1]), lineParts[2],
+                          (int(lineParts[5]), int(lineParts[9]), readsCompleted + writesCompleted, int(lineParts[12]))))
+    return diskStats
 
 
 def next_power_of_2(size):
@@ -978,7 +1921,7 @@ def getVcGenCmd():
     if os.path.exists(desiredCommand) == False:
         desiredCommand = ''
     if desiredCommand != '':
-        print_line('Found vcgencmd(1)=[{}]'.format(desiredCommand), debug=True)
+        print_line('Found vcgencmd(1)=[{}]', desiredCommand, debug=True)
     return desiredCommand
 
 
@@ -991,76 +1934,180 @@ def getShellCmd():
     if os.path.exists(desiredCommand) == False:
         desiredCommand = ''
     if desiredCommand != '':
-        print_line('Found sh(1)=[{}]'.format(desiredCommand), debug=True)
+        print_line('Found sh(1)=[{}]', desiredCommand, debug=True)
     return desiredCommand
 
 
-def getIPCmd():
-    cmd_locn1 = '/bin/ip'
-    cmd_locn2 = '/sbin/ip'
-    desiredCommand = ''
-    if os.path.exists(cmd_locn1) == True:
-        desiredCommand = cmd_locn1
-    elif os.path.exists(cmd_locn2) == True:
-        desiredCommand = cmd_locn2
-    if desiredCommand != '':
-        print_line('Found IP(8)=[{}]'.format(desiredCommand), debug=True)
-    return desiredCommand
+# -----------------------------------------------------------------------------
+#  VideoCore (GPU firmware) queries
+# -----------------------------------------------------------------------------
+#
+# Both backends return a tuple (gpu temp in C, throttled bits, note) where the
+#  temperature is -1.0 and the throttled bits are None when not available, and
+#  the note explains a missing throttle value. A backend returns None when it
+#  can't be used on this device so the next one can be tried.
+
+# values from our most recent VideoCore query
+vc_gpu_temp = float('-1.0')
+vc_throttled_value = None
+vc_throttled_note = ''
+
+# Mailbox property interface, REF: https://github.com/raspberrypi/firmware/wiki/Mailbox-property-interface
+K_VCIO_DEVICE = '/dev/vcio'
+# _IOWR(100, 0, char *)
+K_VCIO_IOCTL_MBOX_PROPERTY = (3 << 30) | (struct.calcsize('P') << 16) | (100 << 8)
+K_VCIO_PROCESS_REQUEST = 0x00000000
+K_VCIO_REQUEST_SUCCESS = 0x80000000
+K_VCIO_TAG_RESPONSE = 0x80000000
+K_VCIO_TAG_GET_TEMPERATURE = 0x00030006
+K_VCIO_TAG_GET_THROTTLED = 0x00030046
+K_VCIO_TAG_END = 0x00000000
+
+vcio_device = K_VCIO_DEVICE
+vcio_fd = None
+
+
+def queryVideoCoreMailbox(ioctl_fn=fcntl.ioctl):
+    global vcio_fd
+    if vcio_fd is None:
+        try:
+            vcio_fd = os.open(vcio_device, os.O_RDWR)
+        except OSError as exc:
+            print_line('queryVideoCoreMailbox() open({}) exception=({})', vcio_device, exc, debug=True)
+            return None
+    # one property message carrying both tags:
+    #  [size, code, (tag, value-buffer-size, req/resp-size, value...)..., end-tag]
+    message = array('I', [
+        0, K_VCIO_PROCESS_REQUEST,
+        K_VCIO_TAG_GET_TEMPERATURE, 8, 4, 0, 0,     # [5]=temp id, [6]=millidegrees C
+        K_VCIO_TAG_GET_THROTTLED, 4, 4, 0,          # [10]=throttled bits
+        K_VCIO_TAG_END])
+    message[0] = len(message) * message.itemsize
+    try:
+        ioctl_fn(vcio_fd, K_VCIO_IOCTL_MBOX_PROPERTY, message, True)
+    except OSError as exc:
+        print_line('queryVideoCoreMailbox() ioctl exception=({})', exc, debug=True)
+        os.close(vcio_fd)
+        vcio_fd = None
+        return None
+    if message[1] != K_VCIO_REQUEST_SUCCESS:
+        print_line('queryVideoCoreMailbox() bad response code=(0x{:x})', message[1], debug=True)
+        return None
+
+    gpu_temp = float('-1.0')
+    if message[4] & K_VCIO_TAG_RESPONSE:
+        gpu_temp = message[6] / 1000.0
+    throttled_value = None
+    throttled_note = ''
+    if message[9] & K_VCIO_TAG_RESPONSE:
+        throttled_value = message[10]
+    else:
+        throttled_note = 'bad response from mailbox'
+    return gpu_temp, throttled_value, throttled_note
+
+
+vcgencmd_fspec = None
+
+
+def queryVideoCoreVcGenCmd():
+    global vcgencmd_fspec
+    if vcgencmd_fspec is None:
+        vcgencmd_fspec = getVcGenCmd()  # only probe for the command once
+    if vcgencmd_fspec == '':
+        return None
+
+    rpi_gpu_temp_raw = 'failed'
+    retry_count = 3
+    while retry_count > 0:
+        stdout, _, returncode = invoke_shell_cmd('{} measure_temp'.format(vcgencmd_fspec))
+        if not returncode:
+            rpi_gpu_temp_raw = stdout.decode('utf-8').replace('\x00', '').rstrip().replace(
+                'temp=', '').replace('\'C', '')
+        if not 'failed' in rpi_gpu_temp_raw:
+            break
+        retry_count -= 1
+        if retry_count > 0:
+            sleep(1)    # give the firmware a moment before we retry
+    gpu_temp = float('-1.0')
+    if not 'failed' in rpi_gpu_temp_raw:
+        gpu_temp = float(rpi_gpu_temp_raw)
+
+    # sudo vcgencmd get_throttled
+    #   throttled=0x0
+    stdout, _, returncode = invoke_shell_cmd('{} get_throttled'.format(vcgencmd_fspec))
+    rpi_throttle_status_raw = ''
+    if not returncode:
+        rpi_throttle_status_raw = stdout.decode('utf-8').rstrip()
+    print_line('rpi_throttle_status_raw=[{}]', rpi_throttle_status_raw, debug=True)
+
+    throttled_value = None
+    throttled_note = ''
+    if len(rpi_throttle_status_raw) and not 'throttled' in rpi_throttle_status_raw:
+        throttled_note = 'bad response [{}] from vcgencmd'.format(rpi_throttle_status_raw)
+    else:
+        lineParts = rpi_throttle_status_raw.split('=')
+        print_line('lineParts=[{}]', lineParts, debug=True)
+        if len(lineParts) > 1 and len(lineParts[1]) > 0:
+            rpi_throttle_value_raw = lineParts[1]
+            if rpi_throttle_value_raw.startswith('0x'):
+                throttled_value = int(rpi_throttle_value_raw, 16)
+            else:
+                throttled_value = int(rpi_throttle_value_raw, 10)
+    return gpu_temp, throttled_value, throttled_note
+
+
+videocore_backends = OrderedDict([
+    ('mailbox', queryVideoCoreMailbox),
+    ('vcgencmd', queryVideoCoreVcGenCmd),
+])
+
+
+def getVideoCoreStatus():
+    global vc_gpu_temp
+    global vc_throttled_value
+    global vc_throttled_note
+    if videocore_backend == 'auto':
+        backendNames = list(videocore_backends.keys())
+    else:
+        backendNames = [videocore_backend]
+
+    vc_gpu_temp = float('-1.0')
+    vc_throttled_value = None
+    vc_throttled_note = 'Not Available'
+    for backendName in backendNames:
+        startTime = time()
+        results = videocore_backends[backendName]()
+        print_line('getVideoCoreStatus() backend=[{}] results=[{}] took ({:.1f} ms)',
+            backendName, results, (time() - startTime) * 1000.0, debug=True)
+        if results is not None:
+            vc_gpu_temp, vc_throttled_value, vc_throttled_note = results
+            break
 
 
 def getSystemTemperature():
     global rpi_system_temp
     global rpi_gpu_temp
     global rpi_cpu_temp
-    rpi_gpu_temp_raw = 'failed'
-    cmd_fspec = getVcGenCmd()
-    if cmd_fspec == '':
-        rpi_system_temp = float('-1.0')
-        rpi_gpu_temp = float('-1.0')
-        rpi_cpu_temp = getSystemCPUTemperature()
-        if rpi_cpu_temp != -1.0:
-            rpi_system_temp = rpi_cpu_temp
-    else:
-        retry_count = 3
-        while retry_count > 0 and 'failed' in rpi_gpu_temp_raw:
-
-            cmd_string = "{} measure_temp | /bin/sed -e 's/\\x0//g'".format(
-                cmd_fspec)
-            stdout, _, returncode = invoke_shell_cmd(cmd_string)
-            rpi_gpu_temp_raw = 'failed'
-            if not returncode:
-                rpi_gpu_temp_raw = stdout.decode(
-                    'utf-8').rstrip().replace('temp=', '').replace('\'C', '')
-            retry_count -= 1
-            sleep(1)
-
-        if 'failed' in rpi_gpu_temp_raw:
-            interpretedTemp = float('-1.0')
-        else:
-            interpretedTemp = float(rpi_gpu_temp_raw)
-        rpi_gpu_temp = interpretedTemp
-        print_line('rpi_gpu_temp=[{}]'.format(rpi_gpu_temp), debug=True)
+    rpi_gpu_temp = vc_gpu_temp
+    print_line('rpi_gpu_temp=[{}]', rpi_gpu_temp, debug=True)
 
-        rpi_cpu_temp = getSystemCPUTemperature()
+    rpi_cpu_temp = getSystemCPUTemperature()
 
-        # fallback to CPU temp is GPU not available
-        rpi_system_temp = rpi_gpu_temp
-        if rpi_gpu_temp == -1.0:
-            rpi_system_temp = rpi_cpu_temp
+    # fallback to CPU temp is GPU not available
+    rpi_system_temp = rpi_gpu_temp
+    if rpi_gpu_temp == -1.0:
+        rpi_system_temp = rpi_cpu_temp
 
 
-def getSystemCPUTemperature():
-    cmd_locn1 = '/sys/class/thermal/thermal_zone0/temp'
-    cmdString = '/bin/cat {}'.format(
-        cmd_locn1)
+K_CPU_TEMP_FSPEC = '/sys/class/thermal/thermal_zone0/temp'
 
+
+def getSystemCPUTemperature():
     rpi_cpu_temp = float('-1.0')
-    if os.path.exists(cmd_locn1):
-        stdout, _, returncode = invoke_shell_cmd(cmdString)
-        if not returncode:
-            rpi_cpu_temp_raw = stdout.decode('utf-8').rstrip()
-            rpi_cpu_temp = float(rpi_cpu_temp_raw) / 1000.0
-    print_line('rpi_cpu_temp=[{}]'.format(rpi_cpu_temp), debug=True)
+    rpi_cpu_temp_raw = read_native_file(K_CPU_TEMP_FSPEC)
+    if rpi_cpu_temp_raw is not None and len(rpi_cpu_temp_raw.strip()) > 0:
+        rpi_cpu_temp = float(rpi_cpu_temp_raw.strip()) / 1000.0
+    print_line('rpi_cpu_temp=[{}]', rpi_cpu_temp, debug=True)
     return rpi_cpu_temp
 
 
@@ -1072,46 +2119,19 @@ def getSystemThermalStatus():
     #  REF: https://harlemsquirrel.github.io/shell/2019/01/05/monitoring-raspberry-pi-power-and-thermal-issues.html
     #
     rpi_throttle_status = []
-    cmd_fspec = getVcGenCmd()
-    if cmd_fspec == '':
-        rpi_throttle_status.append('Not Available')
-    else:
-        cmd_string = "{} get_throttled".format(cmd_fspec)
-        stdout, _, returncode = invoke_shell_cmd(cmd_string)
-        rpi_throttle_status_raw = ''
-        if not returncode:
-            rpi_throttle_status_raw = stdout.decode('utf-8').rstrip()
-        print_line('rpi_throttle_status_raw=[{}]'.format(
-            rpi_throttle_status_raw), debug=True)
-
-        if len(rpi_throttle_status_raw) and not 'throttled' in rpi_throttle_status_raw:
-            rpi_throttle_status.append(
-                'bad response [{}] from vcgencmd'.format(rpi_throttle_status_raw))
+    if vc_throttled_note != '':
+        rpi_throttle_status.append(vc_throttled_note)
+    elif vc_throttled_value is not None:
+        values = ['throttled = 0x{:x}'.format(vc_throttled_value)]
+        # decode test code
+        # vc_throttled_value = int('0x50002', 16)
+        if vc_throttled_value > 0:
+            values = interpretThrottleValue(vc_throttled_value)
         else:
-            values = []
-            lineParts = rpi_throttle_status_raw.split('=')
-            print_line('lineParts=[{}]'.format(lineParts), debug=True)
-            rpi_throttle_value_raw = ''
-            if len(lineParts) > 1:
-                rpi_throttle_value_raw = lineParts[1]
-            rpi_throttle_value = int(0)
-            if len(rpi_throttle_value_raw) > 0:
-                values.append('throttled = {}'.format(rpi_throttle_value_raw))
-                if rpi_throttle_value_raw.startswith('0x'):
-                    rpi_throttle_value = int(rpi_throttle_value_raw, 16)
-                else:
-                    rpi_throttle_value = int(rpi_throttle_value_raw, 10)
-                # decode test code
-                # rpi_throttle_value = int('0x50002', 16)
-                if rpi_throttle_value > 0:
-                    values = interpretThrottleValue(rpi_throttle_value)
-                else:
-                    values.append('Not throttled')
-            if len(values) > 0:
-                rpi_throttle_status = values
-
-    print_line('rpi_throttle_status=[{}]'.format(
-        rpi_throttle_status), debug=True)
+            values.append('Not throttled')
+        rpi_throttle_status = values
+
+    print_line('rpi_throttle_status=[{}]', rpi_throttle_status, debug=True)
 
 
 def interpretThrottleValue(throttleValue):
@@ -1126,7 +2146,7 @@ def interpretThrottleValue(throttleValue):
     ||_ Throttling has occurred
     |_ Soft temperature limit has occurred
     """
-    print_line('throttleValue=[{}]'.format(bin(throttleValue)), debug=True)
+    print_line('throttleValue=[{}]', bin(throttleValue), debug=True)
     interpResult = []
     meanings = [
         (2**0, 'Under-voltage detected'),
@@ -1144,7 +2164,7 @@ def interpretThrottleValue(throttleValue):
         if throttleValue & bitTuple[0] > 0:
             interpResult.append(bitTuple[1])
 
-    print_line('interpResult=[{}]'.format(interpResult), debug=True)
+    print_line('interpResult=[{}]', interpResult, debug=True)
     return interpResult
 
 
@@ -1165,7 +2185,7 @@ def getLastUpdateDate():
         trimmedLine = currLine.lstrip().rstrip()
         if len(trimmedLine) > 0:
             trimmedLines.append(trimmedLine)
-    print_line('trimmedLines=[{}]'.format(trimmedLines), debug=True)
+    print_line('trimmedLines=[{}]', trimmedLines, debug=True)
 
     fileSpec_latest = None
     if len(trimmedLines) > 0:
@@ -1174,15 +2194,14 @@ def getLastUpdateDate():
         if len(lineParts) > 0:
             lastPartIdx = len(lineParts) - 1
             fileSpec_latest = lineParts[lastPartIdx]
-        print_line('fileSpec_latest=[{}]'.format(fileSpec_latest), debug=True)
+        print_line('fileSpec_latest=[{}]', fileSpec_latest, debug=True)
 
     rpi_last_update_date = None
     if fileSpec_latest:
         fileModDateInSeconds = os.path.getmtime(fileSpec_latest)
         fileModDate = datetime.fromtimestamp(fileModDateInSeconds)
         rpi_last_update_date = fileModDate.replace(tzinfo=local_tz)
-        print_line('rpi_last_update_date=[{}]'.format(
-            rpi_last_update_date), debug=True)
+        print_line('rpi_last_update_date=[{}]', rpi_last_update_date, debug=True)
 
 
 def to_datetime(time):
@@ -1199,12 +2218,11 @@ def getLastInstallDate():
     if not returncode:
         last_installed_pkg_raw = stdout.decode(
             'utf-8').rstrip().replace('/var/log/dpkg.log:', '').replace('/var/log/dpkg.log.1:', '')
-    print_line('last_installed_pkg_raw=[{}]'.format(
-        last_installed_pkg_raw), debug=True)
+    print_line('last_installed_pkg_raw=[{}]', last_installed_pkg_raw, debug=True)
     line_parts = last_installed_pkg_raw.split()
     if len(line_parts) > 1:
         pkg_date_string = '{} {}'.format(line_parts[0], line_parts[1])
-        print_line('pkg_date_string=[{}]'.format(pkg_date_string), debug=True)
+        print_line('pkg_date_string=[{}]', pkg_date_string, debug=True)
         # Example:
         #   2020-07-22 17:08:26 status installed python3-tzlocal:all 1.3-1
 
@@ -1212,100 +2230,935 @@ def getLastInstallDate():
             pkg_date_string, '%Y-%m-%d %H:%M:%S').replace(tzinfo=local_tz)
         rpi_last_update_date = pkg_install_date
 
-    print_line('rpi_last_update_date=[{}]'.format(
-        rpi_last_update_date), debug=True)
+    print_line('rpi_last_update_date=[{}]', rpi_last_update_date, debug=True)
 
 
 update_last_fetch_time = 0.0
 
+# our updates are counted by a short-lived helper process so apt's cache (tens of MB)
+#  never lives in our process, the helper exits with K_APT_NOT_AVAILABLE_EXIT without apt
+K_APT_COUNT_SCRIPT = """
+import sys
+try:
+    import apt
+except ImportError:
+    sys.exit(3)
+cache = apt.Cache()
+cache.open(None)
+cache.upgrade()
+print(len(cache.get_changes()))
+"""
+K_APT_NOT_AVAILABLE_EXIT = 3
+K_APT_COUNT_TIMEOUT_IN_SECONDS = 300
+# the count only changes when dpkg installs something or apt-get update fetches new lists
+K_DPKG_STATUS_FSPEC = '/var/lib/dpkg/status'
+K_APT_LISTS_DIR = '/var/lib/apt/lists'
+
+# signature of the files our last count was made from, and one count at a time
+update_sources_signature = None
+update_count_lock = threading.Lock()
+
+
+def getUpdateSourcesSignature():
+    # tuple of { name, mtime, size } for the dpkg status and each apt list file
+    signature = []
+    try:
+        fileStat = os.stat(K_DPKG_STATUS_FSPEC)
+        signature.append((K_DPKG_STATUS_FSPEC, fileStat.st_mtime_ns, fileStat.st_size))
+    except OSError:
+        pass
+    try:
+        with os.scandir(K_APT_LISTS_DIR) as entries:
+            for entry in entries:
+                if entry.name != 'lock' and entry.is_file(follow_symlinks=False):
+                    fileStat = entry.stat(follow_symlinks=False)
+                    signature.append((entry.name, fileStat.st_mtime_ns, fileStat.st_size))
+    except OSError:
+        pass
+    signature.sort()
+    return tuple(signature)
+
 
 def getNumberOfAvailableUpdates():
     global rpi_update_count
     global update_last_fetch_time
-    if apt_available:
-        cache = apt.Cache()
-        cache.open(None)
-        cache.upgrade()
-        changes = cache.get_changes()
-        print_line('APT changes=[{}]'.format(changes), debug=True)
-        print_line('APT Avail Updates: ({})'.format(len(changes)), info=True)
-        # return str(cache.get_changes().len())
-        rpi_update_count = len(changes)
+    global update_sources_signature
+    global apt_available
+    if not apt_available:
+        return
+    if not update_count_lock.acquire(blocking=False):
+        print_line('APT update count still running, skipped', debug=True)
+        return
+    try:
+        signature = getUpdateSourcesSignature()
+        if update_sources_signature is not None and signature == update_sources_signature:
+            print_line('APT lists and dpkg status unchanged, still ({}) updates', rpi_update_count, debug=True)
+            update_last_fetch_time = time()
+            return
+        countChildForked()
+        if publish_diagnostics:
+            countCollectorIO(forks=1)
+        try:
+            helper = subprocess.run([sys.executable, '-c', K_APT_COUNT_SCRIPT], stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, timeout=K_APT_COUNT_TIMEOUT_IN_SECONDS)
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            print_line('APT update count failed exception=({})', exc, error=True)
+            return
+        if helper.returncode == K_APT_NOT_AVAILABLE_EXIT:
+            apt_available = False
+            rpi_update_count = -1   # if packaging system not avail. report -1
+            return
+        count_raw = helper.stdout.decode('utf-8', errors='replace').strip()
+        if helper.returncode != 0 or not count_raw.isdigit():
+            print_line('APT update count failed rc=({}) [{}]', helper.returncode,
+                helper.stderr.decode('utf-8', errors='replace').strip(), error=True)
+            return
+        print_line('APT Avail Updates: ({})', count_raw, info=True)
+        rpi_update_count = int(count_raw)
+        update_sources_signature = signature
         update_last_fetch_time = time()
+    finally:
+        update_count_lock.release()
 
 
-# get our hostnames so we can setup MQTT
-getHostnames()
-sensor_name = 'rpi-{}'.format(rpi_hostname)
+def startUpdateCount():
+    # count in the background, our other jobs don't wait for apt
+    threading.Thread(target=getNumberOfAvailableUpdates, name='apt-count', daemon=True).start()
+
+
+# -----------------------------------------------------------------------------
+#  Collection tiers
+# -----------------------------------------------------------------------------
+#
+# Each of our collectors belongs to a tier which says how often its source
+#  can change. A report cycle only re-reads the facts that are due so a normal
+#  cycle touches only the volatile sources.
+
+K_TIER_STATIC = 'static'    # fixed until reboot: read once at startup
+K_TIER_SLOW = 'slow'        # changes with OS upgrades
+K_TIER_MEDIUM = 'medium'    # changes slowly, e.g. disk usage
+K_TIER_FAST = 'fast'        # changes every cycle
+
+# re-read interval in seconds for each tier (None = never re-read)
+fact_tier_refresh_in_seconds = OrderedDict([
+    (K_TIER_STATIC, None),
+    (K_TIER_SLOW, 60 * 60),
+    (K_TIER_MEDIUM, 5 * 60),
+    (K_TIER_FAST, 0),
+])
+
+# our collectors in the order they need to run
+fact_registry = OrderedDict([
+    ('model', dict(collector=getDeviceModel, tier=K_TIER_STATIC)),
+    ('cpu_identity', dict(collector=getDeviceCpuIdentity, tier=K_TIER_STATIC)),
+    ('ux_version', dict(collector=getLinuxVersion, tier=K_TIER_STATIC)),
+    ('ux_release', dict(collector=getLinuxRelease, tier=K_TIER_SLOW)),
+    ('last_update', dict(collector=getLastUpdateDate, tier=K_TIER_SLOW)),
+    ('drives', dict(collector=getFileSystemDrives, tier=K_TIER_MEDIUM,
+                    deadline=K_NETWORK_STATVFS_TIMEOUT_IN_SECONDS + 2.0)),
+    ('cpu_loads', dict(collector=getDeviceCpuLoads, tier=K_TIER_FAST, after='cpu_identity')),
+    ('cpu_usage', dict(collector=getDeviceCpuUsage, tier=K_TIER_FAST)),
+    ('disk_io', dict(collector=getDiskIO, tier=K_TIER_FAST)),
+    ('uptime', dict(collector=getUptime, tier=K_TIER_FAST)),
+    ('videocore', dict(collector=getVideoCoreStatus, tier=K_TIER_FAST)),
+    ('temperature', dict(collector=getSystemTemperature, tier=K_TIER_FAST, after='videocore')),
+    ('throttle', dict(collector=getSystemThermalStatus, tier=K_TIER_FAST, after='videocore')),
+    ('memory', dict(collector=getDeviceMemory, tier=K_TIER_FAST)),
+    ('networking', dict(collector=getNetworkIFs, tier=K_TIER_FAST)),
+    ('reporter_usage', dict(collector=getReporterUsage, tier=K_TIER_FAST)),
+    ('top_processes', dict(collector=getTopProcesses, tier=K_TIER_FAST)),
+])
+
+# collectors run in parallel on a small pool, each must finish within its
+#  deadline (seconds) or its last good value is reported and flagged as stale
+K_COLLECTOR_POOL_SIZE = 4
+K_DEFAULT_FACT_DEADLINE_IN_SECONDS = 5.0
+# how often we look whether a chain queued behind slower ones has started
+K_FACT_QUEUED_POLL_IN_SECONDS = 0.05
+collector_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=K_COLLECTOR_POOL_SIZE, thread_name_prefix='collector')
+# fact name -> future of the run still in progress
+fact_futures = {}
+# names of facts whose latest read missed its deadline or failed
+fact_stale_names = []
+
+# monotonic time each fact was last read
+fact_last_read_time = {}
+# source reads we didn't need to do: in the last refresh and since startup
+fact_reads_avoided = 0
+fact_reads_avoided_total = 0
+
+
+def runFactChain(factNames, chainStart):
+    # run collectors, in order, which depend upon each other. The facts depending
+    #  upon a collector which failed aren't read (they'd be built from its old values)
+    #  returns names of the facts left stale
+    chainStart.append(monotonic())  # our deadline runs from now, not from when we were queued
+    failedNames = []
+    for factName in factNames:
+        if fact_registry[factName].get('after') in failedNames:
+            print_line('Collector [{}] skipped, [{}] failed', factName, fact_registry[factName]['after'], warning=True)
+            failedNames.append(factName)
+            continue
+        try:
+            if publish_diagnostics:
+                startNs = startStepTiming()
+                fact_registry[factName]['collector']()
+                recordStepTiming(factName, startNs, isCollector=True)
+            else:
+                fact_registry[factName]['collector']()
+            fact_last_read_time[factName] = monotonic()
+        except Exception as exc:
+            print_line('Collector [{}] failed exception=({})', factName, exc, error=True)
+            failedNames.append(factName)
+    return failedNames
+
+
+def submitDueFacts(tiers):
+    # start the collectors (of the given tiers) whose facts are due to be re-read
+    #  returns tuple { list of tuple { seconds allowed, fact names, future, chain start }, stale names, reads avoided }
+    timeNow = monotonic()
+    readsAvoided = 0
+    staleNames = []
+    # group due facts into chains: a fact runs after the fact it depends on
+    chains = OrderedDict()  # first fact name -> fact names
+    chainOf = {}            # fact name -> first fact name of its chain
+    for factName, fact in fact_registry.items():
+        if tiers is not None and not fact['tier'] in tiers:
+            continue
+        refreshInterval = fact_tier_refresh_in_seconds[fact['tier']]
+        lastReadTime = fact_last_read_time.get(factName)
+        if lastReadTime is not None and (refreshInterval is None or timeNow - lastReadTime < refreshInterval):
+            readsAvoided += 1
+            continue
+        if fact.get('after') in chainOf:
+            chainOf[factName] = chainOf[fact['after']]
+            chains[chainOf[factName]].append(factName)
+        else:
+            chainOf[factName] = factName
+            chains[factName] = [factName]
+
+    submitted = []
+    for firstName, factNames in chains.items():
+        priorFuture = fact_futures.get(firstName)
+        if priorFuture is not None and not priorFuture.done():
+            # still stuck in its prior run, don't pile up another
+            print_line('Collector [{}] still running from prior cycle', firstName, warning=True)
+            staleNames.extend(factNames)
+            continue
+        secondsAllowed = max([fact_registry[factName].get('deadline', K_DEFAULT_FACT_DEADLINE_IN_SECONDS)
+                              for factName in factNames])
+        chainStart = []     # (monotonic time its worker started it)
+        future = collector_pool.submit(runFactChain, factNames, chainStart)
+        fact_futures[firstName] = future
+        submitted.append((secondsAllowed, factNames, future, chainStart))
+    return submitted, staleNames, readsAvoided
+
+
+def factChainWaitTime(secondsAllowed, chainStart, queueDeadline):
+    # seconds left to wait for a chain, 0 once it has missed its deadline. A chain
+    #  still queued for a worker (behind a slow one) isn't late, it waits for a
+    #  worker until the longest deadline of its refresh, then gets its own time
+    timeNow = monotonic()
+    if len(chainStart) > 0:
+        return max(0.0, chainStart[0] + secondsAllowed - timeNow)
+    if timeNow >= queueDeadline:
+        return 0.0
+    return min(K_FACT_QUEUED_POLL_IN_SECONDS, queueDeadline - timeNow)
+
+
+def getQueueDeadline(submitted):
+    # the longest deadline of the chains we've just submitted
+    return monotonic() + max([entry[0] for entry in submitted], default=0.0)
+
+
+def factChainResult(factNames, future):
+    # return the names of facts left stale by this (waited upon) run
+    if future.done():
+        return future.result()
+    print_line('Collector [{}] missed its deadline, reporting last good value', ','.join(factNames), warning=True)
+    return factNames
+
+
+def recordFactRefresh(staleNames, readsAvoided):
+    global fact_reads_avoided
+    global fact_reads_avoided_total
+    global fact_stale_names
+    fact_stale_names = staleNames
+    fact_reads_avoided = readsAvoided
+    fact_reads_avoided_total += readsAvoided
+    print_line('refreshFacts() reads avoided: ({}) this cycle, ({}) since startup',
+        fact_reads_avoided, fact_reads_avoided_total, debug=True)
+    if len(fact_stale_names) > 0:
+        print_line('refreshFacts() stale facts=[{}]', fact_stale_names, debug=True)
+
+
+def refreshFacts(tiers=None):
+    # re-read the facts which are due, waiting for each until its deadline
+    submitted, staleNames, readsAvoided = submitDueFacts(tiers)
+    queueDeadline = getQueueDeadline(submitted)
+    for secondsAllowed, factNames, future, chainStart in submitted:
+        waitTime = factChainWaitTime(secondsAllowed, chainStart, queueDeadline)
+        while not future.done() and waitTime > 0:
+            concurrent.futures.wait([future], timeout=waitTime)
+            waitTime = factChainWaitTime(secondsAllowed, chainStart, queueDeadline)
+        staleNames.extend(factChainResult(factNames, future))
+    recordFactRefresh(staleNames, readsAvoided)
+
+
+async def refreshFactsAsync(tiers=None):
+    # same as refreshFacts() but lets our event loop run while we wait
+    submitted, staleNames, readsAvoided = submitDueFacts(tiers)
+    queueDeadline = getQueueDeadline(submitted)
+    for secondsAllowed, factNames, future, chainStart in submitted:
+        waitTime = factChainWaitTime(secondsAllowed, chainStart, queueDeadline)
+        while not future.done() and waitTime > 0:
+            await asyncio.wait([asyncio.wrap_future(future)], timeout=waitTime)
+            waitTime = factChainWaitTime(secondsAllowed, chainStart, queueDeadline)
+        staleNames.extend(factChainResult(factNames, future))
+    recordFactRefresh(staleNames, readsAvoided)
 
-# get model so we can use it too in MQTT
-getDeviceModel()
-getDeviceCpuInfo()
-getLinuxRelease()
-getLinuxVersion()
-getFileSystemDrives()
-if apt_available:
-    getNumberOfAvailableUpdates()
 
 # -----------------------------------------------------------------------------
 #  MQTT Topic def's
 # -----------------------------------------------------------------------------
 
-command_base_topic = '{}/command/{}'.format(base_topic, sensor_name.lower())
+def defineTopics():
+    # our topics, named for our sensor_name
+    global command_base_topic
+    global lwt_sensor_topic
+    global lwt_command_topic
+    global sensor_base_topic
+    global values_topic
+    global static_topic
+    global diagnostics_topic
+    global activity_topic
+    command_base_topic = '{}/command/{}'.format(base_topic, sensor_name.lower())
+    lwt_sensor_topic = '{}/sensor/{}/status'.format(base_topic, sensor_name.lower())
+    lwt_command_topic = '{}/command/{}/status'.format(base_topic, sensor_name.lower())
+    sensor_base_topic = '{}/sensor/{}'.format(base_topic, sensor_name.lower())
+    values_topic = '{}/{}'.format(sensor_base_topic, K_LD_MONITOR)
+    static_topic = '{}/{}'.format(sensor_base_topic, K_LD_STATIC)
+    diagnostics_topic = '{}/{}'.format(sensor_base_topic, K_LD_DIAGNOSTICS)
+    activity_topic = '{}/status'.format(sensor_base_topic)    # vs. LWT
 
 # -----------------------------------------------------------------------------
-#  timer and timer funcs for ALIVE MQTT Notices handling
+#  job scheduler
 # -----------------------------------------------------------------------------
+#
+# All of our periodic work (reporting, ALIVE notices, release and update
+#  checks) runs as jobs on one scheduler in the main thread. Jobs are due at
+#  fixed multiples of their interval on the monotonic clock so a job which takes
+#  a while to run doesn't push its later runs back (no drift). A job which runs
+#  past one or more of its next due times skips those (an overrun).
+#  In the asyncio runtime a job which blocks (e.g. on the network) runs in a
+#  worker thread so our event loop keeps serving the broker meanwhile.
+
+# heap of tuple { due time, sequence, job name }
+scheduler_queue = []
+scheduler_sequence = 0
+# job name -> job details and run statistics
+scheduler_jobs = OrderedDict()
+
+
+def addScheduledJob(jobName, handler, intervalInSeconds, firstRunInSeconds=None, quiet=False, blocking=False):
+    global scheduler_sequence
+    if firstRunInSeconds is None:
+        firstRunInSeconds = intervalInSeconds
+    scheduler_jobs[jobName] = dict(
+        handler=handler,
+        interval=float(intervalInSeconds),
+        runs=0,
+        overruns=0,
+        last_lateness=0.0,
+        max_lateness=0.0,
+        total_lateness=0.0,
+        last_duration=0.0,
+        max_duration=0.0,
+        quiet=quiet,    # don't log each run (for our frequent jobs)
+        blocking=blocking,  # can block for a while (asyncio runtime: run in a worker thread)
+    )
+    scheduler_sequence += 1
+    heapq.heappush(scheduler_queue, (monotonic() + firstRunInSeconds, scheduler_sequence, jobName))
+    print_line('- scheduled job [{}] - every {} seconds', jobName, intervalInSeconds, debug=True)
+
+
+def recordJobRun(jobName, dueTime, startTime):
+    # record statistics for this run and queue the job's next run
+    global scheduler_sequence
+    job = scheduler_jobs[jobName]
+    endTime = monotonic()
+    lateness = startTime - dueTime
+    duration = endTime - startTime
+    job['runs'] += 1
+    job['last_lateness'] = lateness
+    job['max_lateness'] = max(job['max_lateness'], lateness)
+    job['total_lateness'] += lateness
+    job['last_duration'] = duration
+    job['max_duration'] = max(job['max_duration'], duration)
+
+    # next due time is a multiple of our interval from the prior due time
+    nextDueTime = dueTime + job['interval']
+    if nextDueTime <= endTime:
+        missedRuns = int((endTime - nextDueTime) // job['interval']) + 1
+        job['overruns'] += missedRuns
+        nextDueTime += missedRuns * job['interval']
+        print_line('Job [{}] missed ({}) runs: late by ({:.3f} sec), took ({:.3f} sec)',
+            jobName, missedRuns, lateness, duration, warning=True)
+    if not job['quiet']:
+        print_line('- job [{}] ran: lateness=({:.3f} sec) duration=({:.3f} sec) runs=({}) overruns=({})',
+            jobName, lateness, duration, job['runs'], job['overruns'], debug=True)
+    scheduler_sequence += 1
+    heapq.heappush(scheduler_queue, (nextDueTime, scheduler_sequence, jobName))
+
+
+def runScheduledJobs():
+    # run our jobs as they come due, forever
+    while len(scheduler_queue) > 0:
+        waitTime = scheduler_queue[0][0] - monotonic()
+        if waitTime > 0:
+            sleep(waitTime)
+            continue    # re-check: sleep() can return early
+        dueTime, _, jobName = heapq.heappop(scheduler_queue)
+        startTime = monotonic()
+        try:
+            scheduler_jobs[jobName]['handler']()
+        except Exception as exc:
+            print_line('Job [{}] failed exception=({})', jobName, exc, error=True)
+        recordJobRun(jobName, dueTime, startTime)
+
+
+def startBlockingJob(jobName, dueTime, startTime):
+    # run the job in a worker thread, its run is recorded (and its next run scheduled) once it's done
+    def blockingJobDone(future):
+        if future.exception() is not None:
+            print_line('Job [{}] failed exception=({})', jobName, future.exception(), error=True)
+        recordJobRun(jobName, dueTime, startTime)
+    asyncio_loop.run_in_executor(None, scheduler_jobs[jobName]['handler']).add_done_callback(blockingJobDone)
+
+
+async def runScheduledJobsAsync():
+    # same as runScheduledJobs() but on our event loop, handlers may be coroutines
+    while len(scheduler_queue) > 0:
+        waitTime = scheduler_queue[0][0] - monotonic()
+        if waitTime > 0:
+            await asyncio.sleep(waitTime)
+            continue    # re-check: a job may have been added meanwhile
+        dueTime, _, jobName = heapq.heappop(scheduler_queue)
+        startTime = monotonic()
+        if scheduler_jobs[jobName]['blocking']:
+            startBlockingJob(jobName, dueTime, startTime)
+            continue
+        try:
+            handler = scheduler_jobs[jobName]['handler']
+            if asyncio.iscoroutinefunction(handler):
+                await handler()
+            else:
+                handler()
+        except Exception as exc:
+            print_line('Job [{}] failed exception=({})', jobName, exc, error=True)
+        recordJobRun(jobName, dueTime, startTime)
 
-K_ALIVE_TIMOUT_IN_SECONDS = 60
 
+# -----------------------------------------------------------------------------
+#  Fast sampler (see sample_interval_in_seconds)
+# -----------------------------------------------------------------------------
+#
+# Our cheap values are sampled every few seconds into one fixed size ring per
+#  value, sized for one report period, so our memory use doesn't grow. Each
+#  report carries min/max/mean/p95 of the period's samples and starts a new period.
+
+# value -> how we report it (decimals) and advertise it
+K_SAMPLE_METRICS = OrderedDict([
+    ('temperature_c', dict(decimals=1, title='CPU Temperature', unit='°C', icon='mdi:thermometer')),
+    ('cpu_busy_prcnt', dict(decimals=1, title='CPU Busy', unit='%', icon='mdi:cpu-64-bit')),
+    ('mem_used_prcnt', dict(decimals=1, title='Memory Used', unit='%', icon='mdi:memory')),
+    ('net_rx_kbps', dict(decimals=0, title='Network Rx', unit='kbit/s', icon='mdi:download-network')),
+    ('net_tx_kbps', dict(decimals=0, title='Network Tx', unit='kbit/s', icon='mdi:upload-network')),
+])
+# the figures we advertise as Home Assistant entities (see publish_sample_sensors)
+K_SAMPLE_SENSOR_STATS = ['max', 'p95']
+K_SAMPLE_PERCENTILE = 95
+
+# value -> array of samples (nan where the value couldn't be read)
+sample_rings = OrderedDict()
+sample_ring_capacity = 0
+sample_ring_next = 0
+sample_ring_count = 0
+
+
+def startSampler():
+    global sample_ring_capacity
+    sample_ring_capacity = (interval_in_minutes * 60) // sample_interval_in_seconds + 1
+    for metric in K_SAMPLE_METRICS:
+        sample_rings[metric] = array('d', [float('nan')]) * sample_ring_capacity
+    print_line('Sampling every ({}) seconds, ({}) samples per report', sample_interval_in_seconds, sample_ring_capacity, verbose=True)
+    addScheduledJob('sample', takeSamples, sample_interval_in_seconds, quiet=True)
+
+
+def getSampleCpuBusy(timeNow):
+    # percent of all cores' time busy since our last sample
+    stat_raw = read_native_file('/proc/stat')
+    if stat_raw is None:
+        return float('nan')
+    totalJiffies, busyJiffies, _, _ = parseProcStat(stat_raw[:stat_raw.find('\n')])['cpu']
+    busyRate = getCounterRate(('sample-cpu', 'cpu', 'busy'), busyJiffies, timeNow, wrapAt=None)
+    totalRate = getCounterRate(('sample-cpu', 'cpu', 'total'), totalJiffies, timeNow, wrapAt=None)
+    if busyRate is None or not totalRate:
+        return float('nan')
+    return busyRate / totalRate * 100.0
+
+
+def getSampleNetworkRates(timeNow):
+    # tuple { rx, tx } kbit/s summed over the interfaces we report
+    interfaceNames = list(OrderedDict.fromkeys(entry[0] for entry in rpi_interfaces))
+    rates = [0.0, 0.0]
+    for interfaceName in interfaceNames:
+        for index, counterName in enumerate(['rx_bytes', 'tx_bytes']):
+            counter_raw = read_native_file('{}/{}/statistics/{}'.format(K_SYSFS_NET_DIR, interfaceName, counterName))
+            if counter_raw is None or not counter_raw.strip().isdigit():
+                continue
+            bytesPerSecond = getCounterRate(('sample-net', interfaceName, counterName), int(counter_raw), timeNow,
+                                            wrapAt=K_COUNTER_WRAP_NATIVE)
+            if bytesPerSecond is None:
+                rates[index] = float('nan')
+            else:
+                rates[index] += bytesPerSecond * 8 / 1024
+    forgetCounters('sample-net', interfaceNames)
+    return rates
+
+
+def takeSamples():
+    global sample_ring_next
+    global sample_ring_count
+    if publish_diagnostics:
+        startNs = startStepTiming()
+    timeNow = monotonic()
+    temp_raw = read_native_file(K_CPU_TEMP_FSPEC)
+    temperature = float(temp_raw) / 1000.0 if temp_raw is not None and temp_raw.strip().lstrip('-').isdigit() else float('nan')
+    memUsed = float('nan')
+    memory = parseMemInfo(read_native_file('/proc/meminfo'))
+    if memory[0] != '' and memory[2] != '' and memory[0] > 0:
+        memUsed = (memory[0] - memory[2]) / memory[0] * 100.0
+    rxRate, txRate = getSampleNetworkRates(timeNow)
+    samples = [temperature, getSampleCpuBusy(timeNow), memUsed, rxRate, txRate]
+    for ring, value in zip(sample_rings.values(), samples):
+        ring[sample_ring_next] = value
+    sample_ring_next = (sample_ring_next + 1) % sample_ring_capacity
+    sample_ring_count += 1
+    if publish_diagnostics:
+        recordStepTiming('sample', startNs)
+
+
+def roundSample(value, decimals):
+    return round(value, decimals) if decimals > 0 else int(round(value))
+
+
+def getSamplesDictionary():
+    # min/max/mean/p95 of each value over this report period, then start a new period
+    global sample_ring_next
+    global sample_ring_count
+    samplesData = OrderedDict()
+    count = min(sample_ring_count, sample_ring_capacity)
+    for metric, params in K_SAMPLE_METRICS.items():
+        ring = sample_rings[metric]
+        values = sorted(value for value in (ring if count == sample_ring_capacity else ring[:count]) if value == value)
+        if len(values) == 0:
+            continue    # no good samples (nan != nan)
+        percentileIdx = max(0, -(-len(values) * K_SAMPLE_PERCENTILE // 100) - 1)    # nearest rank
+        decimals = params['decimals']
+        samplesData[metric] = OrderedDict([
+            ('min', roundSample(values[0], decimals)),
+            ('max', roundSample(values[-1], decimals)),
+            ('mean', roundSample(sum(values) / len(values), decimals)),
+            ('p95', roundSample(values[percentileIdx], decimals)),
+        ])
+    sample_ring_next = 0
+    sample_ring_count = 0
+    return samplesData
 
-def publishAliveStatus():
-    print_line('- SEND: yes, still alive -', debug=True)
-    mqtt_client.publish(lwt_sensor_topic, payload=lwt_online_val, retain=False)
-    mqtt_client.publish(lwt_command_topic, payload=lwt_online_val, retain=False)
 
+# -----------------------------------------------------------------------------
+#  Publisher
+# -----------------------------------------------------------------------------
+#
+# Our reports are handed to one publisher (a worker thread, or our event loop
+#  in the asyncio runtime) through a bounded queue. Each publish is tracked by
+#  its message id until the broker acknowledges it (on_publish).
+
+# waiting messages: list of tuple { topic, payload, retain }
+publish_queue = []
+publish_queue_condition = threading.Condition()
+publish_queue_drops = 0
+publish_queue_coalesced = 0
+first_report_sent = False
+
+# message id -> monotonic time published, for messages not yet acknowledged
+publish_inflight = {}
+# acks which arrived before we recorded their message id (and acks of messages not ours)
+publish_early_acks = OrderedDict()
+K_MAX_EARLY_ACKS = 100
+publish_ack_lock = threading.Lock()
+publish_ack_count = 0
+publish_ack_latency_last = 0.0
+publish_ack_latency_max = 0.0
+publish_ack_latency_total = 0.0
+
+
+def queuePublish(topic, payload, retain=False):
+    global publish_queue_drops
+    global publish_queue_coalesced
+    with publish_queue_condition:
+        if len(publish_queue) >= publish_queue_size and publish_overflow == 'coalesce':
+            for queueIdx, queuedMessage in enumerate(publish_queue):
+                if queuedMessage[0] == topic:
+                    # (ours goes to the back, our messages stay in order)
+                    del publish_queue[queueIdx]
+                    publish_queue.append((topic, payload, retain))
+                    publish_queue_coalesced += 1
+                    print_line('- publish queue: full, replaced waiting message for [{}]', topic, debug=True)
+                    return
+        if len(publish_queue) >= publish_queue_size:
+            droppedMessage = publish_queue.pop(0)
+            publish_queue_drops += 1
+            print_line('Publish queue full, dropped message for [{}]', droppedMessage[0], warning=True)
+        publish_queue.append((topic, payload, retain))
+        publish_queue_condition.notify()
+    if asyncio_loop is not None:
+        asyncio_loop.call_soon_threadsafe(publishQueuedMessages)
+
+
+def recordFirstReportSent():
+    global first_report_sent
+    first_report_sent = True
+    print_line('* first report sent ({:.1f} sec after start)', monotonic() - daemon_start_time, verbose=True)
+
+
+def publisherCanSend():
+    # without our spool, our messages wait in our queue until we're connected
+    return mqtt_client_connected or offline_spool_buffer is not None
+
+
+def publishQueuedMessages():
+    # publish all waiting messages
+    if not publisherCanSend():
+        return
+    with publish_queue_condition:
+        messages = list(publish_queue)
+        del publish_queue[:]
+    if publish_diagnostics and len(messages) > 0:
+        startNs = startStepTiming()
+    for topic, payload, retain in messages:
+        # while offline (or still replaying) our reports go to our spool, to stay in order
+        if not retain and offline_spool_buffer is not None and (not mqtt_client_connected or offline_spool_count > 0):
+            spoolMessage(topic, payload)
+            continue
+        messageInfo = mqtt_client.publish(topic, payload, 1, retain=retain)
+        recordPublishSent(messageInfo.mid)
+        if not first_report_sent and topic == values_topic:
+            recordFirstReportSent()
+    if publish_diagnostics and len(messages) > 0:
+        recordStepTiming('publish', startNs)
 
-def publishShuttingDownStatus():
-    print_line('- SEND: shutting down -', debug=True)
-    mqtt_client.publish(lwt_sensor_topic, payload=lwt_offline_val, retain=False)
-    mqtt_client.publish(lwt_command_topic, payload=lwt_offline_val, retain=False)
 
+def publisherWorker():
+    while True:
+        with publish_queue_condition:
+            while len(publish_queue) == 0 or not publisherCanSend():
+                publish_queue_condition.wait()
+        publishQueuedMessages()
 
-def aliveTimeoutHandler():
-    print_line('- MQTT TIMER INTERRUPT -', debug=True)
-    _thread.start_new_thread(publishAliveStatus, ())
-    startAliveTimer()
 
+def wakePublisher():
+    if asyncio_loop is not None:
+        asyncio_loop.call_soon_threadsafe(publishQueuedMessages)
+    else:
+        with publish_queue_condition:
+            publish_queue_condition.notify()
 
-def startAliveTimer():
-    global aliveTimer
-    global aliveTimerRunningStatus
-    stopAliveTimer()
-    aliveTimer = threading.Timer(K_ALIVE_TIMOUT_IN_SECONDS, aliveTimeoutHandler)
-    aliveTimer.start()
-    aliveTimerRunningStatus = True
-    print_line(
-        '- started MQTT timer - every {} seconds'.format(K_ALIVE_TIMOUT_IN_SECONDS), debug=True)
 
+def startPublisher():
+    # the asyncio runtime publishes from our event loop instead
+    if asyncio_loop is None:
+        threading.Thread(target=publisherWorker, name='publisher', daemon=True).start()
 
-def stopAliveTimer():
-    global aliveTimer
-    global aliveTimerRunningStatus
-    aliveTimer.cancel()
-    aliveTimerRunningStatus = False
-    print_line('- stopped MQTT timer', debug=True)
 
+def recordPublishSent(mid):
+    with publish_ack_lock:
+        if publish_early_acks.pop(mid, None) is not None:
+            recordPublishLatency(0.0)
+        else:
+            publish_inflight[mid] = monotonic()
+
+
+def recordPublishAck(mid):
+    # NOTE: called from paho, don't hold our lock while calling into paho (see recordPublishSent)
+    with publish_ack_lock:
+        sentTime = publish_inflight.pop(mid, None)
+        if sentTime is not None:
+            recordPublishLatency(monotonic() - sentTime)
+        else:
+            publish_early_acks[mid] = True
+            while len(publish_early_acks) > K_MAX_EARLY_ACKS:
+                publish_early_acks.popitem(last=False)
 
-def isAliveTimerRunning():
-    global aliveTimerRunningStatus
-    return aliveTimerRunningStatus
 
+def recordPublishLatency(latency):
+    global publish_ack_count
+    global publish_ack_latency_last
+    global publish_ack_latency_max
+    global publish_ack_latency_total
+    publish_ack_count += 1
+    publish_ack_latency_last = latency
+    publish_ack_latency_max = max(publish_ack_latency_max, latency)
+    publish_ack_latency_total += latency
+    print_line('- publish acked in ({:.1f} ms), in-flight=({})', latency * 1000.0, len(publish_inflight), debug=True)
+
+
+# -----------------------------------------------------------------------------
+#  Offline spool
+# -----------------------------------------------------------------------------
+#
+# A fixed-size ring buffer kept in memory and in a file. Reports we can't send
+#  while the broker is unreachable are kept here (oldest dropped when full) and
+#  are replayed in order, at a limited pace, once we're connected again.
+#  Our changes are written to the SD card in batches, not once per report: only
+#  the bytes changed since our last write, at most once a minute (and when our
+#  spool empties or we stop), so a power cut loses at most that minute's reports.
+#
+# file layout: header then data area
+#  header: magic, version, data size, head offset, tail offset, used bytes, record count
+#  record: header (time spooled, topic length, payload length) then topic and payload
+#  a record with topic length of 0 (or too little room for a record header) means wrap to start
+
+K_SPOOL_MAGIC = b'RPIS'
+K_SPOOL_VERSION = 1
+K_SPOOL_HEADER = struct.Struct('<4sIIIIII')
+K_SPOOL_RECORD_HEADER = struct.Struct('<IHI')
+K_SPOOL_FLUSH_INTERVAL_IN_SECONDS = 60
+
+# our spool file's content and its open file descriptor
+offline_spool_buffer = None
+offline_spool_fd = None
+offline_spool_lock = threading.Lock()
+offline_spool_capacity = 0
+offline_spool_head = 0
+offline_spool_tail = 0
+offline_spool_used = 0
+offline_spool_count = 0
+offline_spool_drops = 0
+offline_spool_dirty = False
+# range of our data area changed since our last write: [start, end) offsets into our buffer
+offline_spool_dirty_start = None
+offline_spool_dirty_end = 0
+offline_spool_last_flush = 0.0
+
+
+def openOfflineSpool():
+    global offline_spool_buffer
+    global offline_spool_fd
+    global offline_spool_capacity
+    global offline_spool_head
+    global offline_spool_tail
+    global offline_spool_used
+    global offline_spool_count
+    fileSize = offline_spool_size_in_kb * 1024
+    try:
+        spoolFd = os.open(offline_spool_fspec, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(spoolFd).st_size != fileSize:
+                os.ftruncate(spoolFd, fileSize)
+            spoolContent = os.pread(spoolFd, fileSize, 0)
+        except OSError:
+            os.close(spoolFd)
+            raise
+    except OSError as exc:
+        print_line('Offline spool [{}] not available, exception=({})', offline_spool_fspec, exc, warning=True)
+        offline_spool_buffer = None
+        return
+    offline_spool_fd = spoolFd
+    offline_spool_buffer = bytearray(spoolContent.ljust(fileSize, b'\0'))
+
+    offline_spool_capacity = fileSize - K_SPOOL_HEADER.size
+    magic, version, capacity, head, tail, used, count = K_SPOOL_HEADER.unpack_from(offline_spool_buffer, 0)
+    if magic == K_SPOOL_MAGIC and version == K_SPOOL_VERSION and capacity == offline_spool_capacity and \
+            head <= capacity and tail <= capacity and used <= capacity:
+        offline_spool_head, offline_spool_tail, offline_spool_used, offline_spool_count = head, tail, used, count
+        print_line('Offline spool [{}] holds ({}) reports', offline_spool_fspec, count, verbose=True)
+    else:
+        # new, resized or foreign file: start empty
+        offline_spool_count = 0
+        writeSpoolHeader()
+        flushOfflineSpool()
+
+
+def writeSpoolHeader():
+    global offline_spool_head
+    global offline_spool_tail
+    global offline_spool_used
+    global offline_spool_dirty
+    if offline_spool_count == 0:
+        offline_spool_head = offline_spool_tail = offline_spool_used = 0
+    K_SPOOL_HEADER.pack_into(offline_spool_buffer, 0, K_SPOOL_MAGIC, K_SPOOL_VERSION, offline_spool_capacity,
+                             offline_spool_head, offline_spool_tail, offline_spool_used, offline_spool_count)
+    offline_spool_dirty = True
+
+
+def markSpoolDirty(start, end):
+    # remember this part of our buffer changed, for our next write
+    global offline_spool_dirty_start
+    global offline_spool_dirty_end
+    if offline_spool_dirty_start is None or start < offline_spool_dirty_start:
+        offline_spool_dirty_start = start
+    offline_spool_dirty_end = max(offline_spool_dirty_end, end)
+
+
+def spoolIsWrapped():
+    # our data is split across the end of our data area when the writer is behind the reader
+    return offline_spool_tail < offline_spool_head or \
+        (offline_spool_tail == offline_spool_head and offline_spool_count > 0)
+
+
+def spoolMessage(topic, payload):
+    global offline_spool_tail
+    global offline_spool_used
+    global offline_spool_count
+    global offline_spool_drops
+    topicBytes = topic.encode('utf-8')
+    payloadBytes = payload.encode('utf-8')
+    recordSize = K_SPOOL_RECORD_HEADER.size + len(topicBytes) + len(payloadBytes)
+    if recordSize > offline_spool_capacity // 2:
+        print_line('Offline spool too small for report to [{}] ({} bytes), dropped', topic, recordSize, warning=True)
+        offline_spool_drops += 1
+        return
+    with offline_spool_lock:
+        while True:
+            if offline_spool_count == 0:
+                writeSpoolHeader()  # resets us to the start of our data area
+            if spoolIsWrapped():
+                if offline_spool_head - offline_spool_tail >= recordSize:
+                    break
+                # full: make room by dropping our oldest report
+                unspoolRecord()
+                offline_spool_drops += 1
+                continue
+            if offline_spool_capacity - offline_spool_tail >= recordSize:
+                break
+            # not enough room before the end of our data area, wrap to its start
+            gap = offline_spool_capacity - offline_spool_tail
+            if gap >= K_SPOOL_RECORD_HEADER.size:
+                offset = K_SPOOL_HEADER.size + offline_spool_tail
+                K_SPOOL_RECORD_HEADER.pack_into(offline_spool_buffer, offset, 0, 0, 0)
+                markSpoolDirty(offset, offset + K_SPOOL_RECORD_HEADER.size)
+            offline_spool_used += gap
+            offline_spool_tail = 0
+
+        offset = K_SPOOL_HEADER.size + offline_spool_tail
+        markSpoolDirty(offset, offset + recordSize)
+        K_SPOOL_RECORD_HEADER.pack_into(offline_spool_buffer, offset, int(time()), len(topicBytes), len(payloadBytes))
+        offset += K_SPOOL_RECORD_HEADER.size
+        offline_spool_buffer[offset:offset + len(topicBytes)] = topicBytes
+        offset += len(topicBytes)
+        offline_spool_buffer[offset:offset + len(payloadBytes)] = payloadBytes
+        offline_spool_tail += recordSize
+        offline_spool_used += recordSize
+        offline_spool_count += 1
+        writeSpoolHeader()
+    print_line('- spooled report for [{}], spool depth=({})', topic, offline_spool_count, debug=True)
+
+
+def peekSpoolRecord():
+    # return tuple { time spooled, topic, payload } of our oldest report (skipping any wrap)
+    global offline_spool_head
+    global offline_spool_used
+    gap = offline_spool_capacity - offline_spool_head
+    if gap < K_SPOOL_RECORD_HEADER.size or \
+            K_SPOOL_RECORD_HEADER.unpack_from(offline_spool_buffer, K_SPOOL_HEADER.size + offline_spool_head)[1] == 0:
+        offline_spool_used -= gap
+        offline_spool_head = 0
+    offset = K_SPOOL_HEADER.size + offline_spool_head
+    spooledTime, topicLength, payloadLength = K_SPOOL_RECORD_HEADER.unpack_from(offline_spool_buffer, offset)
+    offset += K_SPOOL_RECORD_HEADER.size
+    topic = offline_spool_buffer[offset:offset + topicLength].decode('utf-8')
+    offset += topicLength
+    payload = offline_spool_buffer[offset:offset + payloadLength].decode('utf-8')
+    return (spooledTime, topic, payload)
+
+
+def unspoolRecord():
+    # forget our oldest report
+    global offline_spool_head
+    global offline_spool_used
+    global offline_spool_count
+    spooledTime, topic, payload = peekSpoolRecord()
+    recordSize = K_SPOOL_RECORD_HEADER.size + len(topic.encode('utf-8')) + len(payload.encode('utf-8'))
+    offline_spool_head += recordSize
+    offline_spool_used -= recordSize
+    offline_spool_count -= 1
+    writeSpoolHeader()
+
+
+def flushOfflineSpool():
+    # write our changed data, then our header, to our spool file
+    global offline_spool_dirty
+    global offline_spool_dirty_start
+    global offline_spool_dirty_end
+    global offline_spool_last_flush
+    if offline_spool_buffer is None or not offline_spool_dirty:
+        return
+    try:
+        if offline_spool_dirty_start is not None:
+            os.pwrite(offline_spool_fd, offline_spool_buffer[offline_spool_dirty_start:offline_spool_dirty_end],
+                      offline_spool_dirty_start)
+        os.pwrite(offline_spool_fd, offline_spool_buffer[:K_SPOOL_HEADER.size], 0)
+        os.fdatasync(offline_spool_fd)
+    except OSError as exc:
+        print_line('Offline spool [{}] write failed, exception=({})', offline_spool_fspec, exc, warning=True)
+    print_line('- offline spool written: ({}) bytes of data', 0 if offline_spool_dirty_start is None else
+               offline_spool_dirty_end - offline_spool_dirty_start, debug=True)
+    offline_spool_dirty = False
+    offline_spool_dirty_start = None
+    offline_spool_dirty_end = 0
+    offline_spool_last_flush = monotonic()
+
+
+def replayOfflineSpool():
+    # scheduled every second: send some of our spooled reports, write our changes now and then
+    replayed = 0
+    with offline_spool_lock:
+        while mqtt_client_connected and offline_spool_count > 0 and replayed < offline_replay_per_second:
+            spooledTime, topic, payload = peekSpoolRecord()
+            messageInfo = mqtt_client.publish(topic, payload, 1, retain=False)
+            if messageInfo.rc != mqtt.MQTT_ERR_SUCCESS:
+                break   # lost our broker again, keep it for later
+            recordPublishSent(messageInfo.mid)
+            unspoolRecord()
+            replayed += 1
+            print_line('- replayed report for [{}] from ({}), spool depth=({})',
+                topic, datetime.fromtimestamp(spooledTime).isoformat(), offline_spool_count, debug=True)
+        if offline_spool_dirty and (offline_spool_count == 0 or
+                                    monotonic() - offline_spool_last_flush >= K_SPOOL_FLUSH_INTERVAL_IN_SECONDS):
+            flushOfflineSpool()
 
-# our ALIVE TIMER
-aliveTimer = threading.Timer(K_ALIVE_TIMOUT_IN_SECONDS, aliveTimeoutHandler)
-# our BOOL tracking state of ALIVE TIMER
-aliveTimerRunningStatus = False
+
+
+# -----------------------------------------------------------------------------
+#  ALIVE MQTT Notices handling
+# -----------------------------------------------------------------------------
+
+K_ALIVE_TIMOUT_IN_SECONDS = 60
+
+
+def publishAliveStatus():
+    print_line('- SEND: yes, still alive -', debug=True)
+    mqtt_client.publish(lwt_sensor_topic, payload=lwt_online_val, retain=False)
+    mqtt_client.publish(lwt_command_topic, payload=lwt_online_val, retain=False)
+
+
+def publishShuttingDownStatus():
+    print_line('- SEND: shutting down -', debug=True)
+    mqtt_client.publish(lwt_sensor_topic, payload=lwt_offline_val, retain=False)
+    mqtt_client.publish(lwt_command_topic, payload=lwt_offline_val, retain=False)
 
 
 # -----------------------------------------------------------------------------
@@ -1313,86 +3166,119 @@ aliveTimerRunningStatus = False
 # -----------------------------------------------------------------------------
 
 # MQTT connection
-lwt_sensor_topic = '{}/sensor/{}/status'.format(base_topic, sensor_name.lower())
-lwt_command_topic = '{}/command/{}/status'.format(base_topic, sensor_name.lower())
 lwt_online_val = 'online'
 lwt_offline_val = 'offline'
+mqtt_reconnect_min_delay = 1.0
+mqtt_reconnect_max_delay = 120.0
+mqtt_housekeeping_task = None
 
-print_line('Connecting to MQTT broker ...', verbose=True)
-# ensure backward compatibility with older versions of paho-mqtt (<=2.0.0)
-# ToDo: Need to update to VERSION2 at some point
-try:
-    mqtt_client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
-except AttributeError:
-    mqtt_client = mqtt.Client()
-
-# hook up MQTT callbacks
-mqtt_client.on_connect = on_connect
-mqtt_client.on_disconnect = on_disconnect
-mqtt_client.on_publish = on_publish
-mqtt_client.on_message = on_message
-
-mqtt_client.will_set(lwt_sensor_topic, payload=lwt_offline_val, retain=True)
-mqtt_client.will_set(lwt_command_topic, payload=lwt_offline_val, retain=True)
-
-if config['MQTT'].getboolean('tls', False):
-    # According to the docs, setting PROTOCOL_SSLv23 "Selects the highest protocol version
-    # that both the client and server support. Despite the name, this option can select
-    # “TLS” protocols as well as “SSL”" - so this seems like a resonable default
-    mqtt_client.tls_set(
-        ca_certs=config['MQTT'].get('tls_ca_cert', None),
-        keyfile=config['MQTT'].get('tls_keyfile', None),
-        certfile=config['MQTT'].get('tls_certfile', None),
-        tls_version=ssl.PROTOCOL_SSLv23
-    )
-    # Allow skipping TLS verification if `tls_insecure` configuration option is
-    # set, see https://pypi.org/project/paho-mqtt/#tls-insecure-set for details
-    mqtt_client.tls_insecure_set(config['MQTT'].get('tls_insecure', False))
 
-mqtt_username = os.environ.get("MQTT_USERNAME", config['MQTT'].get('username'))
-mqtt_password = os.environ.get(
-    "MQTT_PASSWORD", config['MQTT'].get('password', None))
+async def mqttHousekeeping():
+    # what paho's loop_start() thread would otherwise do for us: connecting, keepalive
+    #  pings, retries and reconnecting (with backoff) after the connection is lost
+    while True:
+        if mqtt_client.loop_misc() == mqtt.MQTT_ERR_NO_CONN and monotonic() >= mqtt_next_reconnect_time:
+            try:
+                # name lookup and connecting can take a while, don't hold up our event loop
+                await asyncio_loop.run_in_executor(None, mqtt_client.reconnect)
+            except (OSError, ValueError) as exc:
+                print_line('MQTT connect failed exception=({})', exc, debug=True)
+                on_connect_fail(mqtt_client, None)
+        await asyncio.sleep(1.0)
 
-if mqtt_username:
-    mqtt_client.username_pw_set(mqtt_username, mqtt_password)
-try:
-    mqtt_client.connect(os.environ.get('MQTT_HOSTNAME', config['MQTT'].get('hostname', 'localhost')),
-                        port=int(os.environ.get(
-                            'MQTT_PORT', config['MQTT'].get('port', '1883'))),
-                        keepalive=config['MQTT'].getint('keepalive', 60))
-except:
-    print_line('MQTT connection error. Please check your settings in the configuration file "config.ini"',
-               error=True, sd_notify=True)
-    sys.exit(1)
-else:
-    mqtt_client.publish(lwt_sensor_topic, payload=lwt_online_val, retain=False)
-    mqtt_client.publish(lwt_command_topic, payload=lwt_online_val, retain=False)
-    mqtt_client.loop_start()
 
-    while mqtt_client_connected == False:  # wait in loop
-        print_line(
-            '* Wait on mqtt_client_connected=[{}]'.format(mqtt_client_connected), debug=True)
-        sleep(1.0)  # some slack to establish the connection
+K_MQTT_DISCONNECT_WAIT_IN_SECONDS = 1.0
 
-    startAliveTimer()
 
-sd_notifier.notify('READY=1')
+async def disconnectMQTTAsync():
+    # our event loop must still run to send our last messages and our DISCONNECT
+    if mqtt_housekeeping_task is not None:
+        mqtt_housekeeping_task.cancel()     # no reconnecting now
+    await asyncio.sleep(0.5)
+    mqtt_client.disconnect()
+    waitUntil = monotonic() + K_MQTT_DISCONNECT_WAIT_IN_SECONDS
+    while mqtt_client.socket() is not None and monotonic() < waitUntil:
+        await asyncio.sleep(0.05)
+
+
+def startMQTTClient():
+    # create our client and start connecting (in the background) to our broker
+    global mqtt_client
+    global asyncio_loop
+    global mqtt_reconnect_min_delay
+    global mqtt_reconnect_max_delay
+    global mqtt_housekeeping_task
+    print_line('Connecting to MQTT broker ...', verbose=True)
+    # ensure backward compatibility with older versions of paho-mqtt (<=2.0.0)
+    # ToDo: Need to update to VERSION2 at some point
+    try:
+        mqtt_client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
+    except AttributeError:
+        mqtt_client = mqtt.Client()
+
+    # hook up MQTT callbacks
+    mqtt_client.on_connect = on_connect
+    mqtt_client.on_disconnect = on_disconnect
+    mqtt_client.on_connect_fail = on_connect_fail
+    mqtt_client.on_publish = on_publish
+    mqtt_client.on_message = on_message
+
+    if daemon_runtime == 'asyncio':
+        asyncio_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(asyncio_loop)
+        mqtt_client.on_socket_open = on_socket_open
+        mqtt_client.on_socket_close = on_socket_close
+        mqtt_client.on_socket_register_write = on_socket_register_write
+        mqtt_client.on_socket_unregister_write = on_socket_unregister_write
+
+    mqtt_client.will_set(lwt_sensor_topic, payload=lwt_offline_val, retain=True)
+    mqtt_client.will_set(lwt_command_topic, payload=lwt_offline_val, retain=True)
+
+    if config['MQTT'].getboolean('tls', False):
+        # According to the docs, setting PROTOCOL_SSLv23 "Selects the highest protocol version
+        # that both the client and server support. Despite the name, this option can select
+        # “TLS” protocols as well as “SSL”" - so this seems like a resonable default
+        mqtt_client.tls_set(
+            ca_certs=config['MQTT'].get('tls_ca_cert', None),
+            keyfile=config['MQTT'].get('tls_keyfile', None),
+            certfile=config['MQTT'].get('tls_certfile', None),
+            tls_version=ssl.PROTOCOL_SSLv23
+        )
+        # Allow skipping TLS verification if `tls_insecure` configuration option is
+        # set, see https://pypi.org/project/paho-mqtt/#tls-insecure-set for details
+        mqtt_client.tls_insecure_set(config['MQTT'].get('tls_insecure', False))
+
+    mqtt_username = os.environ.get("MQTT_USERNAME", config['MQTT'].get('username'))
+    mqtt_password = os.environ.get(
+        "MQTT_PASSWORD", config['MQTT'].get('password', None))
+
+    if mqtt_username:
+        mqtt_client.username_pw_set(mqtt_username, mqtt_password)
+    mqtt_reconnect_min_delay = config['MQTT'].getfloat('reconnect_min_delay_in_seconds', 1.0)
+    mqtt_reconnect_max_delay = config['MQTT'].getfloat('reconnect_max_delay_in_seconds', 120.0)
+    mqtt_client.reconnect_delay_set(min_delay=mqtt_reconnect_min_delay, max_delay=mqtt_reconnect_max_delay)
+    try:
+        # we don't wait for our broker, the connection is made (and retried) in the background
+        #  while our reports wait for it in our publish queue
+        mqtt_client.connect_async(os.environ.get('MQTT_HOSTNAME', config['MQTT'].get('hostname', 'localhost')),
+                                  port=int(os.environ.get(
+                                      'MQTT_PORT', config['MQTT'].get('port', '1883'))),
+                                  keepalive=config['MQTT'].getint('keepalive', 60))
+    except ValueError:
+        print_line('MQTT connection error. Please check your settings in the configuration file "config.ini"',
+                   error=True, sd_notify=True)
+        sys.exit(1)
+    else:
+        if asyncio_loop is not None:
+            mqtt_housekeeping_task = asyncio_loop.create_task(mqttHousekeeping())
+        else:
+            mqtt_client.loop_start()
+
 
 # -----------------------------------------------------------------------------
 #  Perform our MQTT Discovery Announcement...
 # -----------------------------------------------------------------------------
 
-# what RPi device are we on?
-# get our hostnames so we can setup MQTT
-getNetworkIFs()  # this will fill-in rpi_mac
-
-mac_basic = rpi_mac.lower().replace(":", "")
-mac_left = mac_basic[:6]
-mac_right = mac_basic[6:]
-print_line('mac lt=[{}], rt=[{}], mac=[{}]'.format(
-    mac_left, mac_right, mac_basic), debug=True)
-uniqID = "RPi-{}Mon{}".format(mac_left, mac_right)
-
 # our RPi Reporter device
 # KeyError: 'home310/sensor/rpi-pi3plus/values' let's not use this 'values' as topic
 K_LD_MONITOR = "monitor"
@@ -1401,159 +3287,273 @@ K_LD_FS_USED = "disk_used"
 K_LD_PAYLOAD_NAME = "info"
 K_LD_CPU_USE = "cpu_load"
 K_LD_MEM_USED = "mem_used"
+K_LD_STATIC = "static"
+K_LD_STATIC_INFO = "device_info"
+K_LD_DIAGNOSTICS = "diagnostics"
+K_LD_CYCLE_TIME = "cycle_time"
+K_LD_SLOWEST_COLLECTOR = "slowest_collector"
+K_LD_REPORTER_MEMORY = "reporter_memory"
+K_LD_REPORTER_CPU = "reporter_cpu"
+K_LD_REPORTER_THREADS = "reporter_threads"
 
-if interval_in_minutes < 5:
-    K_LD_CPU_USE_JSON = "cpu.load_1min_prcnt"
-elif interval_in_minutes < 15:
-    K_LD_CPU_USE_JSON = "cpu.load_5min_prcnt"
-else:
-    K_LD_CPU_USE_JSON = "cpu.load_15min_prcnt"
-
-# determine CPU model
-if len(rpi_cpu_tuple) > 0:
-    cpu_model = rpi_cpu_tuple[1]
-else:
-    cpu_model = ''
-
-if cpu_model.find("ARMv7") >= 0 or cpu_model.find("ARMv6") >= 0:
-    cpu_use_icon = "mdi:cpu-32-bit"
-else:
-    cpu_use_icon = "mdi:cpu-64-bit"
-
-print_line('Announcing RPi Monitoring device to MQTT broker for auto-discovery ...')
-
-# Publish our MQTT auto discovery
-#  table of key items to publish:
-detectorValues = OrderedDict([
-    (K_LD_MONITOR, dict(
-        title="Monitor",
-        topic_category="sensor",
-        device_class="timestamp",
-        device_ident="RPi-{}".format(rpi_fqdn),
-        no_title_prefix="yes",
-        icon='mdi:raspberry-pi',
-        json_attr="yes",
-        json_value="timestamp",
-    )),
-    (K_LD_SYS_TEMP, dict(
-        title="Temperature",
-        topic_category="sensor",
-        device_class="temperature",
-        no_title_prefix="yes",
-        unit="°C",
-        icon='mdi:thermometer',
-        json_value="temperature_c",
-    )),
-    (K_LD_FS_USED, dict(
-        title="Disk Used",
-        topic_category="sensor",
-        no_title_prefix="yes",
-        unit="%",
-        icon='mdi:sd',
-        json_value="fs_used_prcnt",
-    )),
-    (K_LD_CPU_USE, dict(
-        title="CPU Use",
-        topic_category="sensor",
-        no_title_prefix="yes",
-        unit="%",
-        icon=cpu_use_icon,
-        json_value=K_LD_CPU_USE_JSON,
-    )),
-    (K_LD_MEM_USED, dict(
-        title="Memory Used",
-        topic_category="sensor",
-        no_title_prefix="yes",
-        json_value="mem_used_prcnt",
-        unit="%",
-        icon='mdi:memory'
-    ))
-])
+values_topic_rel = '{}/{}'.format('~', K_LD_MONITOR)
+activity_topic_rel = '{}/status'.format('~')     # vs. LWT
+command_topic_rel = '~/set'
 
-for [command, _] in commands.items():
-    # print_line('- REGISTER command: [{}]'.format(command), debug=True)
-    iconName = 'mdi:gesture-tap'
-    if 'reboot' in command:
-        iconName = 'mdi:restart'
-    elif 'shutdown' in command:
-        iconName = 'mdi:power-sleep'
-    elif 'service' in command:
-        iconName = 'mdi:cog-counterclockwise'
-    detectorValues.update({
-        command: dict(
-            title=command,
-            topic_category='button',
-            no_title_prefix='yes',
-            icon=iconName,
-            command=command,
-            command_topic='{}/{}'.format(command_base_topic, command)
-        )
-    })
+# sensor -> field within our report, for sensors with their own state topic
+sensor_state_fields = OrderedDict()
 
-# print_line('- detectorValues=[{}]'.format(detectorValues), debug=True)
 
-sensor_base_topic = '{}/sensor/{}'.format(base_topic, sensor_name.lower())
-values_topic_rel = '{}/{}'.format('~', K_LD_MONITOR)
-values_topic = '{}/{}'.format(sensor_base_topic, K_LD_MONITOR)
-activity_topic_rel = '{}/status'.format('~')     # vs. LWT
-activity_topic = '{}/status'.format(sensor_base_topic)    # vs. LWT
+def announceDevice():
+    # publish our Home Assistant MQTT discovery
+    # what RPi device are we on?
+    getNetworkIFs()  # this will fill-in rpi_mac
 
-command_topic_rel = '~/set'
+    mac_basic = rpi_mac.lower().replace(":", "")
+    mac_left = mac_basic[:6]
+    mac_right = mac_basic[6:]
+    print_line('mac lt=[{}], rt=[{}], mac=[{}]', mac_left, mac_right, mac_basic, debug=True)
+    uniqID = "RPi-{}Mon{}".format(mac_left, mac_right)
 
-# discovery_topic = '{}/sensor/{}/{}/config'.format(discovery_prefix, sensor_name.lower(), sensor)
-for [sensor, params] in detectorValues.items():
-    discovery_topic = '{}/{}/{}/{}/config'.format(discovery_prefix,
-                                                  params['topic_category'], sensor_name.lower(), sensor)
-    payload = OrderedDict()
-    if 'no_title_prefix' in params:
-        payload['name'] = "{}".format(params['title'].title())
+    if cpu_use_source == 'busy':
+        K_LD_CPU_USE_JSON = "cpu.busy_prcnt"
+    elif interval_in_minutes < 5:
+        K_LD_CPU_USE_JSON = "cpu.load_1min_prcnt"
+    elif interval_in_minutes < 15:
+        K_LD_CPU_USE_JSON = "cpu.load_5min_prcnt"
     else:
-        payload['name'] = "{} {}".format(
-            sensor_name.title(), params['title'].title())
-    payload['uniq_id'] = "{}_{}".format(uniqID, sensor.lower())
-    if 'device_class' in params:
-        payload['dev_cla'] = params['device_class']
-    if 'unit' in params:
-        payload['unit_of_measurement'] = params['unit']
-    if 'json_value' in params:
-        payload['stat_t'] = values_topic_rel
-        payload['val_tpl'] = "{{{{ value_json.{}.{} }}}}".format(K_LD_PAYLOAD_NAME, params['json_value'])
-    if 'command' in params:
-        payload['~'] = command_base_topic
-        payload['cmd_t'] = '~/{}'.format(params['command'])
-        payload['json_attr_t'] = '~/{}/attributes'.format(params['command'])
+        K_LD_CPU_USE_JSON = "cpu.load_15min_prcnt"
+
+    # determine CPU model
+    if len(rpi_cpu_identity_tuple) > 0:
+        cpu_model = rpi_cpu_identity_tuple[1]
     else:
-        payload['~'] = sensor_base_topic
-    payload['avty_t'] = activity_topic_rel
-    payload['pl_avail'] = lwt_online_val
-    payload['pl_not_avail'] = lwt_offline_val
-    if 'trigger_type' in params:
-        payload['type'] = params['trigger_type']
-    if 'trigger_subtype' in params:
-        payload['subtype'] = params['trigger_subtype']
-    if 'icon' in params:
-        payload['ic'] = params['icon']
-    if 'json_attr' in params:
-        payload['json_attr_t'] = values_topic_rel
-        payload['json_attr_tpl'] = '{{{{ value_json.{} | tojson }}}}'.format(K_LD_PAYLOAD_NAME)
-    if 'device_ident' in params:
-        payload['dev'] = {
-            'identifiers': ["{}".format(uniqID)],
-            'manufacturer': 'Raspberry Pi (Trading) Ltd.',
-            'name': params['device_ident'],
-            'model': '{}'.format(rpi_model),
-            'sw_version': "{} {}".format(rpi_linux_release, rpi_linux_version)
-        }
+        cpu_model = ''
+
+    if cpu_model.find("ARMv7") >= 0 or cpu_model.find("ARMv6") >= 0:
+        cpu_use_icon = "mdi:cpu-32-bit"
     else:
-        payload['dev'] = {
-            'identifiers': ["{}".format(uniqID)],
-        }
-    mqtt_client.publish(discovery_topic, json.dumps(payload), 1, retain=True)
+        cpu_use_icon = "mdi:cpu-64-bit"
+
+    print_line('Announcing RPi Monitoring device to MQTT broker for auto-discovery ...')
+
+    # Publish our MQTT auto discovery
+    #  table of key items to publish:
+    detectorValues = OrderedDict([
+        (K_LD_MONITOR, dict(
+            title="Monitor",
+            topic_category="sensor",
+            device_class="timestamp",
+            device_ident="RPi-{}".format(rpi_fqdn),
+            no_title_prefix="yes",
+            icon='mdi:raspberry-pi',
+            json_attr="yes",
+            json_value="timestamp",
+        )),
+        (K_LD_SYS_TEMP, dict(
+            title="Temperature",
+            topic_category="sensor",
+            device_class="temperature",
+            no_title_prefix="yes",
+            unit="°C",
+            icon='mdi:thermometer',
+            json_value="temperature_c",
+        )),
+        (K_LD_FS_USED, dict(
+            title="Disk Used",
+            topic_category="sensor",
+            no_title_prefix="yes",
+            unit="%",
+            icon='mdi:sd',
+            json_value="fs_used_prcnt",
+        )),
+        (K_LD_CPU_USE, dict(
+            title="CPU Use",
+            topic_category="sensor",
+            no_title_prefix="yes",
+            unit="%",
+            icon=cpu_use_icon,
+            json_value=K_LD_CPU_USE_JSON,
+        )),
+        (K_LD_MEM_USED, dict(
+            title="Memory Used",
+            topic_category="sensor",
+            no_title_prefix="yes",
+            json_value="mem_used_prcnt",
+            unit="%",
+            icon='mdi:memory'
+        ))
+    ])
+
+    if publish_static_separately:
+        # the static facts are no longer in the monitor payload, show them as
+        #  attributes of their own entity
+        detectorValues.update({
+            K_LD_STATIC_INFO: dict(
+                title="Device Info",
+                topic_category="sensor",
+                no_title_prefix="yes",
+                icon='mdi:information-outline',
+                json_attr="yes",
+                json_value="rpi_model",
+                values_topic='{}/{}'.format('~', K_LD_STATIC),
+            )
+        })
+
+    if publish_diagnostics:
+        # our timing statistics, the detail is in the attributes of our cycle time entity
+        detectorValues.update({
+            K_LD_CYCLE_TIME: dict(
+                title="Cycle Time",
+                topic_category="sensor",
+                no_title_prefix="yes",
+                unit="ms",
+                icon='mdi:timer-outline',
+                json_attr="yes",
+                json_value="cycle_ms",
+                values_topic='{}/{}'.format('~', K_LD_DIAGNOSTICS),
+                entity_category="diagnostic",
+            ),
+            K_LD_SLOWEST_COLLECTOR: dict(
+                title="Slowest Collector",
+                topic_category="sensor",
+                no_title_prefix="yes",
+                icon='mdi:timer-sand',
+                json_value="slowest_collector",
+                values_topic='{}/{}'.format('~', K_LD_DIAGNOSTICS),
+                entity_category="diagnostic",
+            ),
+        })
+
+    if publish_reporter_usage_sensors:
+        # what this daemon costs, to spot leaks and regressions in the field
+        detectorValues.update({
+            K_LD_REPORTER_MEMORY: dict(
+                title="Reporter Memory",
+                topic_category="sensor",
+                no_title_prefix="yes",
+                unit="kB",
+                icon='mdi:memory',
+                json_value="reporter_usage.rss_kb",
+                entity_category="diagnostic",
+            ),
+            K_LD_REPORTER_CPU: dict(
+                title="Reporter CPU",
+                topic_category="sensor",
+                no_title_prefix="yes",
+                unit="%",
+                icon='mdi:cpu-64-bit',
+                json_value="reporter_usage.cpu_prcnt",
+                entity_category="diagnostic",
+            ),
+            K_LD_REPORTER_THREADS: dict(
+                title="Reporter Threads",
+                topic_category="sensor",
+                no_title_prefix="yes",
+                icon='mdi:format-list-numbered',
+                json_value="reporter_usage.threads",
+                entity_category="diagnostic",
+            ),
+        })
+
+    if publish_sample_sensors and sample_interval_in_seconds > 0:
+        # the peaks between our reports, the other figures are in the report's samples
+        for metric, params in K_SAMPLE_METRICS.items():
+            for stat in K_SAMPLE_SENSOR_STATS:
+                detectorValues.update({
+                    'sample_{}_{}'.format(metric, stat): dict(
+                        title='{} {}'.format(params['title'], stat),
+                        topic_category="sensor",
+                        no_title_prefix="yes",
+                        unit=params['unit'],
+                        icon=params['icon'],
+                        json_value='samples.{}.{}'.format(metric, stat),
+                    )
+                })
+
+    for [command, _] in commands.items():
+        # print_line('- REGISTER command: [{}]'.format(command), debug=True)
+        iconName = 'mdi:gesture-tap'
+        if 'reboot' in command:
+            iconName = 'mdi:restart'
+        elif 'shutdown' in command:
+            iconName = 'mdi:power-sleep'
+        elif 'service' in command:
+            iconName = 'mdi:cog-counterclockwise'
+        detectorValues.update({
+            command: dict(
+                title=command,
+                topic_category='button',
+                no_title_prefix='yes',
+                icon=iconName,
+                command=command,
+                command_topic='{}/{}'.format(command_base_topic, command)
+            )
+        })
+
+    # print_line('- detectorValues=[{}]'.format(detectorValues), debug=True)
+
+    # discovery_topic = '{}/sensor/{}/{}/config'.format(discovery_prefix, sensor_name.lower(), sensor)
+    for [sensor, params] in detectorValues.items():
+        discovery_topic = '{}/{}/{}/{}/config'.format(discovery_prefix,
+                                                      params['topic_category'], sensor_name.lower(), sensor)
+        payload = OrderedDict()
+        if 'no_title_prefix' in params:
+            payload['name'] = "{}".format(params['title'].title())
+        else:
+            payload['name'] = "{} {}".format(
+                sensor_name.title(), params['title'].title())
+        payload['uniq_id'] = "{}_{}".format(uniqID, sensor.lower())
+        if 'device_class' in params:
+            payload['dev_cla'] = params['device_class']
+        if 'unit' in params:
+            payload['unit_of_measurement'] = params['unit']
+        if 'entity_category' in params:
+            payload['ent_cat'] = params['entity_category']
+        if 'json_value' in params and publish_sensor_states and not 'json_attr' in params and not 'values_topic' in params:
+            # plain value on its own topic, no template needed
+            payload['stat_t'] = '{}/{}'.format('~', sensor)
+            sensor_state_fields[sensor] = params['json_value']
+        elif 'json_value' in params:
+            payload['stat_t'] = params.get('values_topic', values_topic_rel)
+            payload['val_tpl'] = "{{{{ value_json.{}.{} }}}}".format(K_LD_PAYLOAD_NAME, params['json_value'])
+        if 'command' in params:
+            payload['~'] = command_base_topic
+            payload['cmd_t'] = '~/{}'.format(params['command'])
+            payload['json_attr_t'] = '~/{}/attributes'.format(params['command'])
+        else:
+            payload['~'] = sensor_base_topic
+        payload['avty_t'] = activity_topic_rel
+        payload['pl_avail'] = lwt_online_val
+        payload['pl_not_avail'] = lwt_offline_val
+        if 'trigger_type' in params:
+            payload['type'] = params['trigger_type']
+        if 'trigger_subtype' in params:
+            payload['subtype'] = params['trigger_subtype']
+        if 'icon' in params:
+            payload['ic'] = params['icon']
+        if 'json_attr' in params:
+            payload['json_attr_t'] = params.get('values_topic', values_topic_rel)
+            payload['json_attr_tpl'] = '{{{{ value_json.{} | tojson }}}}'.format(K_LD_PAYLOAD_NAME)
+        if 'device_ident' in params:
+            payload['dev'] = {
+                'identifiers': ["{}".format(uniqID)],
+                'manufacturer': 'Raspberry Pi (Trading) Ltd.',
+                'name': params['device_ident'],
+                'model': '{}'.format(rpi_model),
+                'sw_version': "{} {}".format(rpi_linux_release, rpi_linux_version)
+            }
+        else:
+            payload['dev'] = {
+                'identifiers': ["{}".format(uniqID)],
+            }
+        mqtt_client.publish(discovery_topic, json.dumps(payload), 1, retain=True)
+
+        # remove connections as test:                  'connections' : [["mac", mac.lower()], [interface, ipaddr]],
 
-    # remove connections as test:                  'connections' : [["mac", mac.lower()], [interface, ipaddr]],
 
 # -----------------------------------------------------------------------------
-#  timer and timer funcs for period handling
+#  period handling
 # -----------------------------------------------------------------------------
 
 TIMER_INTERRUPT = (-1)
@@ -1563,39 +3563,13 @@ TEST_INTERRUPT = (-2)
 def periodTimeoutHandler():
     print_line('- PERIOD TIMER INTERRUPT -', debug=True)
     handle_interrupt(TIMER_INTERRUPT)  # '0' means we have a timer interrupt!!!
-    startPeriodTimer()
-
-
-def startPeriodTimer():
-    global endPeriodTimer
-    global periodTimeRunningStatus
-    stopPeriodTimer()
-    endPeriodTimer = threading.Timer(
-        interval_in_minutes * 60.0, periodTimeoutHandler)
-    endPeriodTimer.start()
-    periodTimeRunningStatus = True
-    print_line(
-        '- started PERIOD timer - every {} seconds'.format(interval_in_minutes * 60.0), debug=True)
 
 
-def stopPeriodTimer():
-    global endPeriodTimer
-    global periodTimeRunningStatus
-    endPeriodTimer.cancel()
-    periodTimeRunningStatus = False
-    print_line('- stopped PERIOD timer', debug=True)
-
-
-def isPeriodTimerRunning():
-    global periodTimeRunningStatus
-    return periodTimeRunningStatus
+async def periodTimeoutHandlerAsync():
+    print_line('- PERIOD TIMER INTERRUPT -', debug=True)
+    await handle_interrupt_async(TIMER_INTERRUPT)
 
 
-# our TIMER
-endPeriodTimer = threading.Timer(
-    interval_in_minutes * 60.0, periodTimeoutHandler)
-# our BOOL tracking state of TIMER
-periodTimeRunningStatus = False
 reported_first_time = False
 
 # -----------------------------------------------------------------------------
@@ -1631,6 +3605,11 @@ K_RPI_DRV_USED = "used_prcnt"
 K_RPI_DRV_MOUNT = "mount_pt"
 K_RPI_DRV_DEVICE = "device"
 K_RPI_DRV_NFS = "device-nfs"
+K_RPI_DRV_READ_RATE = "read_bytes_s"
+K_RPI_DRV_WRITE_RATE = "write_bytes_s"
+K_RPI_DRV_IOPS = "iops"
+K_RPI_DRV_BUSY = "busy_prcnt"
+K_RPI_DRV_WRITTEN = "written_mb"
 K_RPI_DVC_IP = "ip"
 K_RPI_DVC_PATH = "dvc"
 # new memory dictionary
@@ -1650,8 +3629,44 @@ K_RPI_CPU_SERIAL = "serial"
 K_RPI_CPU_LOAD1 = "load_1min_prcnt"
 K_RPI_CPU_LOAD5 = "load_5min_prcnt"
 K_RPI_CPU_LOAD15 = "load_15min_prcnt"
+K_RPI_CPU_BUSY = "busy_prcnt"
+K_RPI_CPU_IOWAIT = "iowait_prcnt"
+K_RPI_CPU_STEAL = "steal_prcnt"
+K_RPI_CPU_CORE_USAGE = "cores"
 # list of throttle status
 K_RPI_THROTTLE = "throttle"
+# list of facts whose values are from an earlier cycle
+K_RPI_STALE = "stale"
+K_RPI_SAMPLES = "samples"
+K_RPI_SPOOL_DEPTH = "spool_depth"
+K_RPI_SPOOL_DROPS = "spool_drops"
+
+K_RPI_REPORTER_USAGE = "reporter_usage"
+K_RPI_USAGE_RSS = "rss_kb"
+K_RPI_USAGE_RSS_PEAK = "rss_peak_kb"
+K_RPI_USAGE_THREADS = "threads"
+K_RPI_USAGE_CPU_USER = "cpu_user_ms"
+K_RPI_USAGE_CPU_SYS = "cpu_sys_ms"
+K_RPI_USAGE_CPU = "cpu_prcnt"
+K_RPI_USAGE_CHILDREN_CPU = "children_cpu_ms"
+K_RPI_USAGE_CHILDREN = "children_forked"
+
+K_RPI_TOP_PROCESSES = "top_processes"
+K_RPI_TOP_BY_CPU = "by_cpu"
+K_RPI_TOP_BY_RSS = "by_rss"
+K_RPI_PROC_PID = "pid"
+K_RPI_PROC_NAME = "name"
+K_RPI_PROC_CMDLINE = "cmdline"
+K_RPI_PROC_CPU = "cpu_prcnt"
+K_RPI_PROC_RSS = "rss_kb"
+
+# fields which only change with a reboot or OS upgrade, see publish_static_separately
+K_RPI_STATIC_FIELDS = [K_RPI_MODEL, K_RPI_CONNECTIONS, K_RPI_HOSTNAME, K_RPI_FQDN, K_RPI_LINUX_RELEASE,
+                       K_RPI_LINUX_VERSION, K_RPI_SCRIPT, K_RPI_SCRIPT_VERSIONS]
+K_RPI_CPU_STATIC_FIELDS = [K_RPI_CPU_HARDWARE, K_RPI_CPU_MODEL, K_RPI_CPU_CORES, K_RPI_CPU_BOGOMIPS, K_RPI_CPU_SERIAL]
+
+# the static facts we last published
+last_published_static = None
 
 
 def send_status(timestamp, nothing):
@@ -1709,6 +3724,19 @@ def send_status(timestamp, nothing):
     if len(rpi_throttle_status) > 0:
         rpiData[K_RPI_THROTTLE] = rpi_throttle_status
 
+    rpiUsage = getReporterUsageDictionary()
+    if len(rpiUsage) > 0:
+        rpiData[K_RPI_REPORTER_USAGE] = rpiUsage
+
+    rpiTopProcesses = getTopProcessesDictionary()
+    if len(rpiTopProcesses) > 0:
+        rpiData[K_RPI_TOP_PROCESSES] = rpiTopProcesses
+
+    if sample_interval_in_seconds > 0:
+        rpiSamples = getSamplesDictionary()
+        if len(rpiSamples) > 0:
+            rpiData[K_RPI_SAMPLES] = rpiSamples
+
     rpiData[K_RPI_SYSTEM_TEMP] = forceSingleDigit(rpi_system_temp)
     rpiData[K_RPI_GPU_TEMP] = forceSingleDigit(rpi_gpu_temp)
     rpiData[K_RPI_CPU_TEMP] = forceSingleDigit(rpi_cpu_temp)
@@ -1716,11 +3744,166 @@ def send_status(timestamp, nothing):
     rpiData[K_RPI_SCRIPT] = rpi_mqtt_script.replace('.py', '')
     rpiData[K_RPI_SCRIPT_VERSIONS] = ','.join(daemon_version_list)
     rpiData[SCRIPT_REPORT_INTERVAL] = interval_in_minutes
+    if len(fact_stale_names) > 0:
+        rpiData[K_RPI_STALE] = fact_stale_names
+    if offline_spool_buffer is not None:
+        rpiData[K_RPI_SPOOL_DEPTH] = offline_spool_count
+        rpiData[K_RPI_SPOOL_DROPS] = offline_spool_drops
+
+    if publish_static_separately:
+        if opt_debug:   # only size our report when we'll log it
+            fullSize = len(json.dumps({K_LD_PAYLOAD_NAME: rpiData}))
+        rpiStatic = splitStaticData(rpiData)
+        if opt_debug:
+            print_line('- report size: ({}) bytes with static facts, ({}) bytes without',
+                       fullSize, len(json.dumps({K_LD_PAYLOAD_NAME: rpiData})), debug=True)
+        publishStaticDataIfChanged(rpiStatic)
 
     rpiTopDict = OrderedDict()
     rpiTopDict[K_LD_PAYLOAD_NAME] = rpiData
 
-    _thread.start_new_thread(publishMonitorData, (rpiTopDict, values_topic))
+    if shouldPublishReport(rpiData):
+        publishMonitorData(rpiTopDict, values_topic)
+        if len(sensor_state_fields) > 0:
+            publishSensorStates(getSensorStates(rpiData))
+
+
+
+# fields which change every report but on their own are not worth publishing
+K_CHANGE_IGNORED_FIELDS = [SCRIPT_TIMESTAMP, K_RPI_UPTIME, K_RPI_UPTIME_SECONDS, K_RPI_SPOOL_DEPTH]
+# sections whose entries come, go and reorder every report: only their numeric values are
+#  compared, those of a new entry with 0 (a small process entering or any leaving our top lists isn't news)
+K_CHANGE_NUMERIC_ONLY_SECTIONS = [K_RPI_TOP_PROCESSES]
+
+# what we last published and when (monotonic)
+last_published_fields = None
+last_published_time = 0.0
+
+
+def flattenReport(data, prefix=''):
+    # return { 'cpu.load_1min_prcnt': 12.5, ... } for our nested report
+    #  (entries of a list of dicts are named by their pid, else by position: 'top_processes.by_cpu.1234.name')
+    fields = OrderedDict()
+    for key, value in data.items():
+        fieldName = '{}{}'.format(prefix, key)
+        if isinstance(value, dict):
+            fields.update(flattenReport(value, '{}.'.format(fieldName)))
+        elif isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
+            entries = OrderedDict((entry.get(K_RPI_PROC_PID, index), entry) for index, entry in enumerate(value))
+            fields.update(flattenReport(entries, '{}.'.format(fieldName)))
+        else:
+            fields[fieldName] = value
+    return fields
+
+
+def getFieldDeadband(fieldName):
+    for pattern, deadband in deadbands.items():
+        if fnmatch.fnmatchcase(fieldName, pattern):
+            return deadband
+    return None
+
+
+def isNumericOnlyField(fieldName):
+    return fieldName.split('.')[0] in K_CHANGE_NUMERIC_ONLY_SECTIONS
+
+
+def changedFieldName(priorFields, currentFields):
+    # return name of first field which changed enough to publish, else None
+    priorNames = set(fieldName for fieldName in priorFields.keys() if not isNumericOnlyField(fieldName))
+    currentNames = set(fieldName for fieldName in currentFields.keys() if not isNumericOnlyField(fieldName))
+    if priorNames != currentNames:
+        return '(field set)'
+    for fieldName, currValue in currentFields.items():
+        if fieldName in K_CHANGE_IGNORED_FIELDS:
+            continue
+        deadband = getFieldDeadband(fieldName)
+        if isNumericOnlyField(fieldName) and fieldName not in priorFields:
+            # new to our list: it's news when it's beyond its deadband from nothing
+            if deadband is None:
+                continue
+            priorValue = 0
+        else:
+            priorValue = priorFields[fieldName]
+        isNumeric = isinstance(currValue, (int, float)) and not isinstance(currValue, bool) and \
+            isinstance(priorValue, (int, float)) and not isinstance(priorValue, bool)
+        if isNumericOnlyField(fieldName) and not isNumeric:
+            continue
+        if deadband is not None and isNumeric:
+            if abs(currValue - priorValue) >= deadband:
+                return fieldName
+        elif currValue != priorValue:
+            return fieldName
+    return None
+
+
+def shouldPublishReport(rpiData):
+    global last_published_fields
+    global last_published_time
+    currentFields = flattenReport(rpiData)
+    timeNow = monotonic()
+    if not publish_on_change or last_published_fields is None:
+        reason = 'always' if not publish_on_change else 'first report'
+    # (allow a second of slack as reports are due at exact multiples of our interval)
+    elif timeNow - last_published_time >= max_silence_in_minutes * 60 - 1.0:
+        reason = 'max silence'
+    else:
+        reason = changedFieldName(last_published_fields, currentFields)
+    if reason is None:
+        print_line('- report unchanged within deadbands, not published', debug=True)
+        return False
+    print_line('- publishing report, reason=[{}]', reason, debug=True)
+    last_published_fields = currentFields
+    last_published_time = timeNow
+    return True
+
+
+def splitStaticData(rpiData):
+    # move the static facts out of our report, returns them
+    rpiStatic = OrderedDict()
+    for fieldName in K_RPI_STATIC_FIELDS:
+        if fieldName in rpiData:
+            rpiStatic[fieldName] = rpiData.pop(fieldName)
+    if K_RPI_CPU in rpiData:
+        rpiCpuStatic = OrderedDict()
+        for fieldName in K_RPI_CPU_STATIC_FIELDS:
+            if fieldName in rpiData[K_RPI_CPU]:
+                rpiCpuStatic[fieldName] = rpiData[K_RPI_CPU].pop(fieldName)
+        rpiStatic[K_RPI_CPU] = rpiCpuStatic
+    return rpiStatic
+
+
+def publishStaticDataIfChanged(rpiStatic):
+    # publish (retained) our static facts when first seen or changed
+    global last_published_static
+    if rpiStatic == last_published_static:
+        return
+    last_published_static = rpiStatic
+    rpiTopDict = OrderedDict()
+    rpiTopDict[K_LD_PAYLOAD_NAME] = rpiStatic
+    publishMonitorData(rpiTopDict, static_topic, True)
+
+
+def getSensorStates(rpiData):
+    # return { sensor: value } for our sensors with their own state topic
+    sensorStates = OrderedDict()
+    for sensor, fieldName in sensor_state_fields.items():
+        value = rpiData
+        for fieldPart in fieldName.split('.'):
+            value = value.get(fieldPart) if isinstance(value, dict) else None
+        if value is not None:
+            sensorStates[sensor] = value
+    return sensorStates
+
+
+def publishSensorStates(sensorStates):
+    statesSize = 0
+    for sensor, value in sensorStates.items():
+        payload = '{}'.format(value)
+        statesSize += len(payload)
+        queuePublish('{}/{}'.format(sensor_base_topic, sensor), payload)
+    # HA evaluated one template over the whole report for each of these sensors, now none
+    print_line('- published ({}) sensor states, ({}) bytes, saving ({}) template evaluations',
+        len(sensorStates), statesSize, len(sensorStates), debug=True)
 
 
 def forceSingleDigit(temperature):
@@ -1732,7 +3915,7 @@ def getDrivesDictionary():
     global rpi_filesystem
     rpiDrives = OrderedDict()
 
-    # tuple { total blocks, used%, mountPoint, device }
+    # tuple { total blocks, used%, mountPoint, device, deviceID }
     for driveTuple in rpi_filesystem:
         rpiSingleDrive = OrderedDict()
         rpiSingleDrive[K_RPI_DRV_BLOCKS] = int(driveTuple[0])
@@ -1751,6 +3934,11 @@ def getDrivesDictionary():
             # rpiTest[K_RPI_DVC_PATH] = '/srv/c2db7b94'
             # rpiSingleDrive[K_RPI_DRV_NFS] = rpiTest
         rpiSingleDrive[K_RPI_DRV_MOUNT] = driveTuple[2]
+        # tuple { read bytes/s, write bytes/s, IOPS, busy %, MB written since boot }
+        diskIO = rpi_disk_io.get(driveTuple[4])
+        if diskIO is not None:
+            rpiSingleDrive.update(zip([K_RPI_DRV_READ_RATE, K_RPI_DRV_WRITE_RATE, K_RPI_DRV_IOPS,
+                                       K_RPI_DRV_BUSY, K_RPI_DRV_WRITTEN], diskIO))
         driveKey = driveTuple[2].replace('/', '-').replace('-', '', 1)
         if len(driveKey) == 0:
             driveKey = "root"
@@ -1786,7 +3974,7 @@ def getNetworkDictionary():
         subValue = currTuple[2]
         tmpData[subKey] = subValue
     networkData[priorIFKey] = tmpData
-    print_line('networkData:{}"'.format(networkData), debug=True)
+    print_line('networkData:{}"', networkData, debug=True)
     return networkData
 
 
@@ -1804,6 +3992,33 @@ def getMemoryDictionary():
     return memoryData
 
 
+def getReporterUsageDictionary():
+    # TYPICAL:
+    #   Tuple (RSS kB, peak RSS kB, Threads, CPU user ms, CPU sys ms, CPU %, Children CPU ms, Children forked)
+    usageData = OrderedDict()
+    if rpi_reporter_usage_tuple != '':
+        usageData[K_RPI_USAGE_RSS] = rpi_reporter_usage_tuple[0]
+        usageData[K_RPI_USAGE_RSS_PEAK] = rpi_reporter_usage_tuple[1]
+        usageData[K_RPI_USAGE_THREADS] = rpi_reporter_usage_tuple[2]
+        usageData[K_RPI_USAGE_CPU_USER] = rpi_reporter_usage_tuple[3]
+        usageData[K_RPI_USAGE_CPU_SYS] = rpi_reporter_usage_tuple[4]
+        usageData[K_RPI_USAGE_CPU] = rpi_reporter_usage_tuple[5]
+        usageData[K_RPI_USAGE_CHILDREN_CPU] = rpi_reporter_usage_tuple[6]
+        usageData[K_RPI_USAGE_CHILDREN] = rpi_reporter_usage_tuple[7]
+    return usageData
+
+
+def getTopProcessesDictionary():
+    # TYPICAL:
+    #   Tuple (list by CPU, list by RSS) of Tuple (PID, Name, Command line, CPU %, RSS kB)
+    topData = OrderedDict()
+    if rpi_top_processes != '':
+        for topKey, topList in zip([K_RPI_TOP_BY_CPU, K_RPI_TOP_BY_RSS], rpi_top_processes):
+            topData[topKey] = [OrderedDict(zip([K_RPI_PROC_PID, K_RPI_PROC_NAME, K_RPI_PROC_CMDLINE, K_RPI_PROC_CPU, K_RPI_PROC_RSS], process))
+                               for process in topList]
+    return topData
+
+
 def getCPUDictionary():
     # TYPICAL:
     #   Tuple (Hardware, Model Name, NbrCores, BogoMIPS, Serial)
@@ -1818,28 +4033,28 @@ def getCPUDictionary():
         cpuDict[K_RPI_CPU_LOAD1] = rpi_cpu_tuple[5]
         cpuDict[K_RPI_CPU_LOAD5] = rpi_cpu_tuple[6]
         cpuDict[K_RPI_CPU_LOAD15] = rpi_cpu_tuple[7]
-    print_line('cpuDict:{}"'.format(cpuDict), debug=True)
+    # TYPICAL:
+    #   { 'cpu': Tuple (Busy %, IOWait %, Steal %), 'cpu0': ..., 'cpu1': ... }
+    if len(cpuDict) > 0 and 'cpu' in rpi_cpu_usage:
+        cpuDict[K_RPI_CPU_BUSY], cpuDict[K_RPI_CPU_IOWAIT], cpuDict[K_RPI_CPU_STEAL] = rpi_cpu_usage['cpu']
+        coreUsage = OrderedDict()
+        for cpuName, usage in rpi_cpu_usage.items():
+            if cpuName != 'cpu':
+                coreUsage[cpuName] = OrderedDict(zip([K_RPI_CPU_BUSY, K_RPI_CPU_IOWAIT, K_RPI_CPU_STEAL], usage))
+        cpuDict[K_RPI_CPU_CORE_USAGE] = coreUsage
+    print_line('cpuDict:{}"', cpuDict, debug=True)
     return cpuDict
 
 
-def publishMonitorData(latestData, topic):
-    print_line('Publishing to MQTT topic "{}, Data:{}"'.format(
-        topic, json.dumps(latestData)))
-    mqtt_client.publish('{}'.format(topic), json.dumps(
-        latestData), 1, retain=False)
-    sleep(0.5)  # some slack for the publish roundtrip and callback function
+def publishMonitorData(latestData, topic, retain=False):
+    payload = json.dumps(latestData)
+    print_line('Publishing to MQTT topic "{}, Data:{}"', topic, payload, debug=True, fields=dict(mqtt_topic=topic))
+    queuePublish('{}'.format(topic), payload, retain)
 
 
 def update_values():
-    # run get latest values for all
-    getDeviceCpuInfo()
-    getUptime()
-    getFileSystemDrives()
-    getSystemTemperature()
-    getSystemThermalStatus()
-    getLastUpdateDate()
-    getDeviceMemory()
-    getNetworkIFs()
+    # run get latest values for all that are due
+    refreshFacts()
 
 # -----------------------------------------------------------------------------
 
@@ -1847,18 +4062,47 @@ def update_values():
 
 
 def handle_interrupt(channel):
-    global reported_first_time
     sourceID = "<< INTR(" + str(channel) + ")"
     current_timestamp = datetime.now(local_tz)
     print_line(sourceID + " >> Time to report! (%s)" %
                current_timestamp.strftime('%H:%M:%S - %Y/%m/%d'), verbose=True)
     # ----------------------------------
     # have PERIOD interrupt!
+    if publish_diagnostics:
+        cycleStartNs = startCycleTiming()
     update_values()
+    report_values(sourceID, current_timestamp)
+    if publish_diagnostics:
+        recordCycleTiming(cycleStartNs)
+        publishDiagnostics(current_timestamp)
+
 
+async def handle_interrupt_async(channel):
+    sourceID = "<< INTR(" + str(channel) + ")"
+    current_timestamp = datetime.now(local_tz)
+    print_line(sourceID + " >> Time to report! (%s)" %
+               current_timestamp.strftime('%H:%M:%S - %Y/%m/%d'), verbose=True)
+    # ----------------------------------
+    # have PERIOD interrupt!
+    if publish_diagnostics:
+        cycleStartNs = startCycleTiming()
+    await refreshFactsAsync()
+    report_values(sourceID, current_timestamp)
+    if publish_diagnostics:
+        recordCycleTiming(cycleStartNs)
+        publishDiagnostics(current_timestamp)
+
+
+def report_values(sourceID, current_timestamp):
+    global reported_first_time
     if (opt_stall == False or reported_first_time == False and opt_stall == True):
         # ok, report our new detection to MQTT
-        _thread.start_new_thread(send_status, (current_timestamp, ''))
+        if publish_diagnostics:
+            startNs = startStepTiming()
+            send_status(current_timestamp, '')
+            recordStepTiming('report', startNs)
+        else:
+            send_status(current_timestamp, '')
         reported_first_time = True
     else:
         print_line(sourceID + " >> Time to report! (%s) but SKIPPED (TEST: stall)" %
@@ -1868,45 +4112,89 @@ def handle_interrupt(channel):
 def afterMQTTConnect():
     print_line('* afterMQTTConnect()', verbose=True)
     #  NOTE: this is run after MQTT connects
-    # start our interval timer
-    startPeriodTimer()
+    if sample_interval_in_seconds > 0:
+        startSampler()
     # do our first report
     handle_interrupt(0)
+    # schedule our periodic work
+    if asyncio_loop is not None:
+        addScheduledJob('report', periodTimeoutHandlerAsync, interval_in_minutes * 60)
+    else:
+        addScheduledJob('report', periodTimeoutHandler, interval_in_minutes * 60)
+    addScheduledJob('alive', publishAliveStatus, K_ALIVE_TIMOUT_IN_SECONDS)
+    # our first release check runs right after our first report, it needs the network
+    #  (and requests) which we don't want to wait for
+    addScheduledJob('releases', getDaemonReleases, kVersionCheckIntervalInSeconds, firstRunInSeconds=0, blocking=True)
+    if apt_available:
+        addScheduledJob('updates', startUpdateCount, check_interval_in_hours * 60 * 60)
+    if offline_spool_buffer is not None:
+        addScheduledJob('spool', replayOfflineSpool, 1, quiet=True)
 
 # TESTING AGAIN
 # getNetworkIFs()
 # getLastUpdateDate()
 
 # TESTING, early abort
-# stopAliveTimer()
 # exit(0)
 
 
-afterMQTTConnect()  # now instead of after?
-
 # check every 12 hours (twice a day) = 12 hours * 60 minutes * 60 seconds
 kVersionCheckIntervalInSeconds = (12 * 60 * 60)
-# check every 4 hours (6 times a day) = 4 hours * 60 minutes * 60 seconds
-kUpdateCheckIntervalInSeconds = (check_interval_in_hours * 60 * 60)
 
-# now just hang in forever loop until script is stopped externally
-try:
-    while True:
-        #  our INTERVAL timer does the work
-        sleep(10000)
-
-        timeNow = time()
-        if timeNow > daemon_last_fetch_time + kVersionCheckIntervalInSeconds:
-            getDaemonReleases()  # and load them!
-
-        if apt_available:
-            if timeNow > update_last_fetch_time + kUpdateCheckIntervalInSeconds:
-                getNumberOfAvailableUpdates()  # and count them!
-
-finally:
-    # cleanup used pins... just because we like cleaning up after us
-    publishShuttingDownStatus()
-    stopPeriodTimer()   # don't leave our timers running!
-    stopAliveTimer()
-    mqtt_client.disconnect()
-    print_line('* MQTT Disconnect()', verbose=True)
+
+def main():
+    global sensor_name
+    signal(SIGPIPE, SIG_DFL)
+    parseCommandLine()
+    loadConfiguration(config_dir)
+    checkConfiguration()
+
+    # get our hostnames so we can setup MQTT
+    getHostnames()
+    sensor_name = 'rpi-{}'.format(rpi_hostname)
+
+    # get model, cpu, OS and drives so we can use them too in MQTT
+    refreshFacts([K_TIER_STATIC, K_TIER_SLOW, K_TIER_MEDIUM])
+    if apt_available:
+        startUpdateCount()  # (can take minutes when apt is busy, our reports don't wait for it)
+
+    defineTopics()
+    if offline_spool_fspec != '':
+        openOfflineSpool()
+    startMQTTClient()
+    startPublisher()
+
+    # -----------------------------------------------------------------------------
+    #  Perform our MQTT Discovery Announcement...
+    # -----------------------------------------------------------------------------
+    announceDevice()
+
+    afterMQTTConnect()  # now instead of after?
+
+    # our collectors are running and our first report is ready
+    print_line('* first report ready ({:.1f} sec after start)', monotonic() - daemon_start_time, verbose=True)
+    sd_notifier.notify('READY=1')
+
+    # now just run our jobs forever until script is stopped externally
+    try:
+        if asyncio_loop is not None:
+            asyncio_loop.run_until_complete(runScheduledJobsAsync())
+        else:
+            runScheduledJobs()
+
+    finally:
+        # cleanup used pins... just because we like cleaning up after us
+        publishQueuedMessages()  # don't leave reports waiting in our queue
+        publishShuttingDownStatus()
+        flushOfflineSpool()
+        collector_pool.shutdown(wait=False)
+        if asyncio_loop is not None:
+            # no paho thread to send these for us, let our event loop do so
+            asyncio_loop.run_until_complete(disconnectMQTTAsync())
+        else:
+            mqtt_client.disconnect()
+        print_line('* MQTT Disconnect()', verbose=True)
+
+
+if __name__ == '__main__':
+    main()
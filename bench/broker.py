@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Stand-in MQTT broker for our benchmarks - just enough MQTT 3.1.1 for the daemon:
+#  accepts any CONNECT, acknowledges QoS 1 PUBLISH and SUBSCRIBE, answers PINGREQ
+#  and counts what it receives. Nothing is forwarded to subscribers.
+#
+#  $ python3 bench/broker.py [port]        (default 1883, Ctrl-C to stop)
+
+import socket
+import struct
+import sys
+import threading
+from time import monotonic
+
+
+class StandInBroker:
+
+    def __init__(self, port=0, host='127.0.0.1'):
+        self.listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listen_socket.bind((host, port))
+        self.listen_socket.listen(8)
+        self.port = self.listen_socket.getsockname()[1]
+        self.lock = threading.Lock()
+        self.connects = 0
+        self.disconnects = 0
+        self.publishes = 0
+        self.payload_bytes = 0
+        # topic -> tuple { count, last payload }
+        self.topics = {}
+        self.last_publish_time = 0.0
+
+    def start(self):
+        threading.Thread(target=self.acceptConnections, name='stand-in-broker', daemon=True).start()
+        return self
+
+    def stop(self):
+        try:
+            self.listen_socket.close()
+        except OSError:
+            pass
+
+    def acceptConnections(self):
+        while True:
+            try:
+                clientSocket, _ = self.listen_socket.accept()
+            except OSError:
+                return  # stopped
+            threading.Thread(target=self.serveClient, args=(clientSocket,), daemon=True).start()
+
+    def serveClient(self, clientSocket):
+        try:
+            while True:
+                packetType, flags, body = readPacket(clientSocket)
+                if packetType == 1:     # CONNECT
+                    with self.lock:
+                        self.connects += 1
+                    clientSocket.sendall(b'\x20\x02\x00\x00')
+                elif packetType == 3:   # PUBLISH
+                    self.recordPublish(clientSocket, flags, body)
+                elif packetType == 8:   # SUBSCRIBE: grant QoS 0 to each topic filter
+                    clientSocket.sendall(bytes([0x90, 3]) + body[:2] + b'\x00')
+                elif packetType == 12:  # PINGREQ
+                    clientSocket.sendall(b'\xd0\x00')
+                elif packetType == 14:  # DISCONNECT
+                    with self.lock:
+                        self.disconnects += 1
+                    break
+        except (EOFError, OSError):
+            pass
+        clientSocket.close()
+
+    def recordPublish(self, clientSocket, flags, body):
+        topicLength = struct.unpack_from('!H', body, 0)[0]
+        topic = body[2:2 + topicLength].decode('utf-8', errors='replace')
+        payloadOffset = 2 + topicLength
+        if (flags >> 1) & 3:
+            # QoS 1 or 2: acknowledge the message id (QoS 2 isn't used by the daemon)
+            clientSocket.sendall(b'\x40\x02' + body[payloadOffset:payloadOffset + 2])
+            payloadOffset += 2
+        payload = body[payloadOffset:]
+        with self.lock:
+            self.publishes += 1
+            self.payload_bytes += len(payload)
+            count = self.topics.get(topic, (0, b''))[0]
+            self.topics[topic] = (count + 1, payload)
+            self.last_publish_time = monotonic()
+
+    def waitForPublishes(self, count, timeoutInSeconds=5.0):
+        # wait until we've received at least count messages, True when we have
+        waitUntil = monotonic() + timeoutInSeconds
+        while monotonic() < waitUntil:
+            with self.lock:
+                if self.publishes >= count:
+                    return True
+            threading.Event().wait(0.01)
+        return False
+
+
+def readExactly(clientSocket, length):
+    data = b''
+    while len(data) < length:
+        chunk = clientSocket.recv(length - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def readPacket(clientSocket):
+    # return tuple { packet type, flags, body } of the next packet from our client
+    fixedHeader = readExactly(clientSocket, 1)[0]
+    remainingLength = 0
+    multiplier = 1
+    while True:
+        lengthByte = readExactly(clientSocket, 1)[0]
+        remainingLength += (lengthByte & 0x7f) * multiplier
+        multiplier *= 128
+        if lengthByte < 0x80:
+            break
+    body = readExactly(clientSocket, remainingLength) if remainingLength > 0 else b''
+    return (fixedHeader >> 4, fixedHeader & 0x0f, body)
+
+
+if __name__ == '__main__':
+    broker = StandInBroker(int(sys.argv[1]) if len(sys.argv) > 1 else 1883)
+    print('stand-in broker listening on port {}'.format(broker.port))
+    broker.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print('{} connects, {} messages, {} payload bytes'.format(broker.connects, broker.publishes, broker.payload_bytes))
@@ -0,0 +1,735 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Benchmark the daemon's collectors and its report cycle against recorded fixtures
+#
+#  Each fixture set (bench/fixtures/{name}/) holds the /proc, /sys, ... files the
+#  collectors read (under fs/) and, in fixture.json, the output of the commands
+#  they run, statvfs(2) results and file times. The daemon is imported (not run),
+#  its 'os' module and invoke_shell_cmd() are replaced so every read comes from
+#  the fixture set and no command is actually run - the commands are counted as
+#  the forks they'd cost on a real device.
+#
+#  For each fixture set we time each collector, then update_values() and
+#  send_status() with our stand-in broker (bench/broker.py) receiving the reports,
+#  and last our sampler.
+#
+#  $ python3 bench/run_bench.py                      (all fixture sets)
+#  $ python3 bench/run_bench.py pi4b-bookworm-64 -n 200 --json results.json
+#
+#  Time the top processes scan over a synthetic /proc of 500 processes, when
+#  they all used CPU since the prior scan and when none did
+#  $ python3 bench/run_bench.py --processes 500
+#
+#  Time importing the daemon (not running it) in a fresh interpreter, and its peak RSS
+#  $ python3 bench/run_bench.py --import
+#
+#  Compare our runtimes (threads, asyncio) running for real on this machine:
+#  threads started, wake-ups (context switches) per hour and peak RSS
+#  $ python3 bench/run_bench.py --runtimes 600
+#  $ python3 bench/run_bench.py --runtimes 600 --daemon /tmp/ISP-RPi-mqtt-daemon-v1.8.5.py
+#
+#  Time the shell pipelines our collectors ran before they read /proc and /sys
+#  themselves, run for real on the fixture set's files, next to today's collectors
+#  $ python3 bench/run_bench.py --shell-baseline
+#
+#  Record a new fixture set on a real device (review it for serial numbers, MAC
+#  addresses, host names and command lines before committing it):
+#  $ python3 bench/run_bench.py --capture pi5-bookworm-64 --description "Pi 5 4GB, Bookworm 64-bit"
+
+import _thread
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import resource
+import runpy
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime
+from time import monotonic, perf_counter_ns, process_time_ns, sleep
+
+from broker import StandInBroker
+
+K_BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+K_DAEMON_FSPEC = os.path.join(K_BENCH_DIR, os.pardir, 'ISP-RPi-mqtt-daemon.py')
+K_FIXTURES_DIR = os.path.join(K_BENCH_DIR, 'fixtures')
+K_FIXTURE_INFO_NAME = 'fixture.json'
+# the paths served from a fixture set, anything else (e.g. our config.ini) is the real thing
+K_FIXTURE_PATH_PREFIXES = ['/proc/', '/sys/', '/dev/', '/etc/', '/var/', '/usr/bin/', '/opt/vc/']
+# command run by a collector we have no recorded output for
+K_MISSING_COMMAND_RC = 127
+
+K_BENCH_CONFIG = """
+[Daemon]
+top_processes = 5
+[MQTT]
+hostname = 127.0.0.1
+port = {}
+"""
+
+K_RUNTIMES = ['threads', 'asyncio']
+K_RUNTIME_CONFIG = """
+[Daemon]
+runtime = {}
+interval_in_minutes = 1
+[MQTT]
+hostname = 127.0.0.1
+port = {}
+"""
+# collector -> the shell pipelines it ran before reading /proc and /sys itself ({fs}: our fixture set's files),
+#  list of tuple { pipeline, processes started } (bash execs a lone command in its own place)
+K_SHELL_BASELINE = OrderedDict([
+    ('cpu_identity', [("cat {fs}/proc/cpuinfo | /bin/egrep -i 'processor|model|bogo|hardware|serial'", 3)]),
+    ('cpu_loads', [('/bin/cat {fs}/proc/loadavg', 1)]),
+    ('memory', [('cat {fs}/proc/meminfo', 1)]),
+    ('uptime', [('/usr/bin/uptime', 1)]),    # (reads this machine's /proc, it can't be pointed elsewhere)
+    ('temperature', [('/bin/cat {fs}/sys/class/thermal/thermal_zone0/temp', 1)]),
+])
+
+# (when our config doesn't turn our sampler on) sample as often as this
+K_SAMPLER_INTERVAL_IN_SECONDS = 5
+# report periods our sampler is run for, to see its memory stays put as its rings roll over
+K_SAMPLER_PERIODS = 10
+# (and before those, to fill Python's free lists of floats, tuples ...)
+K_SAMPLER_WARMUP_PERIODS = 3
+
+# /proc/{pid}/stat of our synthetic processes: utime(14) changes each scan when they're busy
+K_SYNTHETIC_STAT = '{pid} (worker-{pid}) S 1 {pid} {pid} 0 -1 4194560 1200 0 0 0 {utime} 25 0 0 20 0 1 0 {started} 52428800 {rss} ' \
+                   '18446744073709551615 1 1 0 0 0 0 0 4096 0 0 0 0 17 0 0 0 0 0 0\n'
+K_SYNTHETIC_FIRST_PID = 300
+
+# what our import benchmark runs in a fresh interpreter: tuple { import ms, modules loaded } as JSON
+K_IMPORT_SCRIPT = """
+import importlib.util, json, sys
+from time import perf_counter_ns
+startNs = perf_counter_ns()
+sys.argv = [{fspec!r}]
+spec = importlib.util.spec_from_file_location('rpi_reporter', sys.argv[0])
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+print(json.dumps([(perf_counter_ns() - startNs) / 1000000.0, sorted(sys.modules.keys())]))
+"""
+# the modules our daemon imports only when it first needs them
+K_LAZY_MODULES = ['apt', 'requests', 'urllib3']
+
+# our runtime profile leaves out the daemon's startup (first read of every fact, announcement)
+K_RUNTIME_WARMUP_IN_SECONDS = 15
+
+
+def loadDaemon():
+    # a fresh copy of the daemon for each fixture set (our collectors keep state between reads)
+    spec = importlib.util.spec_from_file_location('rpi_reporter', K_DAEMON_FSPEC)
+    daemon = importlib.util.module_from_spec(spec)
+    savedArgv = sys.argv
+    sys.argv = [K_DAEMON_FSPEC]
+    try:
+        spec.loader.exec_module(daemon)
+    finally:
+        sys.argv = savedArgv
+    return daemon
+
+
+class FixtureOS:
+    # stands in for the os module within the daemon: serves (or, when recording,
+    #  copies) the files of a fixture set, counts the bytes read and commands run
+
+    def __init__(self, fixtureDir, recording=False):
+        self.fs_root = os.path.join(fixtureDir, 'fs')
+        self.info_fspec = os.path.join(fixtureDir, K_FIXTURE_INFO_NAME)
+        self.recording = recording
+        self.info = dict(description='', commands={}, statvfs={}, mtimes={})
+        if not recording:
+            with open(self.info_fspec) as infoFile:
+                self.info.update(json.load(infoFile))
+        self.path = FixturePath(self)
+        self.bytes_read = 0
+        self.forks = 0
+        self.missing_commands = set()
+
+    def __getattr__(self, name):
+        return getattr(os, name)
+
+    def fixturePath(self, fspec):
+        # where a path the daemon uses lives in our fixture set
+        # (a prefix names a directory: '/proc' itself is in our fixture set too)
+        if isinstance(fspec, str) and any((fspec + '/').startswith(prefix) for prefix in K_FIXTURE_PATH_PREFIXES):
+            return self.fs_root + fspec
+        return fspec
+
+    def recordFile(self, fspec):
+        # copy a file the daemon read into our fixture set
+        fixtureFspec = self.fixturePath(fspec)
+        if fixtureFspec == fspec or not os.path.isfile(fspec):
+            return
+        try:
+            with open(fspec, 'rb') as sourceFile:
+                content = sourceFile.read()
+        except OSError:
+            return
+        os.makedirs(os.path.dirname(fixtureFspec), exist_ok=True)
+        with open(fixtureFspec, 'wb') as fixtureFile:
+            fixtureFile.write(content)
+
+    def open(self, fspec, flags, mode=0o777):
+        if self.recording:
+            fd = os.open(fspec, flags, mode)
+            if flags & (os.O_WRONLY | os.O_RDWR) == 0:
+                self.recordFile(fspec)
+            return fd
+        return os.open(self.fixturePath(fspec), flags, mode)
+
+    def pread(self, fd, length, offset):
+        data = os.pread(fd, length, offset)
+        self.bytes_read += len(data)
+        return data
+
+    def read(self, fd, length):
+        data = os.read(fd, length)
+        self.bytes_read += len(data)
+        return data
+
+    def listdir(self, fspec):
+        if self.recording:
+            names = os.listdir(fspec)
+            for name in names:
+                os.makedirs(os.path.join(self.fixturePath(fspec), name), exist_ok=True)
+            return names
+        return os.listdir(self.fixturePath(fspec))
+
+    def scandir(self, fspec):
+        return os.scandir(fspec if self.recording else self.fixturePath(fspec))
+
+    def statvfs(self, fspec):
+        if self.recording:
+            stats = os.statvfs(fspec)
+            self.info['statvfs'][fspec] = list(stats)
+            return stats
+        if fspec not in self.info['statvfs']:
+            raise FileNotFoundError(2, 'not in fixture set', fspec)
+        return os.statvfs_result(self.info['statvfs'][fspec])
+
+    def invokeShellCmd(self, cmd):
+        # replaces the daemon's invoke_shell_cmd(): tuple { stdout, stderr, returncode }
+        self.forks += 1
+        if self.recording:
+            stdout, stderr, returncode = realInvokeShellCmd(cmd)
+            self.info['commands'][cmd] = dict(stdout=stdout.decode('utf-8', errors='replace'), returncode=returncode)
+            return stdout, stderr, returncode
+        recorded = self.info['commands'].get(cmd)
+        if recorded is None:
+            self.missing_commands.add(cmd)
+            return b'', None, K_MISSING_COMMAND_RC
+        return recorded['stdout'].encode('utf-8'), None, recorded['returncode']
+
+    def saveInfo(self):
+        with open(self.info_fspec, 'w') as infoFile:
+            json.dump(self.info, infoFile, indent=2, sort_keys=True)
+            infoFile.write('\n')
+
+
+class FixturePath:
+    # stands in for os.path within the daemon
+
+    def __init__(self, fixtureOS):
+        self.fixture_os = fixtureOS
+
+    def __getattr__(self, name):
+        return getattr(os.path, name)
+
+    def exists(self, fspec):
+        if self.fixture_os.recording:
+            exists = os.path.exists(fspec)
+            if exists:
+                self.fixture_os.recordFile(fspec)
+            return exists
+        return os.path.exists(self.fixture_os.fixturePath(fspec))
+
+    def getmtime(self, fspec):
+        if self.fixture_os.recording:
+            mtime = os.path.getmtime(fspec)
+            self.fixture_os.info['mtimes'][fspec] = mtime
+            return mtime
+        if fspec not in self.fixture_os.info['mtimes']:
+            raise FileNotFoundError(2, 'not in fixture set', fspec)
+        return self.fixture_os.info['mtimes'][fspec]
+
+
+realInvokeShellCmd = None
+
+
+def prepareDaemon(fixtureOS, configDir):
+    global realInvokeShellCmd
+    daemon = loadDaemon()
+    realInvokeShellCmd = daemon.invoke_shell_cmd
+    daemon.os = fixtureOS
+    daemon.invoke_shell_cmd = fixtureOS.invokeShellCmd
+    # as when run as our service: stdout is /dev/null so only warnings and errors are logged
+    daemon.stdout_is_null = True
+    daemon.loadConfiguration(configDir)
+    daemon.getHostnames()
+    daemon.sensor_name = 'rpi-{}'.format(daemon.rpi_hostname)
+    daemon.defineTopics()
+    return daemon
+
+
+def runCollector(daemon, factName):
+    try:
+        daemon.fact_registry[factName]['collector']()
+        return None
+    except Exception as exc:
+        return '{}: {}'.format(type(exc).__name__, exc)
+
+
+def benchCollectors(daemon, fixtureOS, repeat):
+    # list of dict (one per collector) of its timing, peak memory, forks and bytes read per run
+    results = []
+    for factName in daemon.fact_registry.keys():
+        error = runCollector(daemon, factName)  # warm up: first reads, open files, counters
+        tracemalloc.start()
+        runCollector(daemon, factName)
+        _, peakBytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        forks, bytesRead = fixtureOS.forks, fixtureOS.bytes_read
+        runTimes = []
+        for _ in range(repeat):
+            startNs = perf_counter_ns()
+            runCollector(daemon, factName)
+            runTimes.append(perf_counter_ns() - startNs)
+        results.append(dict(
+            collector=factName,
+            tier=daemon.fact_registry[factName]['tier'],
+            median_us=statistics.median(runTimes) / 1000.0,
+            max_us=max(runTimes) / 1000.0,
+            peak_kib=peakBytes / 1024.0,
+            forks=(fixtureOS.forks - forks) / repeat,
+            bytes_read=(fixtureOS.bytes_read - bytesRead) / repeat,
+            error=error,
+        ))
+    return results
+
+
+def benchShellBaseline(daemon, fixtureOS, repeat):
+    # list of dict (one per collector we moved off the shell) of its run time, then and now
+    results = []
+    for factName, pipelines in K_SHELL_BASELINE.items():
+        nativeTimes = []
+        for _ in range(repeat):
+            startNs = perf_counter_ns()
+            runCollector(daemon, factName)
+            nativeTimes.append(perf_counter_ns() - startNs)
+        shellTimes = []
+        for _ in range(repeat):
+            startNs = perf_counter_ns()
+            for pipeline, _ in pipelines:
+                realInvokeShellCmd(pipeline.format(fs=fixtureOS.fs_root))
+            shellTimes.append(perf_counter_ns() - startNs)
+        results.append(dict(
+            collector=factName,
+            native_us=statistics.median(nativeTimes) / 1000.0,
+            shell_us=statistics.median(shellTimes) / 1000.0,
+            shell_processes=sum(processes for _, processes in pipelines),
+        ))
+    return results
+
+
+def benchSampler(daemon, fixtureOS, repeat):
+    # dict of the cost of one takeSamples(), and our memory over some report periods
+    #  (each fills its rings and rolls over, getSamplesDictionary() starts the next)
+    if daemon.sample_interval_in_seconds == 0:
+        daemon.sample_interval_in_seconds = K_SAMPLER_INTERVAL_IN_SECONDS
+    daemon.startSampler()
+    daemon.takeSamples()    # warm up: first counter readings
+    runTimes = []
+    cpuTimes = []
+    bytesRead = fixtureOS.bytes_read
+    for _ in range(repeat):
+        startNs, startCpuNs = perf_counter_ns(), process_time_ns()
+        daemon.takeSamples()
+        runTimes.append(perf_counter_ns() - startNs)
+        cpuTimes.append(process_time_ns() - startCpuNs)
+    bytesRead = (fixtureOS.bytes_read - bytesRead) / repeat
+    daemon.getSamplesDictionary()
+
+    for _ in range(K_SAMPLER_WARMUP_PERIODS):
+        for _ in range(daemon.sample_ring_capacity):
+            daemon.takeSamples()
+        daemon.getSamplesDictionary()
+    tracemalloc.start()
+    periodMemory = []
+    for _ in range(K_SAMPLER_PERIODS):
+        for _ in range(daemon.sample_ring_capacity):
+            daemon.takeSamples()
+        daemon.getSamplesDictionary()
+        periodMemory.append(tracemalloc.get_traced_memory()[0])
+    _, peakBytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dict(
+        samples_per_period=daemon.sample_ring_capacity,
+        take_samples_median_us=statistics.median(runTimes) / 1000.0,
+        take_samples_cpu_us=statistics.median(cpuTimes) / 1000.0,
+        take_samples_bytes_read=bytesRead,
+        periods=K_SAMPLER_PERIODS,
+        # what stays allocated after our first period and our last one: equal when our rings don't grow
+        first_period_kib=periodMemory[0] / 1024.0,
+        last_period_kib=periodMemory[-1] / 1024.0,
+        peak_kib=peakBytes / 1024.0,
+    )
+
+
+def benchCycle(daemon, fixtureOS, broker, repeat):
+    # dict of timings of our report cycle: all facts due, only the fast ones due, and sending
+    daemon.startMQTTClient()
+    daemon.startPublisher()
+    waitUntil = monotonic() + 5.0
+    while not daemon.mqtt_client_connected and monotonic() < waitUntil:
+        sleep(0.01)
+    if not daemon.mqtt_client_connected:
+        raise RuntimeError('daemon did not connect to our stand-in broker')
+
+    fullTimes = []
+    fastTimes = []
+    sendTimes = []
+    forks, bytesRead = fixtureOS.forks, fixtureOS.bytes_read
+    publishesBefore = broker.publishes
+    bytesBefore = broker.payload_bytes
+    for _ in range(repeat):
+        daemon.fact_last_read_time.clear()    # every fact is due
+        startNs = perf_counter_ns()
+        daemon.update_values()
+        fullTimes.append(perf_counter_ns() - startNs)
+    fullForks = (fixtureOS.forks - forks) / repeat
+    fullBytesRead = (fixtureOS.bytes_read - bytesRead) / repeat
+    forks, bytesRead = fixtureOS.forks, fixtureOS.bytes_read
+    for _ in range(repeat):
+        startNs = perf_counter_ns()
+        daemon.update_values()              # just our fast tier is due
+        fastTimes.append(perf_counter_ns() - startNs)
+        startNs = perf_counter_ns()
+        daemon.send_status(datetime.now(daemon.local_tz), None)
+        sendTimes.append(perf_counter_ns() - startNs)
+    fastForks = (fixtureOS.forks - forks) / repeat
+    fastBytesRead = (fixtureOS.bytes_read - bytesRead) / repeat
+    # our report is the one message each send_status() publishes (sensor states are off)
+    broker.waitForPublishes(publishesBefore + repeat)
+    reportBytes = (broker.payload_bytes - bytesBefore) / max(1, broker.publishes - publishesBefore)
+
+    daemon.mqtt_client.disconnect()
+    daemon.mqtt_client.loop_stop()
+    daemon.collector_pool.shutdown(wait=False)
+    return dict(
+        update_values_all_due_us=statistics.median(fullTimes) / 1000.0,
+        update_values_all_due_forks=fullForks,
+        update_values_all_due_bytes_read=fullBytesRead,
+        update_values_fast_us=statistics.median(fastTimes) / 1000.0,
+        update_values_fast_forks=fastForks,
+        update_values_fast_bytes_read=fastBytesRead,
+        send_status_us=statistics.median(sendTimes) / 1000.0,
+        report_bytes=reportBytes,
+        published=broker.publishes - publishesBefore,
+    )
+
+
+def benchFixtureSet(fixtureName, broker, configDir, repeat, shellBaseline=False):
+    fixtureOS = FixtureOS(os.path.join(K_FIXTURES_DIR, fixtureName))
+    daemon = prepareDaemon(fixtureOS, configDir)
+    collectors = benchCollectors(daemon, fixtureOS, repeat)
+    shellResults = benchShellBaseline(daemon, fixtureOS, repeat) if shellBaseline else []
+    cycle = benchCycle(daemon, fixtureOS, broker, repeat)
+    sampler = benchSampler(daemon, fixtureOS, repeat)    # (after our cycle, so our reports don't carry samples)
+    return dict(fixture=fixtureName, description=fixtureOS.info['description'], collectors=collectors,
+                shell_baseline=shellResults, sampler=sampler, cycle=cycle, missing_commands=sorted(fixtureOS.missing_commands))
+
+
+def printResults(results):
+    print('')
+    print('fixture set [{}] - {}'.format(results['fixture'], results['description']))
+    print('  {:<16} {:<7} {:>10} {:>10} {:>9} {:>6} {:>8}'.format(
+        'collector', 'tier', 'median us', 'max us', 'peak KiB', 'forks', 'bytes'))
+    for row in results['collectors']:
+        print('  {:<16} {:<7} {:>10.1f} {:>10.1f} {:>9.1f} {:>6.0f} {:>8.0f}{}'.format(
+            row['collector'], row['tier'], row['median_us'], row['max_us'], row['peak_kib'],
+            row['forks'], row['bytes_read'], '  ! {}'.format(row['error']) if row['error'] else ''))
+    cycle = results['cycle']
+    print('  update_values() all facts due: {:>9.1f} us, ({:.0f}) forks, ({:.0f}) bytes read'.format(
+        cycle['update_values_all_due_us'], cycle['update_values_all_due_forks'], cycle['update_values_all_due_bytes_read']))
+    print('  update_values() fast tier:     {:>9.1f} us, ({:.0f}) forks, ({:.0f}) bytes read'.format(
+        cycle['update_values_fast_us'], cycle['update_values_fast_forks'], cycle['update_values_fast_bytes_read']))
+    print('  send_status():                 {:>9.1f} us, ({:.0f}) byte report, ({}) received by our broker'.format(
+        cycle['send_status_us'], cycle['report_bytes'], cycle['published']))
+    if len(results['shell_baseline']) > 0:
+        print('  {:<16} {:>10} {:>13} {:>10}'.format('before /proc', 'native us', 'shell pipes us', 'processes'))
+        for row in results['shell_baseline']:
+            print('  {:<16} {:>10.1f} {:>13.1f} {:>10}'.format(row['collector'], row['native_us'], row['shell_us'], row['shell_processes']))
+    sampler = results['sampler']
+    print('  takeSamples():                 {:>9.1f} us, ({:.1f}) us CPU, ({:.0f}) bytes read'.format(
+        sampler['take_samples_median_us'], sampler['take_samples_cpu_us'], sampler['take_samples_bytes_read']))
+    print('  sampler memory over ({}) periods of ({}) samples: {:.1f} KiB after the first, {:.1f} KiB after the last, {:.1f} KiB peak'.format(
+        sampler['periods'], sampler['samples_per_period'], sampler['first_period_kib'], sampler['last_period_kib'], sampler['peak_kib']))
+    for cmd in results['missing_commands']:
+        print('  ! no recorded output for command: {}'.format(cmd))
+
+
+def captureFixtureSet(fixtureName, description, configDir):
+    # run each collector on this device, keeping what it read in a new fixture set
+    fixtureDir = os.path.join(K_FIXTURES_DIR, fixtureName)
+    if os.path.exists(fixtureDir):
+        print('fixture set [{}] exists already, remove it first'.format(fixtureName), file=sys.stderr)
+        sys.exit(1)
+    fixtureOS = FixtureOS(fixtureDir, recording=True)
+    fixtureOS.info['description'] = description
+    daemon = prepareDaemon(fixtureOS, configDir)
+    for factName in daemon.fact_registry.keys():
+        error = runCollector(daemon, factName)
+        if error is not None:
+            print('collector [{}] failed: {}'.format(factName, error), file=sys.stderr)
+    daemon.collector_pool.shutdown(wait=False)
+    fixtureOS.saveInfo()
+    print('fixture set [{}] recorded in {}, ({}) commands'.format(fixtureName, fixtureDir, len(fixtureOS.info['commands'])))
+
+
+def writeSyntheticStats(fixtureDir, processCount, scan):
+    # the /proc/{pid}/stat of each of our synthetic processes as of this scan
+    for pid in range(K_SYNTHETIC_FIRST_PID, K_SYNTHETIC_FIRST_PID + processCount):
+        with open(os.path.join(fixtureDir, 'fs', 'proc', str(pid), 'stat'), 'w') as statFile:
+            statFile.write(K_SYNTHETIC_STAT.format(pid=pid, utime=100 + pid + scan, started=pid * 10, rss=1000 + pid))
+
+
+def makeSyntheticProcesses(fixtureDir, processCount):
+    # a fixture set with just a /proc of (processCount) processes
+    for pid in range(K_SYNTHETIC_FIRST_PID, K_SYNTHETIC_FIRST_PID + processCount):
+        processDir = os.path.join(fixtureDir, 'fs', 'proc', str(pid))
+        os.makedirs(processDir)
+        with open(os.path.join(processDir, 'cmdline'), 'w') as cmdlineFile:
+            cmdlineFile.write('/usr/bin/worker\0--id\0{}\0'.format(pid))
+    writeSyntheticStats(fixtureDir, processCount, 0)
+    with open(os.path.join(fixtureDir, K_FIXTURE_INFO_NAME), 'w') as infoFile:
+        json.dump(dict(description='{} synthetic processes'.format(processCount)), infoFile)
+
+
+def benchTopProcesses(processCount, configDir, repeat):
+    # dict of timings of getTopProcesses() over our synthetic /proc: every process changed, and none
+    fixtureDir = tempfile.mkdtemp(prefix='rpi-reporter-procs-')
+    try:
+        makeSyntheticProcesses(fixtureDir, processCount)
+        fixtureOS = FixtureOS(fixtureDir)
+        daemon = prepareDaemon(fixtureOS, configDir)
+        daemon.getTopProcesses()    # warm up: our first scan reads every command line
+        results = dict(processes=processCount)
+        for scanKind in ['changed', 'unchanged']:
+            scanTimes = []
+            bytesRead = 0
+            for scan in range(1, repeat + 1):
+                if scanKind == 'changed':
+                    writeSyntheticStats(fixtureDir, processCount, scan)
+                bytesBefore = fixtureOS.bytes_read
+                startNs = perf_counter_ns()
+                daemon.getTopProcesses()
+                scanTimes.append(perf_counter_ns() - startNs)
+                bytesRead += fixtureOS.bytes_read - bytesBefore
+            results['{}_median_us'.format(scanKind)] = statistics.median(scanTimes) / 1000.0
+            results['{}_max_us'.format(scanKind)] = max(scanTimes) / 1000.0
+            results['{}_bytes_read'.format(scanKind)] = bytesRead / repeat
+        daemon.collector_pool.shutdown(wait=False)
+    finally:
+        shutil.rmtree(fixtureDir, ignore_errors=True)
+    print('')
+    print('getTopProcesses() over ({}) synthetic processes'.format(processCount))
+    print('  {:<10} {:>10} {:>10} {:>8}'.format('scan', 'median us', 'max us', 'bytes'))
+    for scanKind in ['changed', 'unchanged']:
+        print('  {:<10} {:>10.1f} {:>10.1f} {:>8.0f}'.format(scanKind, results['{}_median_us'.format(scanKind)],
+                                                           results['{}_max_us'.format(scanKind)], results['{}_bytes_read'.format(scanKind)]))
+    return results
+
+
+def runFreshInterpreter(script):
+    # tuple { wall ms, peak RSS KiB, stdout } of a new python running our script
+    startNs = perf_counter_ns()
+    process = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE)
+    stdout = process.stdout.read()
+    process.stdout.close()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError('fresh interpreter failed, rc={}'.format(process.returncode))
+    return (perf_counter_ns() - startNs) / 1000000.0, usage.ru_maxrss, stdout
+
+
+def benchImport(repeat):
+    # dict of the cost of importing our daemon in a new interpreter, and that of the interpreter alone
+    bareTimes, bareRss = [], []
+    importTimes, wallTimes, importRss = [], [], []
+    for _ in range(repeat):
+        wallMs, rssKib, _ = runFreshInterpreter('pass')
+        bareTimes.append(wallMs)
+        bareRss.append(rssKib)
+        wallMs, rssKib, stdout = runFreshInterpreter(K_IMPORT_SCRIPT.format(fspec=os.path.abspath(K_DAEMON_FSPEC)))
+        importMs, moduleNames = json.loads(stdout)
+        wallTimes.append(wallMs)
+        importTimes.append(importMs)
+        importRss.append(rssKib)
+    results = dict(
+        interpreter_ms=statistics.median(bareTimes),
+        interpreter_max_rss_kib=max(bareRss),
+        import_ms=statistics.median(importTimes),
+        import_wall_ms=statistics.median(wallTimes),
+        import_max_rss_kib=max(importRss),
+        modules=len(moduleNames),
+        lazy_modules_loaded=[name for name in K_LAZY_MODULES if name in moduleNames],
+    )
+    print('')
+    print('importing the daemon in a fresh interpreter ({} runs)'.format(repeat))
+    print('  python alone:           {:>8.1f} ms, ({:.1f}) MiB max RSS'.format(
+        results['interpreter_ms'], results['interpreter_max_rss_kib'] / 1024.0))
+    print('  python + daemon import: {:>8.1f} ms, ({:.1f}) MiB max RSS, import itself {:.1f} ms, ({}) modules loaded'.format(
+        results['import_wall_ms'], results['import_max_rss_kib'] / 1024.0, results['import_ms'], results['modules']))
+    for name in results['lazy_modules_loaded']:
+        print('  ! [{}] was imported, though our daemon only needs it later'.format(name))
+    return results
+
+
+def profileRuntime(daemonFspec, configDir, seconds, resultFspec):
+    # in our child process: run the daemon for real, counting the threads it starts
+    #  and its context switches (each one a wake-up) after our warm-up
+    threadStarts = [0]
+    threadStart = threading.Thread.start
+    startNewThread = _thread.start_new_thread
+
+    def countedThreadStart(thread):
+        threadStarts[0] += 1
+        threadStart(thread)
+
+    def countedStartNewThread(*args):
+        threadStarts[0] += 1
+        return startNewThread(*args)
+    threading.Thread.start = countedThreadStart
+    _thread.start_new_thread = countedStartNewThread
+
+    warmedUp = {}
+
+    def alarmHandler(signum, frame):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        if not warmedUp:
+            warmedUp.update(time=monotonic(), thread_starts=threadStarts[0], switches=usage.ru_nvcsw + usage.ru_nivcsw)
+            signal.alarm(seconds)
+            return
+        hours = (monotonic() - warmedUp['time']) / 3600.0
+        with open(resultFspec, 'w') as resultFile:
+            json.dump(dict(
+                seconds=seconds,
+                threads_started=threadStarts[0],
+                threads_alive=threading.active_count(),
+                thread_starts_per_hour=(threadStarts[0] - warmedUp['thread_starts']) / hours,
+                wakeups_per_hour=(usage.ru_nvcsw + usage.ru_nivcsw - warmedUp['switches']) / hours,
+                max_rss_kib=usage.ru_maxrss,
+            ), resultFile)
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGALRM, alarmHandler)
+    signal.alarm(K_RUNTIME_WARMUP_IN_SECONDS)
+
+    # as if started from the command line (older releases start up as they're imported)
+    sys.argv = [daemonFspec, '--config_dir', configDir]
+    with contextlib.suppress(KeyboardInterrupt):
+        runpy.run_path(daemonFspec, run_name='__main__')
+
+
+def compareRuntimes(broker, configDir, seconds, daemonFspec):
+    # run the daemon in each runtime in turn, dict of the profile of each
+    profiles = {}
+    for runtime in K_RUNTIMES:
+        runtimeDir = os.path.join(configDir, runtime)
+        os.makedirs(runtimeDir)
+        with open(os.path.join(runtimeDir, 'config.ini'), 'w') as configFile:
+            configFile.write(K_RUNTIME_CONFIG.format(runtime, broker.port))
+        resultFspec = os.path.join(runtimeDir, 'profile.json')
+        print('running the daemon in its [{}] runtime for {} sec ...'.format(runtime, K_RUNTIME_WARMUP_IN_SECONDS + seconds))
+        # stdout is /dev/null as when run as our service
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--runtime-child', daemonFspec, runtimeDir, str(seconds), resultFspec],
+                       stdout=subprocess.DEVNULL, check=True)
+        with open(resultFspec) as resultFile:
+            profiles[runtime] = json.load(resultFile)
+    print('')
+    print('  {:<8} {:>15} {:>13} {:>17} {:>12} {:>12}'.format(
+        'runtime', 'threads started', 'threads alive', 'threads started/h', 'wake-ups/h', 'max RSS MiB'))
+    for runtime in K_RUNTIMES:
+        profile = profiles[runtime]
+        print('  {:<8} {:>15} {:>13} {:>17.0f} {:>12.0f} {:>12.1f}'.format(
+            runtime, profile['threads_started'], profile['threads_alive'], profile['thread_starts_per_hour'],
+            profile['wakeups_per_hour'], profile['max_rss_kib'] / 1024.0))
+    return profiles
+
+
+def main():
+    if len(sys.argv) == 6 and sys.argv[1] == '--runtime-child':
+        # (started by compareRuntimes())
+        profileRuntime(sys.argv[2], sys.argv[3], int(sys.argv[4]), sys.argv[5])
+        return
+    parser = argparse.ArgumentParser(description='Benchmark the RPi Reporter collectors against recorded fixtures')
+    parser.add_argument('fixtures', nargs='*', help='fixture sets to run (default: all)')
+    parser.add_argument('-n', '--repeat', type=int, default=50, help='runs per measurement (default: 50)')
+    parser.add_argument('--json', help='also write our results to this file')
+    parser.add_argument('--capture', metavar='NAME', help='record a new fixture set from this device instead')
+    parser.add_argument('--description', default='', help='description of a captured fixture set')
+    parser.add_argument('--shell-baseline', action='store_true',
+                        help='also time the shell pipelines our collectors used to run, on the fixture files')
+    parser.add_argument('--processes', type=int, metavar='COUNT',
+                        help='instead time our top processes scan over this many synthetic processes')
+    parser.add_argument('--import', dest='import_only', action='store_true',
+                        help='instead time importing the daemon in a fresh interpreter, and its peak RSS')
+    parser.add_argument('--runtimes', type=int, metavar='SECONDS',
+                        help='instead run the daemon for real in each runtime for this long and compare them')
+    parser.add_argument('--daemon', default=K_DAEMON_FSPEC,
+                        help='the daemon script to run with --runtimes, e.g. an older release (default: ours)')
+    args = parser.parse_args()
+
+    broker = StandInBroker().start()
+    configDir = tempfile.mkdtemp(prefix='rpi-reporter-bench-')
+    try:
+        with open(os.path.join(configDir, 'config.ini'), 'w') as configFile:
+            configFile.write(K_BENCH_CONFIG.format(broker.port))
+        if args.capture:
+            captureFixtureSet(args.capture, args.description, configDir)
+            return
+        if args.import_only:
+            results = benchImport(args.repeat)
+            if args.json:
+                with open(args.json, 'w') as jsonFile:
+                    json.dump(results, jsonFile, indent=2)
+            return
+        if args.processes:
+            results = benchTopProcesses(args.processes, configDir, args.repeat)
+            if args.json:
+                with open(args.json, 'w') as jsonFile:
+                    json.dump(results, jsonFile, indent=2)
+            return
+        if args.runtimes:
+            profiles = compareRuntimes(broker, configDir, args.runtimes, os.path.abspath(args.daemon))
+            if args.json:
+                with open(args.json, 'w') as jsonFile:
+                    json.dump(profiles, jsonFile, indent=2)
+            return
+        fixtureNames = args.fixtures or sorted(name for name in os.listdir(K_FIXTURES_DIR)
+                                               if os.path.isfile(os.path.join(K_FIXTURES_DIR, name, K_FIXTURE_INFO_NAME)))
+        allResults = []
+        for fixtureName in fixtureNames:
+            results = benchFixtureSet(fixtureName, broker, configDir, args.repeat, args.shell_baseline)
+            printResults(results)
+            allResults.append(results)
+        if args.json:
+            with open(args.json, 'w') as jsonFile:
+                json.dump(allResults, jsonFile, indent=2)
+    finally:
+        broker.stop()
+        shutil.rmtree(configDir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    with contextlib.suppress(KeyboardInterrupt):
+        main()
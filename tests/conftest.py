@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+#
+# Our daemon is a script (not a package), each test gets a freshly loaded copy
+#  of it with our default settings: collectors keep state between readings
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+K_REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+K_DAEMON_FSPEC = os.path.join(K_REPO_DIR, 'ISP-RPi-mqtt-daemon.py')
+K_FIXTURES_DIR = os.path.join(K_REPO_DIR, 'bench', 'fixtures')
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', [K_DAEMON_FSPEC])
+    spec = importlib.util.spec_from_file_location('rpi_reporter', K_DAEMON_FSPEC)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.stdout_is_null = True
+    module.loadConfiguration()
+    yield module
+    module.collector_pool.shutdown(wait=False)
+    for fspec in list(module.native_file_fds.keys()):
+        module.close_native_file(fspec)
+
+
+@pytest.fixture
+def fixture_dir():
+    # the files of one of our benchmark fixture sets: fixture_dir('pi3b-buster-32')
+    return lambda fixtureName: os.path.join(K_FIXTURES_DIR, fixtureName, 'fs')
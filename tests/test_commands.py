@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# on_message(): commands received over MQTT, run without holding up our asyncio event loop
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+
+class SlowCommand:
+    # stands in for subprocess.Popen: the command runs until our test lets it finish
+    def __init__(self, started, finish):
+        self.started = started
+        self.finish = finish
+        self.returncode = 0
+        self.done = False
+
+    def __call__(self, args):
+        self.started.set()
+        return self
+
+    def communicate(self):
+        self.finish.wait(5.0)
+        self.done = True
+        return None, None
+
+
+@pytest.fixture
+def slow_command(daemon, monkeypatch):
+    started, finish = threading.Event(), threading.Event()
+    command = SlowCommand(started, finish)
+    monkeypatch.setattr(daemon.subprocess, 'Popen', command)
+    monkeypatch.setattr(daemon, 'shell_cmd_fspec', '/bin/sh')
+    daemon.commands['restart_service'] = 'systemctl restart {}'
+    yield command
+    finish.set()
+
+
+def test_command_does_not_block_event_loop(daemon, slow_command, monkeypatch):
+    loop = asyncio.new_event_loop()
+    monkeypatch.setattr(daemon, 'asyncio_loop', loop)
+    message = SimpleNamespace(topic='home/nodes/command/rpi-pi4/restart_service', payload=b'isp-rpi-reporter')
+
+    async def receiveCommand():
+        daemon.on_message(None, None, message)
+        # still running in its worker, while our loop is free to go on
+        assert not slow_command.done
+        return await loop.run_in_executor(None, slow_command.started.wait, 5.0)
+    try:
+        assert loop.run_until_complete(receiveCommand())
+        assert daemon.children_forked == 1
+    finally:
+        slow_command.finish.set()
+        loop.close()
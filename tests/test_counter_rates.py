@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# getCounterRate() and the collectors using it: first readings, 32-bit wraps and resets
+
+import os
+import shutil
+
+import pytest
+
+K_SECONDS_BETWEEN_READINGS = 300.0
+
+
+class FakeClock:
+    # stands in for monotonic(), advanced by our tests
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def writeCounter(fspec, value):
+    with open(fspec, 'w') as counterFile:
+        counterFile.write('{}\n'.format(value))
+
+
+@pytest.fixture
+def clock(daemon, monkeypatch):
+    fakeClock = FakeClock()
+    monkeypatch.setattr(daemon, 'monotonic', fakeClock)
+    return fakeClock
+
+
+@pytest.mark.parametrize('machine, wrapAt', [
+    ('aarch64', None), ('x86_64', None), ('armv8l', None), ('ppc64le', None),
+    ('armv7l', 2 ** 32), ('armv6l', 2 ** 32), ('i686', 2 ** 32),
+])
+def test_kernel_counter_wrap_follows_kernel_width(daemon, machine, wrapAt):
+    assert daemon.getKernelCounterWrap(machine) == wrapAt
+
+
+def test_first_reading_has_no_rate(daemon):
+    assert daemon.getCounterRate(('net', 'eth0', 'rx_bytes'), 5000, 10.0) is None
+    assert daemon.getCounterRate(('net', 'eth0', 'rx_bytes'), 8000, 20.0) == 300.0
+
+
+def test_32bit_counter_wrap(daemon):
+    key = ('net', 'eth0', 'rx_bytes')
+    daemon.getCounterRate(key, 2 ** 32 - 1000, 10.0, wrapAt=daemon.K_COUNTER_WRAP_32)
+    assert daemon.getCounterRate(key, 3000, 20.0, wrapAt=daemon.K_COUNTER_WRAP_32) == 400.0
+
+
+@pytest.mark.parametrize('wrapAt', [None, 2 ** 64])
+def test_reset_of_wide_counter_is_not_a_wrap(daemon, wrapAt):
+    # a reset from the top half of 32 bits used to be taken for a 32-bit wrap (4,316,560 B/s here)
+    key = ('net', 'eth0', 'rx_bytes')
+    daemon.getCounterRate(key, 3000000000, 0.0, wrapAt=wrapAt)
+    assert daemon.getCounterRate(key, 1000, K_SECONDS_BETWEEN_READINGS, wrapAt=wrapAt) is None
+    # and we rate from the reset value on
+    assert daemon.getCounterRate(key, 31000, K_SECONDS_BETWEEN_READINGS * 2, wrapAt=wrapAt) == 100.0
+
+
+def test_reset_far_from_wrap_point(daemon):
+    key = ('disk', 'sda', 'write')
+    daemon.getCounterRate(key, 1000000, 0.0, wrapAt=daemon.K_COUNTER_WRAP_32)
+    assert daemon.getCounterRate(key, 10, 10.0, wrapAt=daemon.K_COUNTER_WRAP_32) is None
+
+
+@pytest.fixture
+def pi3_net(daemon, fixture_dir, tmp_path, monkeypatch):
+    # the Pi 3's /sys/class/net, its wlan0 rx_bytes (3187225810) in the top half of 32 bits
+    netDir = str(tmp_path / 'net')
+    shutil.copytree(os.path.join(fixture_dir('pi3b-buster-32'), 'sys', 'class', 'net'), netDir)
+    monkeypatch.setattr(daemon, 'K_SYSFS_NET_DIR', netDir)
+    return netDir
+
+
+def getRxData(daemon, interfaceName):
+    daemon.getNetworkIFs()
+    return dict(((name, field), value) for name, field, value in daemon.rpi_interfaces)[(interfaceName, 'rx_data')]
+
+
+def test_network_first_sample_reports_zero(daemon, clock, pi3_net):
+    assert getRxData(daemon, 'wlan0') == 0
+
+
+def test_network_counter_reset_on_64bit_kernel(daemon, clock, pi3_net, monkeypatch):
+    monkeypatch.setattr(daemon, 'K_COUNTER_WRAP_NATIVE', daemon.getKernelCounterWrap('aarch64'))
+    getRxData(daemon, 'wlan0')
+    writeCounter(os.path.join(pi3_net, 'wlan0', 'statistics', 'rx_bytes'), 1000)   # interface restarted
+    clock.now += K_SECONDS_BETWEEN_READINGS
+    assert getRxData(daemon, 'wlan0') == 0
+
+
+def test_network_counter_wrap_on_32bit_kernel(daemon, clock, pi3_net, monkeypatch):
+    monkeypatch.setattr(daemon, 'K_COUNTER_WRAP_NATIVE', daemon.getKernelCounterWrap('armv7l'))
+    getRxData(daemon, 'wlan0')
+    # 1.2 GB received: past 2^32 and round again
+    writeCounter(os.path.join(pi3_net, 'wlan0', 'statistics', 'rx_bytes'), 3187225810 + 1200000000 - 2 ** 32)
+    clock.now += K_SECONDS_BETWEEN_READINGS
+    assert getRxData(daemon, 'wlan0') == round(1200000000 / K_SECONDS_BETWEEN_READINGS * 8 / 1024)
+
+
+def test_disk_counter_reset_on_64bit_kernel(daemon, clock, fixture_dir, tmp_path, monkeypatch):
+    # the Pi 4's sda has written 4198123377 sectors, in the top half of 32 bits
+    diskstatsFspec = str(tmp_path / 'diskstats')
+    shutil.copy(os.path.join(fixture_dir('pi4b-bookworm-64'), 'proc', 'diskstats'), diskstatsFspec)
+    monkeypatch.setattr(daemon, 'K_DISKSTATS_FSPEC', diskstatsFspec)
+    monkeypatch.setattr(daemon, 'K_COUNTER_WRAP_NATIVE', daemon.getKernelCounterWrap('aarch64'))
+    daemon.getDiskIO()
+    assert daemon.rpi_disk_io['8:0'][:4] == (0, 0, 0.0, 0.0)    # first sample
+
+    # the SSD was unplugged and plugged back in: its counters start over
+    with open(diskstatsFspec) as diskstatsFile:
+        diskstats = diskstatsFile.read()
+    with open(diskstatsFspec, 'w') as diskstatsFile:
+        diskstatsFile.write(diskstats.replace(
+            '   8       0 sda 3312211 1231 412311223 1923311 9213321 4123311 4198123377 33123123 0 5123122 35123112',
+            '   8       0 sda 112 0 9123 311 21 3 1377 123 0 312 434'))
+    clock.now += K_SECONDS_BETWEEN_READINGS
+    daemon.getDiskIO()
+    readBytesRate, writeBytesRate, iops, busyPercent, writtenMB = daemon.rpi_disk_io['8:0']
+    assert (readBytesRate, writeBytesRate, iops, busyPercent) == (0, 0, 0.0, 0.0)
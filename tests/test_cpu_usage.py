@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+#
+# getDeviceCpuUsage(): per-interval percentages from /proc/stat jiffies
+
+import pytest
+
+#       user  nice system idle   iowait irq softirq steal
+K_PROC_STAT = """cpu  {user} 0 1000 {idle} {iowait} 0 0 0 0 0
+cpu0 {user} 0 1000 {idle} {iowait} 0 0 0 0 0
+intr 0
+"""
+
+
+@pytest.fixture
+def proc_stat(daemon, monkeypatch):
+    # set the content of our /proc/stat and the time, then read the CPU usage
+    def readCpuUsage(user, idle, iowait, timeNow):
+        content = K_PROC_STAT.format(user=user, idle=idle, iowait=iowait)
+        monkeypatch.setattr(daemon, 'read_native_file', lambda fspec: content)
+        monkeypatch.setattr(daemon, 'monotonic', lambda: timeNow)
+        daemon.getDeviceCpuUsage()
+        return daemon.rpi_cpu_usage['cpu0']
+    return readCpuUsage
+
+
+def test_first_reading_is_since_boot(proc_stat):
+    # busy (user + system) 3000 of 10000 jiffies, 1000 in iowait
+    assert proc_stat(user=2000, idle=6000, iowait=1000, timeNow=10.0) == (30.0, 10.0, 0.0)
+
+
+def test_interval_reading(proc_stat):
+    proc_stat(user=2000, idle=6000, iowait=1000, timeNow=10.0)
+    # 100 jiffies: 50 user, 40 idle, 10 iowait
+    assert proc_stat(user=2050, idle=6040, iowait=1010, timeNow=11.0) == (50.0, 10.0, 0.0)
+
+
+def test_iowait_stepping_back_is_not_a_since_boot_reading(proc_stat):
+    proc_stat(user=2000, idle=6000, iowait=1000, timeNow=10.0)
+    # iowait went back 2 jiffies: still this interval's usage, with no iowait
+    assert proc_stat(user=2050, idle=6052, iowait=998, timeNow=11.0) == (50.0, 0.0, 0.0)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# refreshFacts(): collection tiers, chains, deadlines and stale facts
+
+from collections import OrderedDict
+
+import pytest
+
+
+@pytest.fixture
+def facts(daemon, monkeypatch):
+    # replace our collectors with ones which just count their runs
+    runs = OrderedDict()
+
+    def registerFacts(*factList):
+        registry = OrderedDict()
+        for factName, tier, collector, options in factList:
+            runs[factName] = 0
+
+            def countedCollector(factName=factName, collector=collector):
+                runs[factName] += 1
+                if collector is not None:
+                    collector()
+            registry[factName] = dict(collector=countedCollector, tier=tier, **options)
+        monkeypatch.setattr(daemon, 'fact_registry', registry)
+        return runs
+    return registerFacts
+
+
+def test_reads_avoided_are_in_diagnostics(daemon, facts):
+    runs = facts(('model', daemon.K_TIER_STATIC, None, {}),
+                 ('drives', daemon.K_TIER_MEDIUM, None, {}),
+                 ('uptime', daemon.K_TIER_FAST, None, {}))
+    daemon.refreshFacts()
+    assert daemon.getDiagnosticsDictionary()['reads_avoided'] == 0
+    daemon.refreshFacts()
+    daemon.refreshFacts()
+    assert runs == OrderedDict([('model', 1), ('drives', 1), ('uptime', 3)])
+    diagnostics = daemon.getDiagnosticsDictionary()
+    assert diagnostics['reads_avoided'] == 2
+    assert diagnostics['reads_avoided_total'] == 4
+
+
+def test_chain_queued_behind_slow_ones_is_not_stale(daemon, facts, monkeypatch):
+    # a pool of 2: our fast facts wait for the slow ones before they start
+    monkeypatch.setattr(daemon, 'collector_pool', daemon.concurrent.futures.ThreadPoolExecutor(max_workers=2))
+    slowly = lambda: daemon.sleep(0.3)
+    facts(('drives', daemon.K_TIER_FAST, slowly, dict(deadline=1.0)),
+          ('disk_io', daemon.K_TIER_FAST, slowly, dict(deadline=1.0)),
+          ('uptime', daemon.K_TIER_FAST, None, dict(deadline=0.2)),
+          ('memory', daemon.K_TIER_FAST, None, dict(deadline=0.2)))
+    daemon.refreshFacts()
+    assert daemon.fact_stale_names == []
+
+
+def test_slow_chain_is_stale(daemon, facts):
+    facts(('drives', daemon.K_TIER_FAST, lambda: daemon.sleep(0.5), dict(deadline=0.1)),
+          ('uptime', daemon.K_TIER_FAST, None, {}))
+    daemon.refreshFacts()
+    assert daemon.fact_stale_names == ['drives']
+
+
+def test_failed_collector_leaves_its_dependents_stale(daemon, facts):
+    def failingVideoCore():
+        raise OSError('vcgencmd failed')
+    runs = facts(('videocore', daemon.K_TIER_FAST, failingVideoCore, {}),
+                 ('temperature', daemon.K_TIER_FAST, None, dict(after='videocore')),
+                 ('throttle', daemon.K_TIER_FAST, None, dict(after='videocore')),
+                 ('uptime', daemon.K_TIER_FAST, None, {}))
+    daemon.refreshFacts()
+    assert runs == OrderedDict([('videocore', 1), ('temperature', 0), ('throttle', 0), ('uptime', 1)])
+    assert daemon.fact_stale_names == ['videocore', 'temperature', 'throttle']
+    assert 'temperature' not in daemon.fact_last_read_time
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# shouldPublishReport(): publish_on_change with our deadbands, here for our top processes
+
+from collections import OrderedDict
+
+import pytest
+
+
+@pytest.fixture
+def publish_on_change(daemon, monkeypatch):
+    monkeypatch.setattr(daemon, 'publish_on_change', True)
+    monkeypatch.setattr(daemon, 'max_silence_in_minutes', 60)
+    monkeypatch.setattr(daemon, 'last_published_fields', None)
+    return daemon
+
+
+def makeReport(daemon, byCpu, byRss):
+    # our report with just its top processes: lists of Tuple (PID, Name, Command line, CPU %, RSS kB)
+    daemon.rpi_top_processes = (byCpu, byRss)
+    rpiData = OrderedDict()
+    rpiData[daemon.K_RPI_TOP_PROCESSES] = daemon.getTopProcessesDictionary()
+    return rpiData
+
+
+K_HOME_ASSISTANT = (1201, 'python3', 'python3 -m homeassistant --config /config', 12.5, 412312)
+K_ZIGBEE2MQTT = (1388, 'node', 'node index.js', 4.2, 158231)
+K_INFLUXD = (977, 'influxd', '/usr/bin/influxd -config /etc/influxdb/influxdb.conf', 3.1, 211231)
+K_GRAFANA = (1012, 'grafana', '/usr/share/grafana/bin/grafana server', 0.4, 121231)
+K_HTOP = (20311, 'htop', 'htop', 1.9, 4412)
+
+
+def withCpuAndRss(process, cpuPercent, rssKb):
+    return process[:3] + (cpuPercent, rssKb)
+
+
+def test_unchanged_ranking_is_not_published(publish_on_change):
+    daemon = publish_on_change
+    assert daemon.shouldPublishReport(makeReport(daemon, [K_HOME_ASSISTANT, K_ZIGBEE2MQTT, K_INFLUXD],
+                                                 [K_HOME_ASSISTANT, K_INFLUXD, K_ZIGBEE2MQTT]))
+    # the same processes in a new order, within their deadbands, one gone and a small one new to our lists
+    assert not daemon.shouldPublishReport(makeReport(
+        daemon, [withCpuAndRss(K_HOME_ASSISTANT, 9.8, 412400), K_INFLUXD, K_HTOP],
+        [K_HOME_ASSISTANT, K_ZIGBEE2MQTT, withCpuAndRss(K_INFLUXD, 3.3, 216000), K_HTOP]))
+
+
+def test_new_busy_process_is_published(publish_on_change):
+    daemon = publish_on_change
+    daemon.shouldPublishReport(makeReport(daemon, [K_HOME_ASSISTANT, K_ZIGBEE2MQTT], [K_HOME_ASSISTANT]))
+    # a runaway process: new to our lists at 95% CPU
+    assert daemon.shouldPublishReport(makeReport(
+        daemon, [withCpuAndRss(K_HTOP, 95.0, 4412), K_HOME_ASSISTANT], [K_HOME_ASSISTANT]))
+
+
+def test_new_large_process_is_published(publish_on_change):
+    daemon = publish_on_change
+    daemon.shouldPublishReport(makeReport(daemon, [K_HOME_ASSISTANT], [K_HOME_ASSISTANT, K_INFLUXD]))
+    assert daemon.shouldPublishReport(makeReport(daemon, [K_HOME_ASSISTANT], [K_HOME_ASSISTANT, K_GRAFANA]))
+
+
+def test_top_process_change_beyond_deadband_is_published(publish_on_change):
+    daemon = publish_on_change
+    daemon.shouldPublishReport(makeReport(daemon, [K_HOME_ASSISTANT, K_ZIGBEE2MQTT], [K_HOME_ASSISTANT]))
+    assert daemon.shouldPublishReport(makeReport(
+        daemon, [withCpuAndRss(K_HOME_ASSISTANT, 48.0, 412312), K_ZIGBEE2MQTT], [K_HOME_ASSISTANT]))
+    assert daemon.shouldPublishReport(makeReport(
+        daemon, [withCpuAndRss(K_HOME_ASSISTANT, 48.0, 412312), K_ZIGBEE2MQTT],
+        [withCpuAndRss(K_HOME_ASSISTANT, 48.0, 512312)]))
+
+
+def test_top_processes_named_by_pid(daemon):
+    fields = daemon.flattenReport(makeReport(daemon, [K_HOME_ASSISTANT], [K_INFLUXD]))
+    assert fields['top_processes.by_cpu.1201.cpu_prcnt'] == 12.5
+    assert fields['top_processes.by_rss.977.rss_kb'] == 211231
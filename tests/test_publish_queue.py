@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+# queuePublish(): our bounded publish queue and what it does when full (publish_overflow)
+
+import pytest
+
+K_INFO_TOPIC = 'home/nodes/sensor/rpi-pi4/info'
+K_STATIC_TOPIC = 'home/nodes/sensor/rpi-pi4/static'
+
+
+@pytest.fixture
+def publish_queue(daemon, monkeypatch):
+    monkeypatch.setattr(daemon, 'publish_queue_size', 2)
+    return daemon
+
+
+def test_coalesce_only_when_full(publish_queue):
+    daemon = publish_queue
+    daemon.queuePublish(K_INFO_TOPIC, 'report 1')
+    daemon.queuePublish(K_INFO_TOPIC, 'report 2')
+    assert [payload for _, payload, _ in daemon.publish_queue] == ['report 1', 'report 2']
+    daemon.queuePublish(K_INFO_TOPIC, 'report 3')
+    assert [payload for _, payload, _ in daemon.publish_queue] == ['report 2', 'report 3']
+    assert (daemon.publish_queue_coalesced, daemon.publish_queue_drops) == (1, 0)
+
+
+def test_full_queue_without_same_topic_drops_oldest(publish_queue):
+    daemon = publish_queue
+    daemon.queuePublish(K_INFO_TOPIC, 'report 1')
+    daemon.queuePublish(K_INFO_TOPIC, 'report 2')
+    daemon.queuePublish(K_STATIC_TOPIC, 'static', retain=True)
+    assert daemon.publish_queue == [(K_INFO_TOPIC, 'report 2', False), (K_STATIC_TOPIC, 'static', True)]
+    assert (daemon.publish_queue_coalesced, daemon.publish_queue_drops) == (0, 1)